@@ -1,4 +1,6 @@
-from typing import Optional
+import asyncio
+import html
+from typing import List, Optional, Set, Tuple, Union
 from telegram import (
     Update,
     InlineKeyboardButton,
@@ -12,13 +14,31 @@ from telegram.ext import (
     MessageHandler,
     filters as ft,
     CallbackQueryHandler,
+    InlineQueryHandler,
     Application,
 )
+from telegram.error import BadRequest
 from loguru import logger
 from city_expert.services.places_api import Place, PlacesAPI
-from city_expert.models import User, SearchModel, FavoritePlace
-from datetime import datetime
-from math import radians, sin, cos, sqrt, atan2
+from city_expert.services.callback_registry import CallbackAction, callback_registry
+from city_expert.services.exceptions import APIError
+from city_expert.services.favorites_cache import FavoritesCache
+from city_expert.services.inline_search import InlineSearch
+from city_expert.services.opening_hours import closes_in, is_open
+from city_expert.services.photo_pipeline import PhotoPipeline
+from city_expert.services.result_filter import SortOrder, apply_filter
+from city_expert.services.search_session import SearchSession, SessionStore
+from city_expert.services.send_scheduler import SendScheduler
+from city_expert.services.user_cache import UserCache
+from city_expert.utils.config_loader import api_config
+from city_expert.models import (
+    FavoriteRepository,
+    PhotoFileRepository,
+    SearchHistoryRepository,
+    UserRepository,
+    history_writer,
+)
+from city_expert.utils.geo import haversine_many
 
 
 
@@ -35,6 +55,29 @@ class SearchController:
         """
         self.app = app
         self.api = api
+        # Запросы к БД выполняются в отдельных потоках через репозитории
+        self.favorite_repo = FavoriteRepository()
+        self.history_repo = SearchHistoryRepository()
+        self.photos = PhotoPipeline(api, PhotoFileRepository())
+        self.users = UserCache(
+            UserRepository(),
+            max_users=api_config.USER_CACHE["max_users"],
+            ttl=api_config.USER_CACHE["ttl"],
+        )
+        self.favorites = FavoritesCache(
+            self.favorite_repo,
+            max_users=api_config.USER_CACHE["max_favorites"],
+        )
+        self.inline = InlineSearch(api, **api_config.INLINE_MODE)
+        # Данные inline-кнопок хранятся на сервере, в callback_data — только токен
+        self.callbacks = callback_registry
+        self.sessions = SessionStore(
+            max_sessions=api_config.RESULT_SESSIONS["max_sessions"],
+            ttl=api_config.RESULT_SESSIONS["ttl"],
+        )
+        # Сообщения с результатами поиска уходят через очередь с учетом лимитов Telegram
+        self.sender = SendScheduler(app.bot, **api_config.SEND_SCHEDULER)
+        self._photo_tasks: Set[asyncio.Task] = set()
         self._register_handlers()
 
     def _register_handlers(self) -> None:
@@ -50,7 +93,9 @@ class SearchController:
             MessageHandler(ft.Text(["🔍 Поиск достопримечательностей"]), self._start_search),
             MessageHandler(ft.Text(["↩️ Назад в меню"]), self._back_to_menu),
             MessageHandler(ft.LOCATION, self._handle_location),
-            CallbackQueryHandler(self._handle_button_click, pattern="^(map|fav|unfav):"),
+            CallbackQueryHandler(self._handle_button_click, pattern="^(cb|map|fav|unfav):"),
+            CallbackQueryHandler(self._handle_filter_click, pattern="^flt:"),
+            InlineQueryHandler(self._handle_inline_query),
             MessageHandler(ft.TEXT & ~ft.COMMAND, self._handle_text_search),
         ]
         for handler in handlers:
@@ -163,18 +208,10 @@ class SearchController:
         """
         try:
             # Получаем или создаем пользователя
-            user = User.get_or_create(
-                telegram_id=update.effective_user.id,
-                defaults={
-                    "full_name": update.effective_user.full_name,
-                    "username": update.effective_user.username,
-                },
-            )[0]
+            user = await self.users.get(update.effective_user)
 
             # Получаем избранные места (последние добавленные сначала)
-            favorites = FavoritePlace.select().where(
-                FavoritePlace.user == user
-            ).order_by(FavoritePlace.added_at.desc())
+            favorites = await self.favorite_repo.recent(user.id)
 
             if not favorites:
                 await update.message.reply_text(
@@ -213,59 +250,90 @@ class SearchController:
             update (Update): Объект обновления Telegram
         """
         query = update.callback_query
-        await query.answer()
 
         try:
-            if not query.data or ":" not in query.data:
-                raise ValueError("Неверный формат callback данных")
-
-            # Разбираем данные callback_data (формат: "action:param1:param2")
-
-            action, *payload = query.data.split(":")
-            user = User.get(telegram_id=query.from_user.id)
+            # Данные кнопки — из реестра по токену (или из старого формата "action:coords:name")
+            action = await self.callbacks.resolve(query.data) or self._parse_legacy_callback(query.data)
+            if action is None:
+                await query.answer("Кнопка устарела, повторите поиск")
+                return
+            if action.user_id is not None and action.user_id != update.effective_user.id:
+                # Клавиатура переслана или показана в группе — действие принадлежит другому пользователю
+                await query.answer("Эта кнопка предназначена другому пользователю")
+                return
+            await query.answer()
 
-            if action == "map":
-                lat, lon = payload[0].split(",")
-                maps_url = f"https://www.google.com/maps?q={lat},{lon}"
+            if action.action == "map":
+                maps_url = f"https://www.google.com/maps?q={action.place_id}"
                 await query.message.reply_text(
                     f"📍 Открыть в Google Maps:\n{maps_url}",
                     disable_web_page_preview=True
                 )
 
-            elif action in ("fav", "unfav"):
+            elif action.action in ("fav", "unfav"):
                 # Обработка кнопок избранного
-                coords, name = payload[0], ":".join(payload[1:])
-                lat, lon = coords.split(",")
-                place_id = f"{lat},{lon}"
-
-                if action == "fav":
-                    # Добавляем место в избранное
-                    FavoritePlace.create(
-                        user=user,
-                        place_id=place_id,
-                        name=name,
-                        added_at=datetime.now()
-                    )
-                    # Обновляем кнопку на "Удалить из избранного"
-                    await query.edit_message_reply_markup(
-                        reply_markup=self._create_place_keyboard(place_id, name, user, True)
-                    )
+                user = await self.users.get(query.from_user)
+                is_favorite = action.action == "fav"
+
+                if is_favorite:
+                    # Добавляем место в избранное (повторное нажатие не создает дубликат)
+                    await self.favorite_repo.add(user.id, action.place_id, action.name)
+                    self.favorites.add(query.from_user.id, action.place_id)
                 else:
                     # Удаляем место из избранного
-                    FavoritePlace.delete().where(
-                        (FavoritePlace.user == user) &
-                        (FavoritePlace.place_id == place_id)
-                    ).execute()
-                    # Обновляем кнопку на "Добавить в избранное"
-
-                    await query.edit_message_reply_markup(
-                        reply_markup=self._create_place_keyboard(place_id, name, user, False)
+                    await self.favorite_repo.remove(user.id, action.place_id)
+                    self.favorites.discard(query.from_user.id, action.place_id)
+
+                # Переключаем кнопку избранного
+                await query.edit_message_reply_markup(
+                    reply_markup=await self._create_place_keyboard(
+                        action.place_id, action.name, is_favorite, query.from_user.id
                     )
+                )
 
         except Exception as e:
             logger.error(f"Button click error: {e}")
             await query.message.reply_text("⚠️ Произошла ошибка")
 
+    @staticmethod
+    def _parse_legacy_callback(data: Optional[str]) -> Optional[CallbackAction]:
+        """Разбирает callback_data кнопок, отправленных до появления реестра."""
+        action, _, payload = (data or "").partition(":")
+        if action not in ("map", "fav", "unfav") or not payload:
+            return None
+        place_id, _, name = payload.partition(":")
+        return CallbackAction(action=action, place_id=place_id, name=name)
+
+    async def _handle_inline_query(self, update: Update, _: ContextTypes.DEFAULT_TYPE) -> None:
+        """Обрабатывает inline-запрос (`@bot кафе` в любом чате).
+
+        Args:
+            update (Update): Объект обновления Telegram
+        """
+        inline_query = update.inline_query
+        location = inline_query.location
+        try:
+            answer = await self.inline.results(
+                inline_query.id,
+                inline_query.from_user.id,
+                inline_query.query,
+                latitude=location.latitude if location else None,
+                longitude=location.longitude if location else None,
+            )
+            if answer is None:
+                # Пользователь продолжил ввод — отвечает следующий запрос
+                return
+            await inline_query.answer(
+                answer.results,
+                cache_time=answer.cache_time,
+                is_personal=answer.is_personal,
+            )
+        except BadRequest as e:
+            # Запрос устарел, пока искали места
+            logger.debug(f"Inline-запрос не обработан: {e}")
+        except Exception as e:
+            logger.error(f"Inline query error: {e}")
+
     async def _handle_location(self, update: Update, _: ContextTypes.DEFAULT_TYPE) -> None:
         """Обрабатывает получение геолокации от пользователя.
 
@@ -278,19 +346,14 @@ class SearchController:
 
         location = update.message.location
         user_id = update.effective_user.id
+        chat_id = update.effective_chat.id
         logger.info(f"Получена геолокация от пользователя {user_id}: {location.latitude}, {location.longitude}")
 
         try:
-            # Получаем или создаем пользователя
-            User.get_or_create(
-                telegram_id=user_id,
-                defaults={
-                    "full_name": update.effective_user.full_name,
-                    "username": update.effective_user.username,
-                },
-            )
+            # Получаем или создаем пользователя (один раз, дальше — из кэша)
+            await self.users.get(update.effective_user)
 
-            await update.message.reply_text("🔍 Ищу интересные места рядом...")
+            self.sender.send_text(chat_id, "🔍 Ищу интересные места рядом...")
             places = await self.api.search(
                 "достопримечательности",
                 latitude=location.latitude,
@@ -299,61 +362,47 @@ class SearchController:
             )
 
             if not places:
-                await update.message.reply_text("😕 Рядом не найдено интересных мест")
+                self.sender.send_text(chat_id, "😕 Рядом не найдено интересных мест")
                 return
 
-            for place in places[:3]:
-                await self._send_place_result(update, place, location)
+            # Контакты, часы работы и фото загружаем только для показываемых мест
+            shown = await self.api.enrich(places[:3])
+            distances = haversine_many(
+                location.latitude,
+                location.longitude,
+                [place.latitude for place in shown],
+                [place.longitude for place in shown],
+            )
+            for place, distance in zip(shown, distances):
+                await self._send_place_result(update, place, float(distance))
 
+            await self._send_results_list(update, SearchSession(
+                user_id=user_id,
+                query="достопримечательности",
+                places=places,
+                latitude=location.latitude,
+                longitude=location.longitude,
+            ))
+
+        except APIError as e:
+            logger.warning(f"Location search API error: {e}")
+            self.sender.send_text(chat_id, "⚠️ Сервис поиска временно недоступен. Попробуйте позже.")
         except Exception as e:
             logger.error(f"Location search error: {e}")
-            await update.message.reply_text("⚠️ Ошибка при поиске мест рядом")
-
-    @staticmethod
-    def _calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        """Вычисляет расстояние между двумя точками в метрах
-        по формуле гаверсинусов.
-        Args:
-            lat1 (float): Широта первой точки
-            lon1 (float): Долгота первой точки
-            lat2 (float): Широта второй точки
-            lon2 (float): Долгота второй точки
-
-        Returns:
-            float: Расстояние в метрах
-
-        """
-        earth_radius_m = 6371000 # Радиус Земли в метрах
-        # Конвертируем градусы в радианы
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-
-        # Разница координат
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-
-        # Формула гаверсинусов
-        a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-        return earth_radius_m * 2 * atan2(sqrt(a), sqrt(1 - a))
+            self.sender.send_text(chat_id, "⚠️ Ошибка при поиске мест рядом")
 
     async def _show_history(self, update: Update, _: ContextTypes.DEFAULT_TYPE) -> None:
         """Показывает историю поиска пользователя."""
         try:
             # Получаем или создаем пользователя
-            user = User.get_or_create(
-                telegram_id=update.effective_user.id,
-                defaults={
-                    "full_name": update.effective_user.full_name,
-                    "username": update.effective_user.username,
-                },
-            )[0]
-
-            # Получаем последние 10 запросов
-            history = SearchModel.select().where(
-                SearchModel.user == user
-            ).order_by(SearchModel.created_at.desc()).limit(10)
+            user = await self.users.get(update.effective_user)
+
+            # Получаем последние 10 запросов (с еще не записанными из буфера)
+            await history_writer.flush()
+            history = await self.history_repo.recent(user.id, limit=10)
 
             # Формируем ответ
-            if not history.exists():
+            if not history:
                 await update.message.reply_text(
                     "История поиска пуста",
                     reply_markup=self._get_main_keyboard()
@@ -384,172 +433,295 @@ class SearchController:
             await update.message.reply_text("Слишком короткий запрос")
             return
 
-        await update.message.reply_text("🔍 Ищу места...")
+        chat_id = update.effective_chat.id
+        self.sender.send_text(chat_id, "🔍 Ищу места...")
 
         try:
-            user = User.get_or_create(
-                telegram_id=update.effective_user.id,
-                defaults={
-                    "full_name": update.effective_user.full_name,
-                    "username": update.effective_user.username,
-                },
-            )[0]
-
-            # Выполняем поиск через API
-            places = await self.api.search(query, user_id=user.telegram_id)
+            user = await self.users.get(update.effective_user)
+
+            # Первая страница ответа API уже содержит все показываемые места;
+            # следующие страницы загружаются, только если пользователь долистает до них список
+            pages = self.api.search_stream(query, user_id=user.telegram_id)
+            places = await anext(pages)
+            shown = min(len(places), 5)
+
+            # Контакты, часы работы и фото загружаются параллельно только для показываемых мест;
+            # карточка отправляется, как только готовы подробности ее места (порядок сохраняется)
+            details = [asyncio.create_task(self.api.enrich([place])) for place in places[:shown]]
+            try:
+                for task in details:
+                    for enriched in await task:
+                        await self._send_place_result(update, enriched)
+            finally:
+                for task in details:
+                    task.cancel()
 
             # Сохраняем запрос в историю
-            SearchModel.create(
-                user=user,
-                query=query,
-                results_count=len(places) if places else 0,
-                created_at=datetime.now(),
-                is_location_search=False,
-            )
+            # Запись в историю отложенная: результаты уже отправлены, строка попадет в БД пакетом
+            await history_writer.add(user.id, query, results_count=len(places))
 
-            if not places:
-                await update.message.reply_text("Ничего не найдено")
+            if not shown:
+                self.sender.send_text(chat_id, "Ничего не найдено")
                 return
 
-            for place in places[:5]:
-                await self._send_place_result(update, place)
+            # Список с фильтрами строится по первой странице, остальные догружаются при листании
+            await self._send_results_list(
+                update, SearchSession(user_id=user.telegram_id, query=query, places=places, more=pages)
+            )
 
+        except APIError as e:
+            logger.warning(f"Search API error: {e}")
+            self.sender.send_text(chat_id, "⚠️ Сервис поиска временно недоступен. Попробуйте позже.")
         except Exception as e:
             logger.error(f"Search error: {e}")
-            await update.message.reply_text("⚠️ Ошибка при поиске")
+            self.sender.send_text(chat_id, "⚠️ Ошибка при поиске")
 
-    @staticmethod
-    def _create_place_keyboard(place_id: str, name: str, is_favorite: bool) -> InlineKeyboardMarkup:
-        """ Создает inline-клавиатуру для взаимодействия с местом.
+    async def _send_results_list(self, update: Update, session: SearchSession) -> None:
+        """Отправляет список результатов поиска с кнопками фильтров.
 
         Args:
-            place_id (str): Идентификатор места
-            name (str): Название места
-            is_favorite (bool): В избранном ли место
-
-        Returns:
-            InlineKeyboardMarkup: Объект клавиатуры
+            update (Update): Объект обновления Telegram
+            session (SearchSession): Результаты поиска
         """
+        session_id = self.sessions.create(session)
+        text, keyboard = await self._render_results(session_id, session)
+        self.sender.send_text(
+            update.effective_chat.id,
+            text,
+            parse_mode="HTML",
+            reply_markup=keyboard,
+            disable_web_page_preview=True,
+        )
 
-        buttons = [
-            InlineKeyboardButton(
-                "🗺 Карта",
-                callback_data=f"map:{place_id}"
-            ),
-            InlineKeyboardButton(
-                "⭐ Удалить" if is_favorite else "🌟 Добавить",
-                callback_data=f"{'unfav' if is_favorite else 'fav'}:{place_id}:{name[:30]}"
+    async def _filter_results(self, session: SearchSession) -> List[Tuple[Place, Optional[float]]]:
+        """Применяет фильтр сессии к надмножеству результатов.
+
+        Телефон, сайт и часы работы загружаются лениво, поэтому для фильтров по ним
+        подробности догружаются только для ограниченного числа кандидатов,
+        прошедших остальные условия. Догруженные места сохраняются в сессии,
+        и следующие перерисовки обходятся без запросов.
+        """
+        result_filter = session.filter
+        if result_filter.needs_details:
+            candidates = apply_filter(
+                session.places, result_filter, session.latitude, session.longitude, strict=False
             )
-        ]
-        return InlineKeyboardMarkup([buttons])
+            pending = [place for place, _ in candidates if not place.details_loaded]
+            pending = pending[:api_config.RESULT_SESSIONS["details_batch"]]
+            if pending:
+                enriched = dict(zip(map(id, pending), await self.api.enrich(pending)))
+                session.places = [enriched.get(id(place), place) for place in session.places]
+        return apply_filter(session.places, result_filter, session.latitude, session.longitude)
+
+    async def _load_more(self, session: SearchSession) -> None:
+        """Догружает следующую страницу ответа API, когда список долистан до конца.
+
+        Новые места добавляются в сессию, и отфильтрованный список пересчитывается.
+        Если страниц больше нет (или загрузка не удалась), кнопка «Ещё» на
+        последней странице списка больше не показывается.
+        """
+        while session.more is not None:
+            try:
+                page = await anext(session.more, None)
+            except (APIError, ValueError) as e:
+                logger.warning(f"Не удалось загрузить следующую страницу результатов: {e}")
+                page = None
+            if page is None:
+                session.more = None
+            elif page:
+                session.places = session.places + page
+                session.results = None
+                return
+
+    async def _render_results(self, session_id: str, session: SearchSession) -> Tuple[str, InlineKeyboardMarkup]:
+        """Формирует текст текущей страницы списка результатов и клавиатуру фильтров.
+
+        Отфильтрованный список хранится в сессии, поэтому листание страниц
+        не обращается ни к API, ни к фильтрам.
+
+        Returns:
+            Tuple[str, InlineKeyboardMarkup]: HTML-текст сообщения и клавиатура
+        """
+        if session.results is None:
+            session.results = await self._filter_results(session)
+        results = session.results
+        page_size = api_config.RESULT_SESSIONS["page_size"]
+        pages = max(1, -(-len(results) // page_size))
+        session.page = min(max(session.page, 0), pages - 1)
+        start = session.page * page_size
+
+        text = f"🔎 <b>{html.escape(session.query)}</b>: найдено {len(results)} из {len(session.places)}"
+        if pages > 1:
+            text += f" · стр. {session.page + 1}/{pages}"
+        text += "\n\n"
+        if not results:
+            text += "😕 Нет мест, подходящих под фильтры"
+        for number, (place, distance) in enumerate(results[start:start + page_size], start=start + 1):
+            line = f"{number}. <b>{html.escape(place.name)}</b> — ⭐ {place.rating or 'нет'}"
+            if distance is not None:
+                line += f" · 🚶 {int(distance)} м"
+            if is_open(place.opening_hours):
+                line += " · 🟢 открыто"
+            text += line + "\n"
+
+        return text, self._create_filter_keyboard(session_id, session, pages)
 
     @staticmethod
-    def _create_place_keyboard(place_id: str, name: str, is_favorite: bool) -> InlineKeyboardMarkup:
-        """Создает клавиатуру для места.
+    def _create_filter_keyboard(session_id: str, session: SearchSession, pages: int = 1) -> InlineKeyboardMarkup:
+        """Создает клавиатуру фильтров списка результатов.
+
         Args:
-            place_id: Идентификатор места в формате "lat,lon"
-            name: Название места (обрезается до 30 символов)
-            is_favorite: Флаг, находится ли место в избранном
+            session_id: Идентификатор сессии результатов
+            session: Сессия (текущие значения фильтров и страница)
+            pages: Число страниц списка
 
         Returns:
-            InlineKeyboardMarkup: Клавиатура с кнопками:
-                - "🗺 Карта" - открывает карту
-                - "⭐ Удалить"/"🌟 Добавить" - управление избранным
+            InlineKeyboardMarkup: Клавиатура с кнопками рейтинга, расстояния,
+                сортировки, флагов «открыто», «телефон», «сайт» и листания страниц
         """
-        buttons = [
-            InlineKeyboardButton(
-                "🗺 Карта",
-                callback_data=f"map:{place_id}"
-            ),
-            InlineKeyboardButton(
-                "⭐ Удалить" if is_favorite else "🌟 Добавить",
-                callback_data=f"{'unfav' if is_favorite else 'fav'}:{place_id}:{name[:30]}"
-            )
+        result_filter = session.filter
+        sort_labels = {
+            SortOrder.RANK: "↕️ Лучшие",
+            SortOrder.DISTANCE: "↕️ Ближе",
+            SortOrder.RATING: "↕️ По рейтингу",
+        }
+
+        def button(label: str, option: str) -> InlineKeyboardButton:
+            return InlineKeyboardButton(label, callback_data=f"flt:{session_id}:{option}")
+
+        def flag(enabled: bool) -> str:
+            return "✅" if enabled else "▫️"
+
+        first_row = [button(
+            f"⭐ {result_filter.min_rating:g}+" if result_filter.min_rating else "⭐ Любой",
+            "rating",
+        )]
+        if session.latitude is not None:
+            first_row.append(button(
+                f"📏 ≤{int(result_filter.max_distance)} м" if result_filter.max_distance else "📏 Любое",
+                "distance",
+            ))
+        first_row.append(button(sort_labels[result_filter.sort], "sort"))
+
+        second_row = [
+            button(f"{flag(result_filter.open_now)} Открыто", "open"),
+            button(f"{flag(result_filter.has_phone)} Телефон", "phone"),
+            button(f"{flag(result_filter.has_website)} Сайт", "web"),
         ]
-        return InlineKeyboardMarkup([buttons])
+        rows = [first_row, second_row]
+
+        page_row = []
+        if session.page > 0:
+            page_row.append(button("◀️ Назад", "prev"))
+        if session.page < pages - 1 or session.more is not None:
+            page_row.append(button("▶️ Ещё", "next"))
+        if page_row:
+            rows.append(page_row)
+        return InlineKeyboardMarkup(rows)
+
+    async def _handle_filter_click(self, update: Update, _: ContextTypes.DEFAULT_TYPE) -> None:
+        """Переключает фильтр или страницу списка результатов и перерисовывает его на месте.
 
-    async def _handle_callback_query(self, update: Update, _: ContextTypes.DEFAULT_TYPE) -> None:
-        """Обрабатывает callback-запросы от inline-кнопок (карта/избранное).
+        Листание страниц не обращается к API: страница вырезается из
+        сохраненного в сессии отфильтрованного списка. Только переход за
+        последнюю страницу догружает следующую страницу ответа API.
 
         Args:
-            update: Объект Update от Telegram API
-            _: Неиспользуемый контекст (заменен на _)
+            update (Update): Объект обновления Telegram
         """
         query = update.callback_query
-        await query.answer()  # Обязательное подтверждение получения callback
-
         try:
-            if not query.data:
-                raise ValueError("Отсутствуют callback данные")
-
-            # Разбор данных формата "action:param1:param2:..."
-            action, *payload = query.data.split(":")
-
-            if action == "map":
-                # Обработка кнопки "Карта"
-                if not payload or len(payload[0].split(",")) != 2:
-                    raise ValueError("Неверный формат координат")
-
-                lat, lon = payload[0].split(",")
-                await query.message.reply_text(
-                    f"📍 Открыть в Google Maps:\nhttps://www.google.com/maps?q={lat},{lon}",
-                    disable_web_page_preview=True
-                )
-
-            elif action in ("fav", "unfav"):
-                # Обработка избранного
-                if not payload:
-                    raise ValueError("Недостаточно данных для обработки избранного")
-
-                user = User.get(telegram_id=query.from_user.id)
-                place_id = payload[0]
-                name = ":".join(payload[1:]) if len(payload) > 1 else "Место"
-
-                if action == "fav":
-                    FavoritePlace.create(
-                        user=user,
-                        place_id=place_id,
-                        name=name,
-                        added_at=datetime.now()
-                    )
-                else:
-                    FavoritePlace.delete().where(
-                        (FavoritePlace.user == user) &
-                        (FavoritePlace.place_id == place_id)
-                    ).execute()
+            _, session_id, option = query.data.split(":")
+            session = self.sessions.get(session_id, query.from_user.id)
+            if session is None:
+                await query.answer("Результаты устарели, повторите поиск")
+                return
 
-                # Обновляем только клавиатуру
-                await query.edit_message_reply_markup(
-                    reply_markup=self._create_place_keyboard(
-                        place_id=place_id,
-                        name=name,
-                        is_favorite=action == "fav"
-                    )
-                )
+            if option in ("prev", "next"):
+                session.page += 1 if option == "next" else -1
+                if option == "next" and session.results is not None and session.more is not None:
+                    page_size = api_config.RESULT_SESSIONS["page_size"]
+                    if session.page * page_size >= len(session.results):
+                        await self._load_more(session)
+            else:
+                # Новый фильтр — список пересчитывается и показывается с первой страницы
+                session.filter = session.filter.toggled(option)
+                session.results = None
+                session.page = 0
+            await query.answer()
+            text, keyboard = await self._render_results(session_id, session)
+            await query.edit_message_text(
+                text,
+                parse_mode="HTML",
+                reply_markup=keyboard,
+                disable_web_page_preview=True,
+            )
 
+        except BadRequest as e:
+            # Фильтр не изменил список — Telegram отклоняет одинаковое сообщение
+            logger.debug(f"Список результатов не изменен: {e}")
         except ValueError as e:
-            logger.warning(f"Некорректные callback данные: {e}")
-            await query.message.reply_text("⚠️ Некорректный запрос")
+            logger.warning(f"Некорректные данные фильтра: {e}")
+            await query.answer("⚠️ Некорректный запрос")
         except Exception as e:
-            logger.error(f"Ошибка обработки callback: {e}")
-            await query.message.reply_text(
-                "⚠️ Ошибка при обработке запроса",
-                reply_markup=self._get_main_keyboard()
-            )
+            logger.error(f"Filter click error: {e}")
+            await query.message.reply_text("⚠️ Ошибка при применении фильтра")
+
+    async def _create_place_keyboard(
+            self,
+            place_id: str,
+            name: str,
+            is_favorite: bool,
+            user_id: int,
+    ) -> InlineKeyboardMarkup:
+        """ Создает inline-клавиатуру для взаимодействия с местом.
+
+        Args:
+            place_id (str): Идентификатор места
+            name (str): Название места
+            is_favorite (bool): В избранном ли место
+            user_id (int): Telegram ID пользователя, которому показывается клавиатура
 
+        Returns:
+            InlineKeyboardMarkup: Объект клавиатуры
+        """
+        map_data, fav_data = await self.callbacks.register([
+            CallbackAction("map", place_id, name, user_id),
+            CallbackAction("unfav" if is_favorite else "fav", place_id, name, user_id),
+        ])
+        buttons = [
+            InlineKeyboardButton("🗺 Карта", callback_data=map_data),
+            InlineKeyboardButton("⭐ Удалить" if is_favorite else "🌟 Добавить", callback_data=fav_data),
+        ]
+        return InlineKeyboardMarkup([buttons])
 
-    async def _send_place_result(self, update: Update, place: Place, user_location: Optional[Place] = None) -> None:
+    @staticmethod
+    def _format_opening_status(place: Place) -> Optional[str]:
+        """Формирует строку о часах работы места (None, если они неизвестны)."""
+        open_now = is_open(place.opening_hours)
+        if open_now is None:
+            return None
+        if not open_now:
+            return "🔴 Сейчас закрыто"
+        minutes = closes_in(place.opening_hours)
+        if minutes is not None and minutes <= 60:
+            return f"🟡 Открыто, закроется через {minutes} мин"
+        return "🟢 Открыто"
+
+    async def _send_place_result(self, update: Update, place: Place, distance: Optional[float] = None) -> None:
         """Отправляет пользователю информацию о найденном месте.
 
         Args:
             update (Update): Объект обновления от Telegram API
             place (Place): Найденное место
-            user_location (Optional[Place]): Локация пользователя (необязательно)
+            distance (Optional[float]): Расстояние до места в метрах, если известна локация пользователя
         """
 
-        try:
-            user = User.get(telegram_id=update.effective_user.id)
+        # Фото готовится (file_id из кэша или скачивание и уменьшение) параллельно с текстом
+        photo_name = place.photos[0] if place.photos and self.photos.enabled else None
+        photo_task = asyncio.create_task(self.photos.prepare(photo_name)) if photo_name else None
 
+        try:
             # Формируем текст сообщения
             message_text = (
                 f"📍 <b>{place.name}</b>\n"
@@ -558,15 +730,14 @@ class SearchController:
             )
 
             # Добавляем расстояние, если известна локация пользователя
-            if user_location:
-                distance = self._calculate_distance(
-                    user_location.latitude,
-                    user_location.longitude,
-                    place.latitude,
-                    place.longitude
-                )
+            if distance is not None:
                 message_text += f"🚶‍♂️ ~{int(distance)} м от вас\n"
 
+            # Часы работы считаются по расписанию на текущий момент
+            status = self._format_opening_status(place)
+            if status:
+                message_text += f"{status}\n"
+
             # Добавляем контактную информацию
             if place.website:
                 message_text += f"🌐 <a href='{place.website}'>Сайт</a>\n"
@@ -576,39 +747,58 @@ class SearchController:
             # Создаем идентификатор места
             place_id = f"{place.latitude:.6f},{place.longitude:.6f}"
 
-            # Проверяем, есть ли место в избранном
-            is_favorite = FavoritePlace.select().where(
-                (FavoritePlace.user == user) &
-                (FavoritePlace.place_id == place_id)
-            ).exists()
+            # Проверяем, есть ли место в избранном (множество пользователя кэшируется)
+            is_favorite = place_id in await self.favorites.get(update.effective_user.id)
 
             # Создаем клавиатуру
-            keyboard = self._create_place_keyboard(place_id, place.name, user, is_favorite)
-
-            photo_url = next(
-                (p for p in place.photos if isinstance(p, str) and p.startswith(('http://', 'https://'))),
-                None
+            keyboard = await self._create_place_keyboard(
+                place_id, place.name, is_favorite, update.effective_user.id
             )
 
-            # Пытаемся отправить фото
-            if photo_url:
-                try:
-                    await update.message.reply_photo(
-                        photo=photo_url,
-                        caption=message_text,
-                        reply_markup=keyboard,
-                        parse_mode="HTML"
-                    )
-                    return
-                except Exception as e:
-                    logger.warning(f"Не удалось отправить фото: {e}")
+            photo = await self._await_photo(photo_task)
+            photo_task = None
 
-            # Если фото нет или не удалось отправить - отправляем текст
-            await update.message.reply_text(
-                message_text,
-                reply_markup=keyboard,
-                parse_mode="HTML"
-            )
+            # Сообщение ставится в очередь отправки; если фото не примут, планировщик отправит текст
+            chat_id = update.effective_chat.id
+            if photo is not None:
+                sent = self.sender.send_photo(chat_id, photo, message_text, parse_mode="HTML", reply_markup=keyboard)
+                task = asyncio.create_task(self._track_photo(sent, photo_name, photo))
+                self._photo_tasks.add(task)
+                task.add_done_callback(self._photo_tasks.discard)
+            else:
+                self.sender.send_text(chat_id, message_text, parse_mode="HTML", reply_markup=keyboard)
 
         except Exception as e:
-            logger.error(f"Ошибка отправки места: {e}")
\ No newline at end of file
+            logger.error(f"Ошибка отправки места: {e}")
+        finally:
+            # Фото не понадобилось (ошибка до отправки) — отменяем подготовку
+            if photo_task is not None:
+                photo_task.cancel()
+                photo_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def _track_photo(self, sent: "asyncio.Future", photo_name: str, photo: Union[str, bytes]) -> None:
+        """Запоминает file_id загруженного фото или забывает отклоненный после отправки."""
+        try:
+            message = await sent
+        except Exception:
+            return
+        try:
+            if message.photo and isinstance(photo, bytes):
+                # Загруженное фото в следующий раз отправляется по file_id
+                await self.photos.remember(photo_name, message.photo[-1].file_id)
+            elif not message.photo and isinstance(photo, str):
+                # Telegram не принял file_id — место ушло текстом
+                await self.photos.forget(photo_name)
+        except Exception as e:
+            logger.warning(f"Не удалось обновить file_id фото: {e}")
+
+    @staticmethod
+    async def _await_photo(photo_task: Optional["asyncio.Task"]) -> Optional[Union[str, bytes]]:
+        """Дожидается подготовки фото; при ошибке место отправляется без фото."""
+        if photo_task is None:
+            return None
+        try:
+            return await photo_task
+        except Exception as e:
+            logger.warning(f"Не удалось подготовить фото: {e}")
+            return None
\ No newline at end of file
@@ -1,8 +1,10 @@
 from telegram.ext import ApplicationBuilder, Application
 from loguru import logger
-from city_expert.utils.config_loader import load_config
+from city_expert.utils.config_loader import api_config, load_config
 from city_expert.models.database import init_db
+from city_expert.models.executor import db_executor
 from city_expert.services.places_api import PlacesAPI
+from city_expert.services.update_processor import ChatOrderedUpdateProcessor
 from city_expert.handlers.search_controller import SearchController
 import asyncio
 import sys
@@ -46,10 +48,12 @@ async def run_bot():
             async def on_bot_shutdown(_: Application):
                 logger.info("Bot shutdown completed")
 
-            # Создаем приложение Telegram-бота с использованием токена и обработчиков событий
+            # Создаем приложение Telegram-бота с использованием токена и обработчиков событий.
+            # Обновления разных чатов обрабатываются параллельно, одного чата — по порядку
             app = (
                 ApplicationBuilder()
                 .token(config.TELEGRAM_BOT_TOKEN)
+                .concurrent_updates(ChatOrderedUpdateProcessor(**api_config.UPDATE_PROCESSOR))
                 .post_init(on_bot_startup)
                 .post_shutdown(on_bot_shutdown)
                 .build()
@@ -57,24 +61,33 @@ async def run_bot():
 
             logger.debug("Registering handlers...")
             # Регистрируем контроллер, который добавляет обработчики команд и сообщений
-            SearchController(app, api)
-
-            logger.info("Starting bot...")
-            # Инициализируем приложение (подключение к Telegram API)
-            await app.initialize()
-
-            # Запускаем polling - опрос Telegram сервера для получения обновлений
-            if app.updater:
-                logger.debug("Starting polling...")
-                await app.updater.start_polling()
-
-            # Запускаем приложение (бот становится активен)
-            await app.start()
-            logger.success("Bot is now running")
-
-            # Удерживаем программу в активном состоянии, чтобы бот работал постоянно
-            while True:
-                await asyncio.sleep(3600)
+            controller = SearchController(app, api)
+
+            try:
+                logger.info("Starting bot...")
+                # Инициализируем приложение (подключение к Telegram API)
+                await app.initialize()
+
+                # Заранее открываем соединения к Places API, чтобы первые запросы не ждали TLS-рукопожатия
+                await api.warm_up()
+
+                # Запускаем polling - опрос Telegram сервера для получения обновлений
+                if app.updater:
+                    logger.debug("Starting polling...")
+                    await app.updater.start_polling()
+
+                # Запускаем приложение (бот становится активен)
+                await app.start()
+                logger.success("Bot is now running")
+
+                # Удерживаем программу в активном состоянии и периодически логируем статистику
+                while True:
+                    await asyncio.sleep(api_config.STATS["interval"])
+                    log_stats(app, api, controller)
+            finally:
+                # Останавливаем прием и обработку обновлений, пока клиент API еще открыт
+                await stop_app(app)
+                log_stats(app, api, controller)
 
     except asyncio.CancelledError:
         # Обработка сигнала отмены (например, при остановке приложения)
@@ -88,10 +101,43 @@ async def run_bot():
         await shutdown()
 
 
+async def stop_app(app: Application):
+    """Останавливает polling и приложение, если они запущены, и освобождает его ресурсы."""
+    try:
+        if app.updater and app.updater.running:
+            await app.updater.stop()
+        if app.running:
+            await app.stop()
+        # Завершает и обработчик обновлений (он логирует итоговое ожидание обновлений)
+        await app.shutdown()
+    except Exception as e:
+        logger.error(f"Application stop error: {e}")
+
+
+def log_stats(app: Application, api: PlacesAPI, controller: SearchController):
+    """Логирует статистику обработки обновлений, отправки сообщений, запросов к API и БД."""
+    logger.info(f"Update processor stats: {app.update_processor.stats().as_dict()}")
+    logger.info(f"Send scheduler stats: {controller.sender.stats().as_dict()}")
+    logger.info(f"API quota stats: {api.quota_stats().as_dict()}")
+    logger.info(f"API pool stats: {api.pool_stats().as_dict()}")
+    hedge_stats = api.hedge_stats()
+    if hedge_stats is not None:
+        logger.info(f"API hedge stats: {hedge_stats.as_dict()}")
+    for kind, stats in db_executor.stats().items():
+        logger.info(f"DB {kind} stats: {stats.as_dict()}")
+
+
 async def shutdown():
     """Функция корректного завершения работы бота."""
     try:
         from city_expert.models.database import db_proxy
+        from city_expert.models.executor import db_executor
+        from city_expert.models.history_writer import history_writer
+        from city_expert.services.callback_registry import callback_registry
+        # Записываем буферы истории и кнопок и дожидаемся запросов к БД до закрытия соединения
+        await history_writer.close()
+        await callback_registry.close()
+        db_executor.close()
         if db_proxy.is_connection_usable():
             db_proxy.close()
         logger.info("All connections closed")
@@ -113,12 +159,17 @@ def main():
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
 
+        # Запускаем основную асинхронную функцию бота
+        bot_task = loop.create_task(run_bot())
         try:
-            # Запускаем основную асинхронную функцию бота
-            loop.run_until_complete(run_bot())
+            loop.run_until_complete(bot_task)
         except KeyboardInterrupt:
             # Обработка прерывания пользователем (Ctrl+C)
             logger.info("Bot stopped by user")
+            # Отменяем run_bot, чтобы он остановил приложение и записал статистику
+            if not bot_task.done():
+                bot_task.cancel()
+                loop.run_until_complete(asyncio.gather(bot_task, return_exceptions=True))
         except Exception as e:
             # Логируем неожиданные ошибки
             logger.critical(f"Unexpected error: {e}")
@@ -9,6 +9,23 @@ from .user_model import User, FavoritePlace
 # Импортируем модель истории поиска
 from .search_model import SearchModel
 
+# Импортируем модель кэша загруженных в Telegram фотографий
+from .photo_model import PhotoFile
+
+# Импортируем модель данных inline-кнопок
+from .callback_model import CallbackToken
+
+# Импортируем асинхронный слой доступа к данным
+from .executor import DatabaseExecutor, QueryStats, db_executor
+from .history_writer import HistoryWriter, history_writer
+from .repositories import (
+    UserRepository,
+    FavoriteRepository,
+    SearchHistoryRepository,
+    PhotoFileRepository,
+    CallbackTokenRepository,
+)
+
 # Определяем публичный API пакета:
 # При импорте через from <package> import * будут доступны только перечисленные ниже объекты
 __all__ = [
@@ -18,4 +35,16 @@ __all__ = [
     "User",            # Модель пользователя
     "FavoritePlace",   # Модель избранных мест пользователя
     "SearchModel",     # Модель истории поиска
+    "PhotoFile",       # Модель file_id загруженных фотографий мест
+    "CallbackToken",   # Модель данных inline-кнопок по токену
+    "DatabaseExecutor",         # Потоки для запросов к БД вне цикла событий
+    "QueryStats",               # Статистика очереди и времени запросов
+    "db_executor",              # Общий исполнитель запросов к БД
+    "HistoryWriter",            # Пакетная отложенная запись истории поиска
+    "history_writer",           # Общий буфер записи истории поиска
+    "UserRepository",           # Асинхронный доступ к пользователям
+    "FavoriteRepository",       # Асинхронный доступ к избранному
+    "SearchHistoryRepository",  # Асинхронный доступ к истории поиска
+    "PhotoFileRepository",      # Асинхронный доступ к file_id фотографий
+    "CallbackTokenRepository",  # Асинхронный доступ к данным inline-кнопок
 ]
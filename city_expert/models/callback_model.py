@@ -0,0 +1,19 @@
+from peewee import CharField, DateTimeField, TextField
+from datetime import datetime
+from .base_model import BaseModel
+
+
+class CallbackToken(BaseModel):
+    """
+    Модель данных inline-кнопок, на которые ссылается короткий токен.
+
+    В callback_data кнопки передается только токен, а действие и его
+    параметры хранятся на сервере — так данные не упираются в лимит
+    Telegram в 64 байта и переживают перезапуск бота.
+    """
+    token = CharField(max_length=32, unique=True)  # Токен из callback_data
+    payload = TextField()  # Действие и его параметры в JSON
+    created_at = DateTimeField(default=datetime.now, index=True)  # Дата и время создания кнопки
+
+    class Meta:
+        table_name = "callback_tokens"  # Название таблицы в базе данных
@@ -100,7 +100,8 @@ def configure_sqlite(db_path: str) -> SqliteDatabase:
                 'foreign_keys': 1,
                 'synchronous': 0,
                 'temp_store': 'memory',
-                'locking_mode': 'exclusive'
+                # Обычный режим блокировок: потоки-читатели открывают свои соединения
+                'locking_mode': 'normal'
             }
         )
         logger.debug("SQLite configured successfully", db_path=db_path)
@@ -122,8 +123,10 @@ def create_tables() -> list:
         # Ленивый импорт для избежания циклических зависимостей
         from .user_model import User, FavoritePlace
         from .search_model import SearchModel
+        from .photo_model import PhotoFile
+        from .callback_model import CallbackToken
 
-        tables = [User, FavoritePlace, SearchModel]
+        tables = [User, FavoritePlace, SearchModel, PhotoFile, CallbackToken]
         created_tables = []
 
         with db_proxy.connection_context():
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, TypeVar
+from loguru import logger
+from city_expert.utils.config_loader import api_config
+from .database import db_proxy
+
+T = TypeVar("T")
+
+
+@dataclass
+class QueryStats:
+    """Статистика выполнения запросов к БД в одном пуле потоков."""
+    queries: int = 0            # выполнено запросов
+    pending: int = 0            # запросов в очереди и в работе сейчас
+    errors: int = 0             # запросов, завершившихся ошибкой
+    total_wait: float = 0.0     # суммарное ожидание в очереди (сек)
+    max_wait: float = 0.0       # максимальное ожидание в очереди (сек)
+    total_time: float = 0.0     # суммарное время выполнения (сек)
+    max_time: float = 0.0       # максимальное время выполнения (сек)
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.queries if self.queries else 0.0
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.queries if self.queries else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "avg_wait": self.avg_wait, "avg_time": self.avg_time}
+
+
+class DatabaseExecutor:
+    """Выполняет синхронные запросы peewee вне цикла событий.
+
+    Все записи идут через один поток (SQLite допускает одного писателя,
+    так записи не конкурируют за блокировку), чтения — через пул потоков
+    (в режиме WAL читатели не блокируются писателем). У каждого потока
+    свое соединение с БД.
+    """
+
+    def __init__(self, read_workers: int):
+        """
+        Args:
+            read_workers: Число потоков для запросов на чтение
+        """
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._readers = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="db-reader")
+        self._stats = {"write": QueryStats(), "read": QueryStats()}
+        # Статистику обновляют несколько потоков пула читателей
+        self._stats_lock = threading.Lock()
+
+    def _run(self, stats: QueryStats, submitted: float, atomic: bool, fn: Callable[..., T], *args: Any) -> T:
+        """Выполняет fn в потоке пула, замеряя ожидание в очереди и время запроса."""
+        started = time.monotonic()
+        waited = started - submitted
+        try:
+            db_proxy.connect(reuse_if_open=True)
+            if atomic:
+                with db_proxy.atomic():
+                    return fn(*args)
+            return fn(*args)
+        except Exception:
+            with self._stats_lock:
+                stats.errors += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            with self._stats_lock:
+                stats.queries += 1
+                stats.total_wait += waited
+                stats.max_wait = max(stats.max_wait, waited)
+                stats.total_time += elapsed
+                stats.max_time = max(stats.max_time, elapsed)
+
+    async def _submit(self, kind: str, executor: ThreadPoolExecutor, fn: Callable[..., T], *args: Any) -> T:
+        stats = self._stats[kind]
+        stats.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                executor, self._run, stats, time.monotonic(), kind == "write", fn, *args
+            )
+        finally:
+            stats.pending -= 1
+
+    async def read(self, fn: Callable[..., T], *args: Any) -> T:
+        """Выполняет функцию чтения в пуле читателей.
+
+        Args:
+            fn: Синхронная функция с запросами peewee
+            *args: Аргументы функции
+
+        Returns:
+            Результат fn
+        """
+        return await self._submit("read", self._readers, fn, *args)
+
+    async def write(self, fn: Callable[..., T], *args: Any) -> T:
+        """Выполняет функцию записи в потоке писателя внутри транзакции.
+
+        Args:
+            fn: Синхронная функция с запросами peewee
+            *args: Аргументы функции
+
+        Returns:
+            Результат fn
+        """
+        return await self._submit("write", self._writer, fn, *args)
+
+    def stats(self) -> Dict[str, QueryStats]:
+        """Возвращает статистику очередей и времени запросов (write / read)."""
+        with self._stats_lock:
+            return {kind: QueryStats(**asdict(stats)) for kind, stats in self._stats.items()}
+
+    def close(self) -> None:
+        """Дожидается выполнения поставленных запросов и останавливает потоки."""
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        logger.debug(f"DB executor stopped: {self._stats['write'].queries} writes, "
+                     f"{self._stats['read'].queries} reads")
+
+
+# Общий исполнитель запросов к основной БД бота
+db_executor = DatabaseExecutor(**api_config.DB_EXECUTOR)
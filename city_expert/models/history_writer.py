@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from loguru import logger
+from city_expert.utils.config_loader import api_config
+from .executor import DatabaseExecutor, db_executor
+from .search_model import SearchModel
+
+
+class HistoryWriter:
+    """Отложенная пакетная запись истории поиска.
+
+    Запросы складываются в ограниченный буфер в памяти, фоновая задача
+    записывает их одним insert_many на транзакцию — каждые interval секунд
+    или по накоплении batch_size строк. Если буфер заполнен, добавление
+    ждет освобождения места (обратное давление).
+    """
+
+    def __init__(
+            self,
+            executor: DatabaseExecutor,
+            batch_size: int,
+            interval: float,
+            max_buffer: int,
+    ):
+        """
+        Args:
+            executor: Исполнитель запросов к БД
+            batch_size: Максимум строк в одной транзакции
+            interval: Максимальная задержка записи в секундах
+            max_buffer: Максимум строк в буфере
+        """
+        self._executor = executor
+        self._batch_size = batch_size
+        self._interval = interval
+        self._max_buffer = max_buffer
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0  # записано строк
+        self.dropped = 0  # строк, потерянных из-за ошибок записи
+
+    def _ensure_started(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._max_buffer)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._queue
+
+    async def add(
+            self,
+            user_id: int,
+            query: str,
+            results_count: int,
+            latitude: Optional[float] = None,
+            longitude: Optional[float] = None,
+    ) -> None:
+        """Ставит запрос в очередь на запись в историю.
+
+        Args:
+            user_id: Идентификатор пользователя в БД
+            query: Текст запроса
+            results_count: Количество найденных результатов
+            latitude: Широта поиска
+            longitude: Долгота поиска
+        """
+        await self._ensure_started().put({
+            "user": user_id,
+            "query": query,
+            "results_count": results_count,
+            "latitude": latitude,
+            "longitude": longitude,
+            "created_at": datetime.now(),
+        })
+
+    async def _run(self) -> None:
+        """Фоновая задача: собирает пакеты из буфера и записывает их."""
+        queue = self._queue
+        while True:
+            rows = [await queue.get()]
+            deadline = asyncio.get_running_loop().time() + self._interval
+            while len(rows) < self._batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    rows.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._write(rows)
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            await self._executor.write(lambda: SearchModel.insert_many(rows).execute())
+            self.written += len(rows)
+        except Exception as e:
+            self.dropped += len(rows)
+            logger.error(f"Не удалось записать историю поиска ({len(rows)} строк): {e}")
+        finally:
+            for _ in rows:
+                self._queue.task_done()
+
+    async def flush(self) -> None:
+        """Дожидается записи всех строк, поставленных в очередь к этому моменту."""
+        if self._queue is not None and self._task is not None and not self._task.done():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Записывает остаток буфера и останавливает фоновую задачу."""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.debug(f"История поиска: записано {self.written}, потеряно {self.dropped}")
+
+
+# Общий буфер записи истории поиска
+history_writer = HistoryWriter(db_executor, **api_config.HISTORY_WRITER)
@@ -0,0 +1,18 @@
+from peewee import CharField, DateTimeField
+from datetime import datetime
+from .base_model import BaseModel
+
+
+class PhotoFile(BaseModel):
+    """
+    Модель соответствия фотографии места и загруженного в Telegram файла.
+
+    После первой отправки Telegram возвращает file_id, по которому фото
+    можно отправлять повторно без скачивания и загрузки.
+    """
+    photo_name = CharField(max_length=512, unique=True)  # Имя ресурса фото в Places API (places/.../photos/...)
+    file_id = CharField(max_length=256)  # Идентификатор файла в Telegram
+    created_at = DateTimeField(default=datetime.now)  # Дата и время первой загрузки
+
+    class Meta:
+        table_name = "photo_files"  # Название таблицы в базе данных
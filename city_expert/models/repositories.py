@@ -0,0 +1,152 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from .callback_model import CallbackToken
+from .executor import DatabaseExecutor, db_executor
+from .photo_model import PhotoFile
+from .search_model import SearchModel
+from .user_model import User, FavoritePlace
+
+
+class UserRepository:
+    """Асинхронный доступ к пользователям."""
+
+    def __init__(self, executor: DatabaseExecutor = db_executor):
+        self._executor = executor
+
+    async def get_or_create(self, telegram_id: int, full_name: str, username: Optional[str]) -> Tuple[User, bool]:
+        """Возвращает пользователя и признак того, что он только что создан."""
+        return await self._executor.write(
+            lambda: User.get_or_create(
+                telegram_id=telegram_id,
+                defaults={"full_name": full_name, "username": username},
+            )
+        )
+
+    async def update_names(self, user_id: int, full_name: str, username: Optional[str]) -> None:
+        """Обновляет имя и username пользователя."""
+        await self._executor.write(
+            lambda: User.update(full_name=full_name, username=username).where(User.id == user_id).execute()
+        )
+
+
+class FavoriteRepository:
+    """Асинхронный доступ к избранным местам."""
+
+    def __init__(self, executor: DatabaseExecutor = db_executor):
+        self._executor = executor
+
+    async def place_ids(self, telegram_id: int) -> Set[str]:
+        """Возвращает идентификаторы избранных мест пользователя (одним запросом)."""
+        def query() -> Set[str]:
+            rows = (
+                FavoritePlace.select(FavoritePlace.place_id)
+                .join(User)
+                .where(User.telegram_id == telegram_id)
+            )
+            return {row.place_id for row in rows}
+
+        return await self._executor.read(query)
+
+    async def recent(self, user_id: int) -> List[FavoritePlace]:
+        """Возвращает избранные места пользователя (последние добавленные сначала)."""
+        return await self._executor.read(
+            lambda: list(
+                FavoritePlace.select()
+                .where(FavoritePlace.user == user_id)
+                .order_by(FavoritePlace.added_at.desc())
+            )
+        )
+
+    async def add(self, user_id: int, place_id: str, name: str) -> None:
+        """Добавляет место в избранное (повторное добавление игнорируется)."""
+        await self._executor.write(
+            lambda: FavoritePlace.insert(
+                user=user_id,
+                place_id=place_id,
+                name=name,
+                added_at=datetime.now(),
+            ).on_conflict_ignore().execute()
+        )
+
+    async def remove(self, user_id: int, place_id: str) -> None:
+        """Удаляет место из избранного."""
+        await self._executor.write(
+            lambda: FavoritePlace.delete().where(
+                (FavoritePlace.user == user_id) &
+                (FavoritePlace.place_id == place_id)
+            ).execute()
+        )
+
+
+class SearchHistoryRepository:
+    """Асинхронное чтение истории поиска (запись — пакетами через HistoryWriter)."""
+
+    def __init__(self, executor: DatabaseExecutor = db_executor):
+        self._executor = executor
+
+    async def recent(self, user_id: int, limit: int = 10) -> List[SearchModel]:
+        """Возвращает последние запросы пользователя."""
+        return await self._executor.read(
+            lambda: list(
+                SearchModel.select()
+                .where(SearchModel.user == user_id)
+                .order_by(SearchModel.created_at.desc())
+                .limit(limit)
+            )
+        )
+
+
+class PhotoFileRepository:
+    """Асинхронный доступ к file_id загруженных фотографий."""
+
+    def __init__(self, executor: DatabaseExecutor = db_executor):
+        self._executor = executor
+
+    async def get(self, photo_name: str) -> Optional[str]:
+        """Возвращает file_id фото или None."""
+        def query() -> Optional[str]:
+            record = PhotoFile.get_or_none(PhotoFile.photo_name == photo_name)
+            return record.file_id if record is not None else None
+
+        return await self._executor.read(query)
+
+    async def save(self, photo_name: str, file_id: str) -> None:
+        """Сохраняет (или заменяет) file_id фото."""
+        await self._executor.write(
+            lambda: PhotoFile.insert(photo_name=photo_name, file_id=file_id).on_conflict(
+                conflict_target=[PhotoFile.photo_name],
+                update={PhotoFile.file_id: file_id},
+            ).execute()
+        )
+
+    async def delete(self, photo_name: str) -> None:
+        """Удаляет file_id фото."""
+        await self._executor.write(
+            lambda: PhotoFile.delete().where(PhotoFile.photo_name == photo_name).execute()
+        )
+
+
+class CallbackTokenRepository:
+    """Асинхронный доступ к данным inline-кнопок."""
+
+    def __init__(self, executor: DatabaseExecutor = db_executor):
+        self._executor = executor
+
+    async def get(self, token: str) -> Optional[str]:
+        """Возвращает данные кнопки (JSON) или None."""
+        def query() -> Optional[str]:
+            record = CallbackToken.get_or_none(CallbackToken.token == token)
+            return record.payload if record is not None else None
+
+        return await self._executor.read(query)
+
+    async def save_many(self, payloads: Dict[str, str]) -> None:
+        """Сохраняет данные нескольких кнопок одной транзакцией."""
+        rows = [{"token": token, "payload": payload} for token, payload in payloads.items()]
+        await self._executor.write(lambda: CallbackToken.insert_many(rows).on_conflict_ignore().execute())
+
+    async def purge(self, older_than: datetime) -> int:
+        """Удаляет данные кнопок, созданных раньше older_than; возвращает число удаленных."""
+        return await self._executor.write(
+            lambda: CallbackToken.delete().where(CallbackToken.created_at < older_than).execute()
+        )
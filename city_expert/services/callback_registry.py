@@ -0,0 +1,169 @@
+import asyncio
+import json
+import secrets
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from cachetools import LRUCache
+from city_expert.models import CallbackTokenRepository
+from city_expert.utils.config_loader import api_config
+from city_expert.utils.logger import logger
+
+# Префикс callback_data кнопок, данные которых хранятся в реестре
+CALLBACK_PREFIX = "cb"
+
+
+@dataclass(frozen=True)
+class CallbackAction:
+    """Действие inline-кнопки и его параметры."""
+    action: str                 # map, fav, unfav
+    place_id: str               # идентификатор места (формат FavoritePlace.place_id)
+    name: str = ""              # название места (полностью, без обрезки)
+    user_id: Optional[int] = None  # Telegram ID пользователя, которому показана кнопка
+
+
+class CallbackRegistry:
+    """Реестр данных inline-кнопок по коротким токенам.
+
+    В callback_data передается только `cb:<токен>`, а параметры действия
+    хранятся в LRU-кэше в памяти и в БД: после вытеснения из кэша или
+    перезапуска бота кнопки продолжают работать. Токен доступен сразу после
+    регистрации, а в БД записывается отложенно — пакетами в фоновой задаче
+    (как история поиска в HistoryWriter). Та же задача по таймеру удаляет
+    из БД записи старше max_age.
+    """
+
+    def __init__(
+            self,
+            repository: CallbackTokenRepository,
+            max_tokens: int,
+            max_age: float,
+            purge_interval: float,
+            batch_size: int,
+            interval: float,
+            max_buffer: int,
+    ):
+        """
+        Args:
+            repository: Хранилище данных кнопок в БД
+            max_tokens: Сколько токенов держать в памяти (LRU)
+            max_age: Срок хранения данных кнопок в БД (сек)
+            purge_interval: Как часто удалять устаревшие данные кнопок (сек)
+            batch_size: Максимум токенов в одной транзакции записи
+            interval: Максимальная задержка записи в секундах
+            max_buffer: Максимум токенов, ожидающих записи
+        """
+        self._repository = repository
+        self._actions: LRUCache = LRUCache(maxsize=max_tokens)
+        self._max_age = max_age
+        self._purge_interval = purge_interval
+        self._batch_size = batch_size
+        self._interval = interval
+        self._max_buffer = max_buffer
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._purger: Optional[asyncio.Task] = None
+
+    def _ensure_started(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._max_buffer)
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._run())
+        if self._purger is None or self._purger.done():
+            self._purger = asyncio.create_task(self._purge_periodically())
+        return self._queue
+
+    async def register(self, actions: List[CallbackAction]) -> List[str]:
+        """Сохраняет действия кнопок и возвращает их callback_data.
+
+        Токены сразу доступны из памяти; запись в БД откладывается
+        (ожидание только при переполненном буфере записи).
+
+        Args:
+            actions: Действия кнопок
+
+        Returns:
+            List[str]: callback_data для каждой кнопки (в том же порядке)
+        """
+        queue = self._ensure_started()
+        tokens = [secrets.token_urlsafe(8) for _ in actions]
+        for token, action in zip(tokens, actions):
+            self._actions[token] = action
+            await queue.put((token, json.dumps(asdict(action), ensure_ascii=False)))
+        return [f"{CALLBACK_PREFIX}:{token}" for token in tokens]
+
+    async def resolve(self, callback_data: str) -> Optional[CallbackAction]:
+        """Возвращает действие кнопки по callback_data или None, если оно неизвестно.
+
+        Args:
+            callback_data: Данные нажатой кнопки (`cb:<токен>`)
+        """
+        prefix, _, token = callback_data.partition(":")
+        if prefix != CALLBACK_PREFIX or not token:
+            return None
+        action = self._actions.get(token)
+        if action is None:
+            # Токен мог быть вытеснен из памяти до записи в БД
+            await self.flush()
+            payload = await self._repository.get(token)
+            if payload is None:
+                return None
+            action = self._actions[token] = CallbackAction(**json.loads(payload))
+        return action
+
+    async def _run(self) -> None:
+        """Фоновая задача: собирает пакеты токенов из буфера и записывает их."""
+        queue = self._queue
+        while True:
+            rows = [await queue.get()]
+            deadline = asyncio.get_running_loop().time() + self._interval
+            while len(rows) < self._batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    rows.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._write(dict(rows))
+
+    async def _write(self, payloads: Dict[str, str]) -> None:
+        try:
+            await self._repository.save_many(payloads)
+        except Exception as e:
+            # Кнопки продолжат работать, пока токены в памяти
+            logger.error(f"Не удалось сохранить данные кнопок ({len(payloads)} шт.): {e}")
+        finally:
+            for _ in payloads:
+                self._queue.task_done()
+
+    async def _purge_periodically(self) -> None:
+        """Фоновая задача: раз в purge_interval удаляет устаревшие данные кнопок из БД."""
+        while True:
+            await asyncio.sleep(self._purge_interval)
+            try:
+                removed = await self._repository.purge(datetime.now() - timedelta(seconds=self._max_age))
+                logger.debug(f"Удалено устаревших данных кнопок: {removed}")
+            except Exception as e:
+                logger.warning(f"Не удалось удалить устаревшие данные кнопок: {e}")
+
+    async def flush(self) -> None:
+        """Дожидается записи всех токенов, зарегистрированных к этому моменту."""
+        if self._queue is not None and self._writer is not None and not self._writer.done():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Записывает остаток буфера и останавливает фоновые задачи."""
+        await self.flush()
+        for task in (self._writer, self._purger):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._writer = self._purger = None
+
+
+# Общий реестр данных inline-кнопок
+callback_registry = CallbackRegistry(CallbackTokenRepository(), **api_config.CALLBACKS)
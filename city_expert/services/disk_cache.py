@@ -0,0 +1,136 @@
+import asyncio
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+from peewee import SqliteDatabase, Model, CharField, BlobField, IntegerField, FloatField, fn
+from city_expert.utils.logger import logger
+
+
+class CacheEntry(Model):
+    """Запись дискового кэша ответов Places API."""
+    key = CharField(primary_key=True)       # ключ кэша
+    value = BlobField()                     # сжатые сериализованные данные
+    size = IntegerField()                   # размер значения в байтах
+    created_at = FloatField()               # время записи (unix time)
+    accessed_at = FloatField(index=True)    # время последнего чтения (для LRU)
+
+    class Meta:
+        table_name = "places_cache"
+
+
+class DiskCache:
+    """Второй уровень кэша поверх SQLite, переживающий перезапуск бота.
+
+    Значения хранятся сжатыми (zlib), имеют собственный TTL и ограничены
+    суммарным размером в байтах с вытеснением давно не читавшихся записей (LRU).
+    Все операции выполняются в отдельном потоке, чтобы не блокировать цикл событий.
+    """
+
+    def __init__(self, path: str, ttl: float, max_bytes: int):
+        """
+        Args:
+            path: Путь к файлу SQLite
+            ttl: Время жизни записи в секундах
+            max_bytes: Максимальный суммарный размер значений в байтах
+        """
+        self._path = path
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._db: Optional[SqliteDatabase] = None
+        self._total_bytes = 0
+        # Один поток — все обращения к файлу кэша последовательны
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="disk-cache")
+
+    def _open(self) -> SqliteDatabase:
+        """Лениво открывает базу кэша и создает таблицу."""
+        if self._db is None:
+            Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+            db = SqliteDatabase(self._path, pragmas={"journal_mode": "wal", "synchronous": 1})
+            db.bind([CacheEntry])
+            db.connect(reuse_if_open=True)
+            db.create_tables([CacheEntry], safe=True)
+            self._db = db
+            self._total_bytes = CacheEntry.select(fn.COALESCE(fn.SUM(CacheEntry.size), 0)).scalar()
+            logger.debug(f"Дисковый кэш открыт: {self._path} ({self._total_bytes} байт)")
+        return self._db
+
+    def _get(self, key: str) -> Optional[bytes]:
+        self._open()
+        entry = CacheEntry.get_or_none(CacheEntry.key == key)
+        if entry is None:
+            return None
+        now = time.time()
+        if now - entry.created_at > self._ttl:
+            self._delete(entry)
+            return None
+        CacheEntry.update(accessed_at=now).where(CacheEntry.key == key).execute()
+        return zlib.decompress(entry.value)
+
+    def _set(self, key: str, value: bytes) -> None:
+        db = self._open()
+        blob = zlib.compress(value)
+        if len(blob) > self._max_bytes:
+            return
+        now = time.time()
+        with db.atomic():
+            old = CacheEntry.get_or_none(CacheEntry.key == key)
+            if old is not None:
+                self._total_bytes -= old.size
+            CacheEntry.replace(
+                key=key, value=blob, size=len(blob), created_at=now, accessed_at=now
+            ).execute()
+            self._total_bytes += len(blob)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Удаляет просроченные, а затем давно не читавшиеся записи до соблюдения лимита."""
+        if self._total_bytes <= self._max_bytes:
+            return
+        expired = CacheEntry.created_at < time.time() - self._ttl
+        for entry in list(CacheEntry.select(CacheEntry.key, CacheEntry.size).where(expired)):
+            self._delete(entry)
+        query = CacheEntry.select(CacheEntry.key, CacheEntry.size).order_by(CacheEntry.accessed_at)
+        while self._total_bytes > self._max_bytes:
+            victims = list(query.limit(64))
+            if not victims:
+                break
+            for entry in victims:
+                if self._total_bytes <= self._max_bytes:
+                    break
+                self._delete(entry)
+
+    def _delete(self, entry: CacheEntry) -> None:
+        CacheEntry.delete().where(CacheEntry.key == entry.key).execute()
+        self._total_bytes -= entry.size
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Возвращает значение по ключу или None, если записи нет или она устарела."""
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._get, key)
+        except Exception as e:
+            logger.warning(f"Ошибка чтения дискового кэша: {e}")
+            return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        """Сохраняет значение по ключу."""
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._set, key, value)
+        except Exception as e:
+            logger.warning(f"Ошибка записи в дисковый кэш: {e}")
+
+    def _close(self) -> None:
+        if self._db is not None and not self._db.is_closed():
+            self._db.close()
+        self._db = None
+
+    async def close(self) -> None:
+        """Закрывает соединение с базой кэша (в том же рабочем потоке)."""
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._close)
+        except Exception as e:
+            logger.warning(f"Ошибка закрытия дискового кэша: {e}")
@@ -1,3 +1,4 @@
+from typing import Optional
 
 
 class APIError(Exception):
@@ -24,3 +25,37 @@ class RateLimitError(APIError):
     """
 
     pass
+
+
+class QuotaExceededError(RateLimitError):
+    """Исчерпана глобальная квота запросов к API
+    Запрос не дождался разрешения планировщика до истечения дедлайна.
+    """
+
+    pass
+
+
+class UpstreamError(APIError):
+    """API недоступно или вернуло ошибку
+    Возникает после исчерпания повторов при сетевых ошибках и ответах 429/5xx.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class UpstreamTimeoutError(UpstreamError):
+    """API не ответило в пределах бюджета времени на поиск
+    Возникает, если за отведенное время нет ни ответа, ни данных в кэше.
+    """
+
+    pass
+
+
+class CircuitOpenError(APIError):
+    """Автоматический выключатель разомкнут
+    После серии неудач запросы к API временно отклоняются без обращения к сети.
+    """
+
+    pass
@@ -0,0 +1,47 @@
+from typing import Set
+from cachetools import LRUCache
+from city_expert.models import FavoriteRepository
+
+
+class FavoritesCache:
+    """Кэш множеств избранных мест пользователей.
+
+    Множество пользователя загружается одним запросом при первом обращении,
+    дальше проверка «в избранном ли место» не обращается к БД. Изменения
+    избранного через бота применяются к кэшу сразу после записи в БД.
+    """
+
+    def __init__(self, repository: FavoriteRepository, max_users: int):
+        """
+        Args:
+            repository: Доступ к избранному в БД
+            max_users: Сколько пользователей держать в кэше (LRU)
+        """
+        self._repository = repository
+        self._favorites: LRUCache = LRUCache(maxsize=max_users)
+
+    async def get(self, telegram_id: int) -> Set[str]:
+        """Возвращает идентификаторы избранных мест пользователя.
+
+        Args:
+            telegram_id: Идентификатор пользователя в Telegram
+
+        Returns:
+            Set[str]: Идентификаторы мест (формат FavoritePlace.place_id)
+        """
+        favorites = self._favorites.get(telegram_id)
+        if favorites is None:
+            favorites = self._favorites[telegram_id] = await self._repository.place_ids(telegram_id)
+        return favorites
+
+    def add(self, telegram_id: int, place_id: str) -> None:
+        """Отмечает место избранным в кэше (если множество пользователя загружено)."""
+        favorites = self._favorites.get(telegram_id)
+        if favorites is not None:
+            favorites.add(place_id)
+
+    def discard(self, telegram_id: int, place_id: str) -> None:
+        """Убирает место из избранного в кэше."""
+        favorites = self._favorites.get(telegram_id)
+        if favorites is not None:
+            favorites.discard(place_id)
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class HedgeStats:
+    """Статистика задержек и дублирующих (hedged) запросов."""
+    samples: int = 0            # замеров задержки в окне
+    p50: float = 0.0            # медиана задержки (сек)
+    p95: float = 0.0            # 95-й перцентиль задержки (сек)
+    hedges_sent: int = 0        # отправлено дублирующих запросов
+    hedges_won: int = 0         # дублирующий запрос ответил первым
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class LatencyTracker:
+    """Скользящее окно последних задержек ответа с расчетом перцентилей."""
+
+    def __init__(self, window: int = 200):
+        """
+        Args:
+            window: Количество последних замеров, по которым считаются перцентили
+        """
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        """Добавляет замер задержки."""
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> float:
+        """Возвращает p-й перцентиль задержки (0, если замеров нет)."""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class Hedger:
+    """Дублирует медленные запросы: если ответ не пришел за время p-го перцентиля
+    недавних задержек, отправляется второй такой же запрос, и побеждает первый ответ.
+    """
+
+    def __init__(self, percentile: float, min_delay: float, min_samples: int, window: int = 200):
+        """
+        Args:
+            percentile: Перцентиль задержки, после которого отправляется дубль
+            min_delay: Минимальная задержка перед дублем (сек)
+            min_samples: Сколько замеров нужно, прежде чем включать дублирование
+            window: Размер окна замеров задержки
+        """
+        self._percentile = percentile
+        self._min_delay = min_delay
+        self._min_samples = min_samples
+        self._latency = LatencyTracker(window)
+        self._hedges_sent = 0
+        self._hedges_won = 0
+
+    def delay(self) -> Optional[float]:
+        """Задержка перед дублем или None, если статистики пока недостаточно."""
+        if len(self._latency) < self._min_samples:
+            return None
+        return max(self._min_delay, self._latency.percentile(self._percentile))
+
+    async def _timed(self, call: Callable[[], Awaitable[T]]) -> T:
+        started = time.monotonic()
+        result = await call()
+        self._latency.record(time.monotonic() - started)
+        return result
+
+    async def run(self, call: Callable[[], Awaitable[T]], can_hedge: Callable[[], bool]) -> T:
+        """Выполняет call() с возможным дублированием.
+
+        Args:
+            call: Функция, создающая корутину запроса
+            can_hedge: Проверка, можно ли отправить дубль (например, есть ли квота)
+
+        Returns:
+            Результат первого успешно завершившегося запроса
+        """
+        delay = self.delay()
+        primary = asyncio.ensure_future(self._timed(call))
+        tasks = {primary}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and can_hedge():
+                    self._hedges_sent += 1
+                    tasks.add(asyncio.ensure_future(self._timed(call)))
+
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._hedges_won += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            # Проигравший (или брошенный при отмене) запрос больше не нужен
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> HedgeStats:
+        """Возвращает статистику задержек и дублей."""
+        return HedgeStats(
+            samples=len(self._latency),
+            p50=self._latency.percentile(50),
+            p95=self._latency.percentile(95),
+            hedges_sent=self._hedges_sent,
+            hedges_won=self._hedges_won,
+        )
@@ -0,0 +1,283 @@
+import asyncio
+import bisect
+import html
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+from cachetools import TTLCache
+from telegram import InlineQueryResultArticle, InputTextMessageContent
+from city_expert.services.exceptions import APIError
+from city_expert.services.places_api import Place, PlacesAPI
+from city_expert.services.query_classifier import query_classifier
+from city_expert.services.rate_limiter import SlidingWindowLimiter
+from city_expert.utils.config_loader import api_config
+from city_expert.utils.geo import geo_cell
+from city_expert.utils.logger import logger
+
+# Ключ кэша: (ячейка сетки или "global", нормализованный запрос)
+InlineKey = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class InlineAnswer:
+    """Ответ на inline-запрос и параметры его кэширования в Telegram."""
+    results: List[InlineQueryResultArticle]
+    cache_time: int       # секунд, которые Telegram может отдавать ответ из своего кэша
+    is_personal: bool     # кэшировать ли ответ только для этого пользователя
+
+
+class InlineResultCache:
+    """Кэш готовых результатов inline-запросов с поиском по префиксу.
+
+    Ключи дополнительно хранятся в отсортированном списке, поэтому для
+    запроса «каф» двоичным поиском находятся результаты уже выполненного
+    «кафе» в той же ячейке. Устаревшие ключи удаляются из списка при обращении.
+    """
+
+    def __init__(self, max_queries: int, ttl: float):
+        """
+        Args:
+            max_queries: Сколько запросов держать в кэше
+            ttl: Время жизни результатов в секундах
+        """
+        self._results: TTLCache = TTLCache(maxsize=max_queries, ttl=ttl)
+        self._keys: List[InlineKey] = []
+        self._max_queries = max_queries
+
+    def get(self, key: InlineKey) -> Optional[Tuple[InlineKey, List[InlineQueryResultArticle]]]:
+        """Возвращает результаты запроса или более длинного запроса, начинающегося с него.
+
+        Returns:
+            Optional[Tuple[InlineKey, List[InlineQueryResultArticle]]]: Ключ найденной
+                записи (совпадает с key только при точном попадании) и ее результаты
+        """
+        results = self._results.get(key)
+        if results is not None:
+            return key, results
+        area, query = key
+        index = bisect.bisect_left(self._keys, key)
+        while index < len(self._keys):
+            candidate = self._keys[index]
+            if candidate[0] != area or not candidate[1].startswith(query):
+                return None
+            results = self._results.get(candidate)
+            if results is not None:
+                return candidate, results
+            # Запись истекла или вытеснена — убираем ключ из индекса
+            del self._keys[index]
+        return None
+
+    def put(self, key: InlineKey, results: List[InlineQueryResultArticle]) -> None:
+        """Сохраняет результаты запроса."""
+        if key not in self._results:
+            bisect.insort(self._keys, key)
+        self._results[key] = results
+        if len(self._keys) > 2 * self._max_queries:
+            # Индекс разросся из-за вытесненных ключей — перестраиваем по кэшу
+            self._keys = sorted(self._results.keys())
+
+
+def same_meaning(query: str, cached_query: str) -> bool:
+    """Можно ли ответить на запрос результатами более длинного запроса.
+
+    Да, если классификатор относит оба запроса к одним и тем же типам мест
+    и в более длинном запросе нет лишних слов («кино» → «кинотеатр»,
+    но не «бар» → «барбершоп» и не «кино» → «кинотеатр imax»).
+    """
+    if len(query.split()) != len(cached_query.split()):
+        return False
+    types = query_classifier.classify(query)
+    return bool(types) and types == query_classifier.classify(cached_query)
+
+
+class InlineSearch:
+    """Поиск мест для inline-режима (`@bot кафе` в любом чате).
+
+    Telegram присылает inline-запрос на каждое нажатие клавиши, поэтому
+    запрос пользователя выполняется только если за время debounce не пришел
+    следующий; устаревшие запросы остаются без ответа. Результаты берутся из
+    кэша inline-ответов или через PlacesAPI с его общим кэшем результатов.
+
+    Результаты более длинного запроса по префиксу переиспользуются, только
+    если запросы означают одно и то же. Иначе они отдаются как временный
+    ответ (короткое кэширование, только для этого пользователя), а в фоне
+    выполняется настоящий поиск. Если пользователь стирает собственный запрос
+    («кафе» → «каф»), временного ответа достаточно и API не вызывается.
+
+    У inline-режима свой лимит запросов на пользователя, не расходующий
+    лимит обычного поиска в чате.
+    """
+
+    def __init__(
+            self,
+            api: PlacesAPI,
+            debounce: float,
+            min_query_length: int,
+            max_results: int,
+            timeout: float,
+            max_queries: int,
+            ttl: float,
+            cache_time: int,
+            provisional_cache_time: int,
+            rate_limit: Dict[str, int],
+    ):
+        """
+        Args:
+            api: API для поиска мест
+            debounce: Пауза ввода (сек), после которой запрос выполняется
+            min_query_length: Минимальная длина запроса
+            max_results: Максимум результатов в ответе
+            timeout: Время на поиск (сек), чтобы уложиться в ожидание Telegram
+            max_queries: Размер кэша inline-ответов
+            ttl: Время жизни кэша inline-ответов (сек)
+            cache_time: Сколько секунд Telegram может кэшировать ответ у себя
+            provisional_cache_time: То же для временного ответа по префиксу
+            rate_limit: Лимит inline-поисков пользователя (requests за period секунд)
+        """
+        self._api = api
+        self._debounce = debounce
+        self._min_query_length = min_query_length
+        self._max_results = max_results
+        self._timeout = timeout
+        self._cache = InlineResultCache(max_queries, ttl)
+        self._cache_time = cache_time
+        self._provisional_cache_time = provisional_cache_time
+        self._limiter = SlidingWindowLimiter(limit=rate_limit["requests"], period=rate_limit["period"])
+        self._latest: Dict[int, str] = {}  # user_id -> id последнего inline-запроса
+        self._previous: TTLCache = TTLCache(maxsize=max_queries, ttl=ttl)  # user_id -> предыдущий запрос
+        self._refreshes: Set[asyncio.Task] = set()
+
+    async def results(
+            self,
+            inline_query_id: str,
+            user_id: int,
+            query: str,
+            latitude: Optional[float] = None,
+            longitude: Optional[float] = None,
+    ) -> Optional[InlineAnswer]:
+        """Возвращает ответ на inline-запрос.
+
+        Args:
+            inline_query_id: Идентификатор inline-запроса
+            user_id: Telegram ID пользователя
+            query: Текст запроса
+            latitude: Широта пользователя (если он разрешил передавать геолокацию)
+            longitude: Долгота пользователя
+
+        Returns:
+            Optional[InlineAnswer]: Ответ или None, если пользователь уже ввел
+                следующий запрос и отвечать не нужно
+        """
+        # С геолокацией результаты зависят от пользователя
+        personal = latitude is not None and longitude is not None
+        query = PlacesAPI._normalize_query(query)
+        if len(query) < self._min_query_length:
+            return InlineAnswer([], self._cache_time, personal)
+
+        area = "global"
+        if personal:
+            area = "{}:{}:{}".format(*geo_cell(latitude, longitude, api_config.DEFAULT_RADIUS))
+        key = (area, query)
+        previous = self._previous.get(user_id)
+        self._previous[user_id] = key
+        # Новый запрос пользователя отменяет ожидающие предыдущие
+        self._latest[user_id] = inline_query_id
+        hit = self._cache.get(key)
+        if hit is not None:
+            found, results = hit
+            if found == key or same_meaning(query, found[1]):
+                self._latest.pop(user_id, None)
+                return InlineAnswer(results, self._cache_time, personal)
+            if previous is not None and previous[0] == area and previous[1].startswith(query):
+                # Пользователь стирает свой запрос и, скорее всего, наберет новый — без запроса к API
+                self._latest.pop(user_id, None)
+                return InlineAnswer(results, self._provisional_cache_time, True)
+            # Похожий, но другой запрос: временный ответ, настоящий поиск — в фоне
+            refresh = asyncio.create_task(
+                self._refresh(inline_query_id, user_id, key, latitude, longitude)
+            )
+            self._refreshes.add(refresh)
+            refresh.add_done_callback(self._refreshes.discard)
+            return InlineAnswer(results, self._provisional_cache_time, True)
+
+        if not await self._debounced(inline_query_id, user_id):
+            return None
+        results = await self._search(user_id, key, latitude, longitude)
+        return InlineAnswer(results or [], self._cache_time, personal)
+
+    async def _debounced(self, inline_query_id: str, user_id: int) -> bool:
+        """Ждет паузы ввода; False, если за это время пришел новый запрос пользователя."""
+        await asyncio.sleep(self._debounce)
+        if self._latest.get(user_id) != inline_query_id:
+            return False
+        self._latest.pop(user_id, None)
+        return True
+
+    async def _refresh(
+            self,
+            inline_query_id: str,
+            user_id: int,
+            key: InlineKey,
+            latitude: Optional[float],
+            longitude: Optional[float],
+    ) -> None:
+        """Выполняет настоящий поиск вместо временного ответа по префиксу."""
+        if await self._debounced(inline_query_id, user_id):
+            await self._search(user_id, key, latitude, longitude)
+
+    async def _search(
+            self,
+            user_id: int,
+            key: InlineKey,
+            latitude: Optional[float],
+            longitude: Optional[float],
+    ) -> Optional[List[InlineQueryResultArticle]]:
+        """Ищет места и кэширует результаты; None, если поиск не удался."""
+        # Пока ждали, результаты мог получить другой пользователь
+        hit = self._cache.get(key)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+
+        query = key[1]
+        if not self._limiter.allow(user_id):
+            logger.warning(f"Превышен лимит inline-запросов для пользователя {user_id}")
+            return None
+
+        # Лимит пользователя уже проверен — лимит обычного поиска не расходуем (user_id не передается).
+        # Поиск продолжается и после тайм-аута, чтобы результат попал в кэш для следующего запроса
+        search = asyncio.ensure_future(self._api.search(query, latitude, longitude))
+        search.add_done_callback(lambda task: task.cancelled() or task.exception())
+        try:
+            places = await asyncio.wait_for(asyncio.shield(search), self._timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Inline-поиск '{query}' не уложился в {self._timeout} с")
+            return None
+        except (APIError, ValueError) as e:
+            logger.warning(f"Inline search error: {e}")
+            return None
+
+        # Telegram отклоняет ответ с повторяющимися id результатов
+        articles = {}
+        for place in places:
+            article = self._build_article(place)
+            articles.setdefault(article.id, article)
+        results = list(articles.values())[:self._max_results]
+        self._cache.put(key, results)
+        return results
+
+    @staticmethod
+    def _build_article(place: Place) -> InlineQueryResultArticle:
+        """Формирует inline-результат для места."""
+        place_id = f"{place.latitude:.6f},{place.longitude:.6f}"
+        result_id = place.place_id or place_id
+        text = (
+            f"📍 <b>{html.escape(place.name)}</b>\n"
+            f"📌 <i>{html.escape(place.address)}</i>\n"
+            f"⭐ Рейтинг: {place.rating or 'нет'}\n"
+            f"🗺 <a href='https://www.google.com/maps?q={place_id}'>Открыть на карте</a>"
+        )
+        return InlineQueryResultArticle(
+            id=result_id,
+            title=place.name,
+            description=f"⭐ {place.rating or 'нет'} · {place.address}",
+            input_message_content=InputTextMessageContent(text, parse_mode="HTML"),
+        )
@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Смещение от UTC, если API его не вернуло (места ищутся в России, берем Москву)
+DEFAULT_UTC_OFFSET_MINUTES = 180
+
+Interval = Tuple[int, int]
+
+
+def _point_minute(point: Dict[str, Any]) -> int:
+    """Минута недели для точки периода Places API (day: 0 — воскресенье)."""
+    return (point.get("day", 0) * MINUTES_PER_DAY + point.get("hour", 0) * 60 + point.get("minute", 0)) % MINUTES_PER_WEEK
+
+
+def compile_periods(periods: Iterable[Dict[str, Any]]) -> List[Interval]:
+    """Компилирует periods из ответа API в отсортированные непересекающиеся интервалы.
+
+    Интервал — пара минут недели [начало, конец), отсчет с 00:00 воскресенья.
+    Периоды через полночь воскресенья разбиваются на два интервала;
+    период без закрытия означает круглосуточную работу.
+
+    Args:
+        periods: Периоды currentOpeningHours.periods
+
+    Returns:
+        List[Interval]: Компактное недельное расписание
+    """
+    intervals: List[Interval] = []
+    for period in periods:
+        if "open" not in period:
+            continue
+        if "close" not in period:
+            return [(0, MINUTES_PER_WEEK)]
+        start, end = _point_minute(period["open"]), _point_minute(period["close"])
+        if end > start:
+            intervals.append((start, end))
+        else:
+            intervals.append((start, MINUTES_PER_WEEK))
+            if end:
+                intervals.append((0, end))
+
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def week_minute(moment: datetime, utc_offset: Optional[int] = None) -> int:
+    """Минута недели по местному времени места.
+
+    Args:
+        moment: Момент времени (наивный считается UTC)
+        utc_offset: Смещение места от UTC в минутах
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    offset = DEFAULT_UTC_OFFSET_MINUTES if utc_offset is None else utc_offset
+    local = moment.astimezone(timezone.utc) + timedelta(minutes=offset)
+    # datetime.weekday(): понедельник — 0; в Places API воскресенье — 0
+    day = (local.weekday() + 1) % 7
+    return day * MINUTES_PER_DAY + local.hour * 60 + local.minute
+
+
+class WeeklySchedule:
+    """Скомпилированное недельное расписание: интервалы и битовая карта минут недели."""
+    __slots__ = ("intervals", "bitmap", "_starts", "_ends")
+
+    def __init__(self, intervals: Sequence[Interval]):
+        """
+        Args:
+            intervals: Результат compile_periods
+        """
+        self.intervals = tuple(intervals)
+        self._starts = np.array([start for start, _ in self.intervals], dtype=np.int32)
+        self._ends = np.array([end for _, end in self.intervals], dtype=np.int32)
+        minutes = np.zeros(MINUTES_PER_WEEK, dtype=bool)
+        for start, end in self.intervals:
+            minutes[start:end] = True
+        # 10080 бит = 1260 байт на место
+        self.bitmap = np.packbits(minutes)
+
+    def is_open_at(self, minute: int) -> bool:
+        """Открыто ли место в заданную минуту недели."""
+        return bool(self.bitmap[minute >> 3] >> (7 - (minute & 7)) & 1)
+
+    def closes_in(self, minute: int) -> Optional[int]:
+        """Через сколько минут место закроется (None — сейчас закрыто или круглосуточно)."""
+        index = int(np.searchsorted(self._starts, minute, side="right")) - 1
+        if index < 0 or minute >= self._ends[index]:
+            return None
+        if self.intervals == ((0, MINUTES_PER_WEEK),):
+            return None
+        end = int(self._ends[index])
+        # Интервал до конца недели может продолжаться с начала следующей
+        if end == MINUTES_PER_WEEK and self.intervals[0][0] == 0:
+            end += self.intervals[0][1]
+        return end - minute
+
+    def opens_in(self, minute: int) -> Optional[int]:
+        """Через сколько минут место откроется (0 — уже открыто, None — расписание пустое)."""
+        if not self.intervals:
+            return None
+        if self.is_open_at(minute):
+            return 0
+        index = int(np.searchsorted(self._starts, minute, side="right"))
+        if index < len(self.intervals):
+            return int(self._starts[index]) - minute
+        return MINUTES_PER_WEEK - minute + int(self._starts[0])
+
+
+@lru_cache(maxsize=4096)
+def _schedule(intervals: Tuple[Interval, ...]) -> WeeklySchedule:
+    return WeeklySchedule(intervals)
+
+
+def schedule_for(opening_hours: Optional[Dict[str, Any]]) -> Optional[WeeklySchedule]:
+    """Возвращает расписание места (общие объекты для одинаковых расписаний).
+
+    Args:
+        opening_hours: Поле Place.opening_hours
+
+    Returns:
+        Optional[WeeklySchedule]: Расписание или None, если оно неизвестно
+    """
+    if not opening_hours or opening_hours.get("weekly") is None:
+        return None
+    return _schedule(tuple(tuple(interval) for interval in opening_hours["weekly"]))
+
+
+def is_open(opening_hours: Optional[Dict[str, Any]], moment: Optional[datetime] = None) -> Optional[bool]:
+    """Открыто ли место в момент moment (по умолчанию сейчас).
+
+    Без расписания используется снимок open_now из ответа API.
+
+    Returns:
+        Optional[bool]: None, если часы работы неизвестны
+    """
+    if not opening_hours:
+        return None
+    schedule = schedule_for(opening_hours)
+    if schedule is None:
+        return opening_hours.get("open_now")
+    minute = week_minute(moment or datetime.now(timezone.utc), opening_hours.get("utc_offset"))
+    return schedule.is_open_at(minute)
+
+
+def closes_in(opening_hours: Optional[Dict[str, Any]], moment: Optional[datetime] = None) -> Optional[int]:
+    """Через сколько минут место закроется (None — закрыто, круглосуточно или неизвестно)."""
+    schedule = schedule_for(opening_hours)
+    if schedule is None:
+        return None
+    minute = week_minute(moment or datetime.now(timezone.utc), opening_hours.get("utc_offset"))
+    return schedule.closes_in(minute)
+
+
+def open_mask(
+        hours: Sequence[Optional[Dict[str, Any]]],
+        moment: Optional[datetime] = None,
+) -> np.ndarray:
+    """Векторно определяет, какие места открыты в момент moment.
+
+    Битовые карты мест с расписанием складываются в матрицу и читаются
+    одной операцией; для остальных используется снимок open_now.
+
+    Args:
+        hours: Поля opening_hours мест
+        moment: Момент времени (по умолчанию сейчас)
+
+    Returns:
+        np.ndarray: Булева маска «открыто»
+    """
+    moment = moment or datetime.now(timezone.utc)
+    result = np.array([bool(h and h.get("open_now")) for h in hours], dtype=bool)
+    schedules = [schedule_for(h) for h in hours]
+    scheduled = [(i, schedule, hours[i].get("utc_offset")) for i, schedule in enumerate(schedules) if schedule]
+    if not scheduled:
+        return result
+
+    indices = np.array([i for i, _, _ in scheduled])
+    bitmaps = np.stack([schedule.bitmap for _, schedule, _ in scheduled])
+    minutes = np.array([week_minute(moment, offset) for _, _, offset in scheduled])
+    bits = bitmaps[np.arange(len(scheduled)), minutes >> 3] >> (7 - (minutes & 7)) & 1
+    result[indices] = bits.astype(bool)
+    return result
@@ -0,0 +1,123 @@
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Union
+from cachetools import LRUCache
+from city_expert.models import PhotoFileRepository
+from city_expert.services.places_api import PlacesAPI
+from city_expert.services.single_flight import SingleFlight
+from city_expert.utils.config_loader import api_config
+from city_expert.utils.logger import logger
+
+
+def _pillow_available() -> bool:
+    """Проверяет, установлен ли Pillow, необходимый для миниатюр."""
+    try:
+        import PIL  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def make_thumbnail(data: bytes, size: int, quality: int) -> bytes:
+    """Уменьшает изображение до size пикселей по большей стороне и пережимает в JPEG.
+
+    Выполняется в пуле потоков: декодирование и масштабирование в Pillow
+    отпускают GIL и не блокируют цикл событий.
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        image.thumbnail((size, size))
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=quality, optimize=True)
+    return output.getvalue()
+
+
+class PhotoPipeline:
+    """Подготовка фото мест для отправки в Telegram.
+
+    Имя фото из Places API превращается в ссылку на изображение, изображение
+    скачивается и уменьшается в пуле потоков. После первой отправки file_id,
+    выданный Telegram, сохраняется в памяти и в БД, и следующие отправки
+    того же фото обходятся без скачивания и загрузки.
+    """
+
+    def __init__(
+            self,
+            api: PlacesAPI,
+            repository: PhotoFileRepository,
+            settings: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            api: Клиент Places API
+            repository: Хранилище file_id в БД
+            settings: Параметры (по умолчанию api_config.PHOTOS)
+        """
+        self._api = api
+        self._repository = repository
+        self._settings = dict(settings or api_config.PHOTOS)
+        self._file_ids: LRUCache = LRUCache(maxsize=self._settings["max_cached_ids"])
+        self._inflight = SingleFlight()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._settings["workers"], thread_name_prefix="photo"
+        )
+        self._thumbnails = _pillow_available()
+        if not self._thumbnails:
+            logger.warning("Пакет Pillow не установлен, фото отправляются без уменьшения")
+
+    @property
+    def enabled(self) -> bool:
+        return self._settings["enabled"]
+
+    async def file_id(self, photo_name: str) -> Optional[str]:
+        """Возвращает сохраненный file_id фото (из памяти или БД)."""
+        file_id = self._file_ids.get(photo_name)
+        if file_id is None:
+            file_id = await self._repository.get(photo_name)
+            if file_id is not None:
+                self._file_ids[photo_name] = file_id
+        return file_id
+
+    async def prepare(self, photo_name: str) -> Union[str, bytes]:
+        """Возвращает то, что можно передать в reply_photo: file_id или байты изображения.
+
+        Одновременные запросы одного фото скачивают его один раз.
+
+        Raises:
+            APIError: Если фото не удалось получить
+        """
+        file_id = await self.file_id(photo_name)
+        if file_id is not None:
+            return file_id
+        return await self._inflight.do(photo_name, lambda: self._download(photo_name))
+
+    async def _download(self, photo_name: str) -> bytes:
+        settings = self._settings
+        photo_uri = await self._api.photo_uri(photo_name, settings["max_width"])
+        data = await self._api.download(photo_uri, settings["max_bytes"])
+        if not self._thumbnails:
+            return data
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, make_thumbnail, data, settings["thumbnail_size"], settings["jpeg_quality"]
+            )
+        except Exception as e:
+            logger.warning(f"Не удалось уменьшить фото {photo_name}: {e}")
+            return data
+
+    async def remember(self, photo_name: str, file_id: str) -> None:
+        """Сохраняет file_id, выданный Telegram после загрузки фото."""
+        self._file_ids[photo_name] = file_id
+        try:
+            await self._repository.save(photo_name, file_id)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить file_id фото: {e}")
+
+    async def forget(self, photo_name: str) -> None:
+        """Удаляет file_id, который Telegram больше не принимает."""
+        self._file_ids.pop(photo_name, None)
+        await self._repository.delete(photo_name)
@@ -0,0 +1,233 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from math import cos, radians
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+from peewee import SqliteDatabase, Model, AutoField, CharField, TextField, FloatField
+from city_expert.utils.geo import METERS_PER_DEGREE, haversine_m, haversine_many
+from city_expert.utils.logger import logger
+
+
+class CatalogPlace(Model):
+    """Место, когда-либо полученное от Places API."""
+    id = AutoField()                              # rowid (ключ в R*Tree-индексе)
+    place_id = CharField(unique=True)             # идентификатор места в Places API
+    types = CharField(default="")                 # типы мест через запятую (",cafe,bar,")
+    data = TextField()                            # сериализованный Place (JSON)
+    updated_at = FloatField()                     # время последнего обновления (unix time)
+
+    class Meta:
+        table_name = "catalog_places"
+
+
+class CatalogCoverage(Model):
+    """Круг, для которого каталог полон по набору типов (результат searchNearby)."""
+    types_key = CharField(index=True)             # отсортированные типы через запятую
+    latitude = FloatField(index=True)             # центр круга
+    longitude = FloatField()
+    radius = FloatField()                         # радиус, в котором известны все места
+    fetched_at = FloatField(index=True)           # время запроса к API (unix time)
+
+    class Meta:
+        table_name = "catalog_coverage"
+
+
+def _bbox(latitude: float, longitude: float, radius: float) -> Sequence[float]:
+    """Ограничивающий прямоугольник круга: (min_lat, max_lat, min_lon, max_lon)."""
+    dlat = radius / METERS_PER_DEGREE
+    dlon = radius / (METERS_PER_DEGREE * max(cos(radians(latitude)), 1e-6))
+    return latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon
+
+
+class PlaceCatalog:
+    """Локальный каталог мест с пространственным индексом (SQLite R*Tree).
+
+    Пополняется всеми ответами Places API (с дедупликацией по id места).
+    Для поисков по типам хранит «покрытие» — круги, внутри которых каталог
+    знает все места этих типов. Если свежее покрытие целиком содержит круг
+    запроса и в нем достаточно мест, поиск отвечает из каталога без обращения к API.
+    Устаревшие круги и круги, целиком вошедшие в новый, удаляются при записи
+    покрытия, поэтому таблица покрытия не растет без ограничений.
+    """
+
+    def __init__(self, path: str, freshness: float, min_places: int = 1):
+        """
+        Args:
+            path: Путь к файлу SQLite
+            freshness: Сколько секунд покрытие считается актуальным
+            min_places: Минимум мест в круге, при котором каталог отвечает сам
+        """
+        self._path = path
+        self._freshness = freshness
+        self._min_places = min_places
+        self._db: Optional[SqliteDatabase] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="place-catalog")
+
+    @staticmethod
+    def _types_key(types: Sequence[str]) -> str:
+        return ",".join(sorted(set(types)))
+
+    def _open(self) -> SqliteDatabase:
+        """Лениво открывает базу каталога и создает таблицы и индекс."""
+        if self._db is None:
+            Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+            db = SqliteDatabase(self._path, pragmas={"journal_mode": "wal", "synchronous": 1})
+            db.bind([CatalogPlace, CatalogCoverage])
+            db.connect(reuse_if_open=True)
+            db.create_tables([CatalogPlace, CatalogCoverage], safe=True)
+            db.execute_sql(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS catalog_index "
+                "USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+            )
+            self._db = db
+        return self._db
+
+    def _add(self, places: List[Dict[str, Any]], coverage: Optional[Dict[str, Any]]) -> None:
+        db = self._open()
+        now = time.time()
+        with db.atomic():
+            for item in places:
+                place_id = item.get("place_id")
+                if not place_id:
+                    continue
+                types = ",".join(item.get("types") or [])
+                CatalogPlace.insert(
+                    place_id=place_id,
+                    types=f",{types}," if types else "",
+                    data=json.dumps(item, ensure_ascii=False),
+                    updated_at=now,
+                ).on_conflict(
+                    conflict_target=[CatalogPlace.place_id],
+                    update={
+                        CatalogPlace.types: f",{types}," if types else "",
+                        CatalogPlace.data: json.dumps(item, ensure_ascii=False),
+                        CatalogPlace.updated_at: now,
+                    },
+                ).execute()
+                rowid = CatalogPlace.get(CatalogPlace.place_id == place_id).id
+                lat, lon = item["latitude"], item["longitude"]
+                db.execute_sql(
+                    "INSERT OR REPLACE INTO catalog_index VALUES (?, ?, ?, ?, ?)",
+                    (rowid, lat, lat, lon, lon),
+                )
+            if coverage:
+                self._replace_coverage(coverage, now)
+
+    def _replace_coverage(self, coverage: Dict[str, Any], now: float) -> None:
+        """Записывает круг покрытия, удаляя устаревшие и поглощенные им круги."""
+        types_key = self._types_key(coverage["types"])
+        latitude, longitude, radius = coverage["latitude"], coverage["longitude"], coverage["radius"]
+        CatalogCoverage.delete().where(CatalogCoverage.fetched_at < now - self._freshness).execute()
+
+        min_lat, max_lat, _, _ = _bbox(latitude, longitude, radius)
+        nested = CatalogCoverage.select().where(
+            (CatalogCoverage.types_key == types_key)
+            & (CatalogCoverage.latitude.between(min_lat, max_lat))
+            & (CatalogCoverage.radius <= radius)
+        )
+        superseded = [
+            c.id for c in nested
+            if haversine_m(latitude, longitude, c.latitude, c.longitude) + c.radius <= radius
+        ]
+        if superseded:
+            CatalogCoverage.delete().where(CatalogCoverage.id.in_(superseded)).execute()
+
+        CatalogCoverage.create(
+            types_key=types_key,
+            latitude=latitude,
+            longitude=longitude,
+            radius=radius,
+            fetched_at=now,
+        )
+
+    def _is_covered(self, latitude: float, longitude: float, radius: float, types: Sequence[str]) -> bool:
+        min_lat, max_lat, _, _ = _bbox(latitude, longitude, radius)
+        candidates = CatalogCoverage.select().where(
+            (CatalogCoverage.types_key == self._types_key(types))
+            & (CatalogCoverage.fetched_at >= time.time() - self._freshness)
+            & (CatalogCoverage.latitude <= max_lat)
+            & (CatalogCoverage.latitude >= min_lat - (CatalogCoverage.radius / METERS_PER_DEGREE))
+        )
+        return any(
+            haversine_m(latitude, longitude, c.latitude, c.longitude) + radius <= c.radius
+            for c in candidates
+        )
+
+    def _lookup(
+            self,
+            latitude: float,
+            longitude: float,
+            radius: float,
+            types: Sequence[str],
+    ) -> Optional[List[Dict[str, Any]]]:
+        db = self._open()
+        if not self._is_covered(latitude, longitude, radius, types):
+            return None
+
+        min_lat, max_lat, min_lon, max_lon = _bbox(latitude, longitude, radius)
+        rows = db.execute_sql(
+            "SELECT p.types, p.data FROM catalog_index AS i "
+            "JOIN catalog_places AS p ON p.id = i.id "
+            "WHERE i.min_lat >= ? AND i.max_lat <= ? AND i.min_lon >= ? AND i.max_lon <= ?",
+            (min_lat, max_lat, min_lon, max_lon),
+        ).fetchall()
+
+        wanted = [f",{t}," for t in types]
+        items = [json.loads(data) for place_types, data in rows if any(t in place_types for t in wanted)]
+        # R*Tree уже отсек все вне прямоугольника — точное расстояние считаем векторно
+        distances = haversine_many(
+            latitude, longitude, [i["latitude"] for i in items], [i["longitude"] for i in items]
+        )
+        result = [item for item, distance in zip(items, distances) if distance <= radius]
+        # В редких местах лучше переспросить API: каталог мог устареть
+        return result if len(result) >= self._min_places else None
+
+    async def add(self, places: List[Dict[str, Any]], coverage: Optional[Dict[str, Any]] = None) -> None:
+        """Добавляет (обновляет) места в каталоге.
+
+        Args:
+            places: Места в виде словарей Place.model_dump()
+            coverage: Круг полноты для поиска по типам:
+                {"latitude", "longitude", "radius", "types"}
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._add, places, coverage)
+        except Exception as e:
+            logger.warning(f"Ошибка записи в каталог мест: {e}")
+
+    async def lookup(
+            self,
+            latitude: float,
+            longitude: float,
+            radius: float,
+            types: Sequence[str],
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Ищет места заданных типов в круге, если каталог для него полон и свеж.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Места (словари Place) или None, если нужен запрос к API
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, self._lookup, latitude, longitude, radius, list(types)
+            )
+        except Exception as e:
+            logger.warning(f"Ошибка чтения каталога мест: {e}")
+            return None
+
+    def _close(self) -> None:
+        if self._db is not None and not self._db.is_closed():
+            self._db.close()
+        self._db = None
+
+    async def close(self) -> None:
+        """Закрывает соединение с базой каталога."""
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._close)
+        except Exception as e:
+            logger.warning(f"Ошибка закрытия каталога мест: {e}")
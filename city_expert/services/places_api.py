@@ -1,15 +1,54 @@
 import httpx
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Tuple, Any
-from datetime import datetime, timedelta
-from cachetools import TTLCache
+from typing import List, Optional, Dict, Tuple, Any, Awaitable, AsyncIterator
+from cachetools import TTLCache, LRUCache
+import asyncio
 import hashlib
+import json
+import numpy as np
 from city_expert.utils.logger import logger
-from city_expert.utils.config_loader import api_config
+from city_expert.utils.config_loader import api_config, config
+from city_expert.services.disk_cache import DiskCache
+from city_expert.services.place_catalog import PlaceCatalog
+from city_expert.services.single_flight import SingleFlight
+from city_expert.services.transport import PlacesTransport, PoolStats
+from city_expert.services.quota import Priority, QuotaScheduler, QuotaStats, upstream_quota
+from city_expert.services.exceptions import (
+    APIError,
+    InvalidRequestError,
+    QuotaExceededError,
+    UpstreamError,
+    UpstreamTimeoutError,
+)
+from city_expert.services.hedging import Hedger, HedgeStats
+from city_expert.services.opening_hours import compile_periods
+from city_expert.services.query_classifier import query_classifier
+from city_expert.services.resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    RETRYABLE_STATUSES,
+    parse_retry_after,
+)
+from city_expert.services.rate_limiter import SlidingWindowLimiter
+from city_expert.utils.geo import (
+    geo_cell,
+    cell_center,
+    cell_search_radius,
+    haversine_many,
+    rank_order,
+    within_radius,
+)
+
+# Максимальный радиус, допустимый для запросов к Places API (в метрах)
+MAX_SEARCH_RADIUS = 50000.0
+
+# Максимум мест в одном ответе searchNearby
+NEARBY_MAX_RESULTS = 20
 
 
 class Place(BaseModel):
     """Модель данных для представления места/достопримечательности."""
+    place_id: Optional[str] = None
     name: str
     address: str
     latitude: float
@@ -19,46 +58,197 @@ class Place(BaseModel):
     website: Optional[str] = None
     phone: Optional[str] = None
     opening_hours: Optional[Dict[str, Any]] = None
+    types: List[str] = []
+    details_loaded: bool = False  # загружены ли телефон, сайт, часы работы и фото
 
 
 class PlacesAPI:
     """Класс для работы с API поиска мест."""
 
-    def __init__(self, api_key: str):
+    def __init__(
+            self,
+            api_key: str,
+            disk_cache: Optional[DiskCache] = None,
+            transport: Optional[PlacesTransport] = None,
+            quota: Optional[QuotaScheduler] = None,
+            catalog: Optional[PlaceCatalog] = None,
+    ):
         """
         Args:
             api_key: Ключ для доступа к API
+            disk_cache: Дисковый кэш второго уровня (по умолчанию из api_config.DISK_CACHE)
+            transport: Пул HTTP-соединений (по умолчанию из api_config.HTTP_POOL)
+            quota: Планировщик квоты запросов (по умолчанию общий на процесс)
+            catalog: Локальный каталог мест (по умолчанию из api_config.PLACE_CATALOG)
         """
         self._api_key = api_key
         self._search_cache: TTLCache = TTLCache(maxsize=100, ttl=3600)
-        self._rate_limits: Dict[int, Tuple[datetime, int]] = {}
-        self._client: Optional[httpx.AsyncClient] = None
+        self._details_cache: TTLCache = TTLCache(maxsize=1000, ttl=6 * 3600)
+        # Токены следующих страниц searchText (живут у API недолго)
+        self._page_tokens: TTLCache = TTLCache(maxsize=500, ttl=300)
+        # Последние известные результаты без учета TTL — запасной ответ при превышении бюджета
+        self._stale_cache: LRUCache = LRUCache(maxsize=500)
+        self._disk_cache = disk_cache or DiskCache(**api_config.DISK_CACHE)
+        catalog_config = dict(api_config.PLACE_CATALOG)
+        self._catalog: Optional[PlaceCatalog] = catalog or (
+            PlaceCatalog(**catalog_config) if catalog_config.pop("enabled") else None
+        )
+        self._inflight = SingleFlight()
+        self._rate_limiter = SlidingWindowLimiter(
+            limit=api_config.RATE_LIMIT["requests"],
+            period=api_config.RATE_LIMIT["period"],
+            max_keys=api_config.RATE_LIMIT["max_users"],
+        )
+        self._transport = transport or PlacesTransport()
+        self._quota = quota or upstream_quota
+        resilience = api_config.RESILIENCE
+        self._retry_policy = RetryPolicy(
+            attempts=resilience["attempts"],
+            base_delay=resilience["backoff_base"],
+            max_delay=resilience["backoff_max"],
+            max_retry_after=resilience["max_retry_after"],
+        )
+        self._breaker = CircuitBreaker(
+            failure_threshold=resilience["failure_threshold"],
+            reset_timeout=resilience["reset_timeout"],
+        )
+        hedging = api_config.HEDGING
+        self._hedger: Optional[Hedger] = Hedger(
+            percentile=hedging["percentile"],
+            min_delay=hedging["min_delay"],
+            min_samples=hedging["min_samples"],
+        ) if hedging["enabled"] else None
+        self._search_budget: Optional[float] = hedging["search_budget"]
 
     async def __aenter__(self) -> "PlacesAPI":
-        self._client = httpx.AsyncClient()
+        # Создаем общий пул соединений заранее
+        _ = self._transport.client
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
         await self.close()
 
     @staticmethod
-    def _generate_cache_key(query: str, lat: Optional[float], lon: Optional[float]) -> str:
-        """Генерирует ключ кэша на основе параметров поиска."""
-        key_data = f"{query}:{lat}:{lon}"
+    def _normalize_query(query: str) -> str:
+        """Приводит запрос к каноническому виду: регистр, пробелы, «ё»."""
+        return " ".join(query.lower().replace("ё", "е").split())
+
+    @classmethod
+    def _generate_cache_key(
+            cls,
+            query: str,
+            lat: Optional[float],
+            lon: Optional[float],
+            radius: float = api_config.DEFAULT_RADIUS,
+    ) -> str:
+        """Генерирует ключ кэша на основе нормализованного запроса и ячейки сетки.
+
+        Координаты квантуются в ячейку, размер которой зависит от радиуса,
+        поэтому близкие точки разделяют одну запись кэша.
+        """
+        if lat is not None and lon is not None:
+            size, row, col = geo_cell(lat, lon, radius)
+            area = f"{size}:{row}:{col}"
+        else:
+            area = "global"
+        key_data = f"{cls._normalize_query(query)}:{area}"
         return hashlib.md5(key_data.encode()).hexdigest()
 
-    def _check_rate_limit(self, user_id: int) -> bool:
-        """Проверяет лимит запросов (5 в минуту)."""
-        now = datetime.now()
-        last_time, count = self._rate_limits.get(user_id, (now, 0))
-
-        if (now - last_time) < timedelta(minutes=1):
-            if count >= api_config.RATE_LIMIT["requests"]:
-                return False
-            self._rate_limits[user_id] = (last_time, count + 1)
+    @staticmethod
+    def _dump_places(places: List[Place]) -> bytes:
+        """Компактно сериализует список мест (без полей со значениями по умолчанию)."""
+        data = [place.model_dump(exclude_defaults=True) for place in places]
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+    @staticmethod
+    def _load_places(raw: bytes) -> List[Place]:
+        """Восстанавливает список мест из данных _dump_places."""
+        return [Place(**item) for item in json.loads(raw)]
+
+    async def _get_cached(self, cache_key: str) -> Optional[List[Place]]:
+        """Ищет результаты сначала в памяти, затем на диске.
+
+        Найденная на диске запись поднимается в кэш в памяти.
+        """
+        cached_results = self._search_cache.get(cache_key)
+        if isinstance(cached_results, list):
+            return cached_results
+
+        raw = await self._disk_cache.get(cache_key)
+        if raw is None:
+            return None
+        try:
+            results = self._load_places(raw)
+        except Exception as e:
+            logger.warning(f"Поврежденная запись дискового кэша: {e}")
+            return None
+        self._search_cache[cache_key] = results
+        self._stale_cache[cache_key] = results
+        return results
+
+    async def _store_cached(self, cache_key: str, results: List[Place]) -> None:
+        """Сохраняет результаты в кэш в памяти и на диске."""
+        self._search_cache[cache_key] = results
+        self._stale_cache[cache_key] = results
+        await self._disk_cache.set(cache_key, self._dump_places(results))
+
+    @staticmethod
+    def _upstream_area(
+            latitude: Optional[float],
+            longitude: Optional[float],
+            radius: float,
+    ) -> Tuple[Optional[float], Optional[float], float]:
+        """Возвращает центр и радиус запроса к API для ячейки точки пользователя.
+
+        Запрос строится от центра ячейки с увеличенным радиусом, чтобы результат
+        был надмножеством для любой точки этой ячейки.
+        """
+        if latitude is None or longitude is None:
+            return latitude, longitude, radius
+        center_lat, center_lon = cell_center(geo_cell(latitude, longitude, radius))
+        return center_lat, center_lon, min(cell_search_radius(radius), MAX_SEARCH_RADIUS)
+
+    @staticmethod
+    def _refine_for_point(
+            places: List[Place],
+            latitude: Optional[float],
+            longitude: Optional[float],
+            radius: float,
+            restricted: bool,
+    ) -> List[Place]:
+        """Фильтрует и ранжирует надмножество из кэша для точной точки пользователя.
+
+        Расстояния считаются векторно для всех мест сразу; порядок задает
+        составная оценка близости и рейтинга. Часы работы в результатах поиска
+        не запрашиваются (LIST_FIELD_MASK), поэтому «открыто сейчас» учитывается
+        позже — при ранжировании списка по догруженным подробностям.
+
+        Args:
+            places: Результаты, полученные для ячейки
+            latitude: Широта пользователя
+            longitude: Долгота пользователя
+            radius: Запрошенный радиус поиска
+            restricted: Был ли поиск ограничен кругом (searchNearby)
+
+        Returns:
+            List[Place]: Места в порядке убывания оценки
+        """
+        if latitude is None or longitude is None or not places:
+            return list(places)
+        lats = [p.latitude for p in places]
+        lons = [p.longitude for p in places]
+        if restricted:
+            indices, distances = within_radius(latitude, longitude, radius, lats, lons)
         else:
-            self._rate_limits[user_id] = (now, 1)
-        return True
+            indices = np.arange(len(places))
+            distances = haversine_many(latitude, longitude, lats, lons)
+        ratings = [places[i].rating if places[i].rating is not None else np.nan for i in indices]
+        order = rank_order(distances, ratings, None, radius)
+        return [places[indices[i]] for i in order]
+
+    def _check_rate_limit(self, user_id: int) -> bool:
+        """Проверяет лимит запросов пользователя (скользящее окно RATE_LIMIT["period"])."""
+        return self._rate_limiter.allow(user_id)
 
     async def search(
             self,
@@ -67,6 +257,7 @@ class PlacesAPI:
             longitude: Optional[float] = None,
             radius: float = api_config.DEFAULT_RADIUS,
             user_id: Optional[int] = None,
+            priority: Priority = Priority.INTERACTIVE,
     ) -> List[Place]:
         if latitude is None or longitude is None:
             logger.warning("Геолокация не указана! Поиск будет по общему региону.")
@@ -76,32 +267,306 @@ class PlacesAPI:
             logger.warning(f"Превышен лимит запросов для пользователя {user_id}")
             raise ValueError("Превышен лимит запросов. Подождите минуту.")
 
-        # Проверка кэша
-        cache_key = self._generate_cache_key(query, latitude, longitude)
-        if cache_key in self._search_cache:
-            cached_results = self._search_cache[cache_key]
-            if isinstance(cached_results, list):
-                logger.info(f"Используются кэшированные результаты для запроса: '{query}'")
-                return cached_results
-            return []
+        # Проверка кэша (ключ — нормализованный запрос и ячейка сетки)
+        cache_key = self._generate_cache_key(query, latitude, longitude, radius)
+        place_types = self._query_types(query, latitude, longitude)
+        restricted = bool(place_types) or not query
+
+        cached_results = self._search_cache.get(cache_key)
+        if isinstance(cached_results, list):
+            logger.info(f"Используются кэшированные результаты для запроса: '{query}'")
+            return self._refine_for_point(cached_results, latitude, longitude, radius, restricted)
+
+        # Поиск по типам рядом с точкой может обслужить локальный каталог мест
+        if place_types and self._catalog is not None:
+            local = await self._catalog.lookup(latitude, longitude, radius, place_types)
+            if local is not None:
+                logger.info(f"Результаты для '{query}' взяты из локального каталога мест")
+                return self._refine_for_point(
+                    [Place(**item) for item in local], latitude, longitude, radius, restricted
+                )
+
+        # Одновременные одинаковые запросы ожидают одно общее чтение диска/запрос к API
+        fetch = self._inflight.do(
+            cache_key,
+            lambda: self._fetch_and_cache(
+                cache_key, query, place_types, latitude, longitude, radius, user_id, priority
+            ),
+        )
+        try:
+            # Запрос к API продолжается в фоне и после истечения бюджета и наполнит кэш
+            results = await asyncio.wait_for(fetch, timeout=self._search_budget)
+        except asyncio.TimeoutError:
+            results = self._stale_cache.get(cache_key)
+            if results is None:
+                raise UpstreamTimeoutError("API не ответило вовремя")
+            logger.warning(f"Бюджет времени поиска исчерпан, используются устаревшие данные: '{query}'")
+        return self._refine_for_point(results, latitude, longitude, radius, restricted)
+
+    async def search_stream(
+            self,
+            query: str,
+            latitude: Optional[float] = None,
+            longitude: Optional[float] = None,
+            radius: float = api_config.DEFAULT_RADIUS,
+            user_id: Optional[int] = None,
+            priority: Priority = Priority.INTERACTIVE,
+            max_pages: int = 3,
+    ) -> AsyncIterator[List[Place]]:
+        """Постраничный поиск: отдает места страницами ответа API.
+
+        Первая страница берется через search (кэш, объединение запросов, бюджет).
+        Следующие страницы searchText по nextPageToken запрашиваются лениво —
+        только когда потребитель просит следующую страницу, и расходуют лимит
+        запросов пользователя так же, как search (при превышении поток
+        завершается на уже полученных страницах).
+
+        Args:
+            query: Текст запроса
+            latitude: Широта пользователя
+            longitude: Долгота пользователя
+            radius: Радиус поиска в метрах
+            user_id: Идентификатор пользователя для лимита запросов
+            priority: Класс приоритета запросов
+            max_pages: Максимальное число страниц
+
+        Yields:
+            List[Place]: Места очередной страницы (без повторов предыдущих)
+        """
+        places = await self.search(query, latitude, longitude, radius, user_id, priority)
+        seen = {place.place_id for place in places}
+        yield places
+
+        cache_key = self._generate_cache_key(query, latitude, longitude, radius)
+        page_token = self._page_tokens.get(cache_key)
+        area_lat, area_lon, area_radius = self._upstream_area(latitude, longitude, radius)
+
+        for _ in range(max_pages - 1):
+            if not page_token:
+                break
+            # Следующие страницы — такие же запросы к API и расходуют лимит пользователя
+            if user_id and not self._check_rate_limit(user_id):
+                logger.warning(f"Превышен лимит запросов для пользователя {user_id}: следующие страницы не загружаются")
+                break
+            logger.debug(f"Загрузка следующей страницы результатов для '{query}'")
+            places, page_token = await self._search_by_text(
+                query, area_lat, area_lon, area_radius, user_id, priority, page_token
+            )
+            await self._add_to_catalog(places)
+            page = [
+                place for place in self._refine_for_point(places, latitude, longitude, radius, restricted=False)
+                if place.place_id is None or place.place_id not in seen
+            ]
+            seen.update(place.place_id for place in page)
+            yield page
+
+    async def _fetch_and_cache(
+            self,
+            cache_key: str,
+            query: str,
+            place_types: List[str],
+            latitude: Optional[float],
+            longitude: Optional[float],
+            radius: float,
+            user_id: Optional[int],
+            priority: Priority,
+    ) -> List[Place]:
+        """Читает результаты для ячейки из кэша, а при промахе запрашивает их у API
+        и сохраняет в кэш.
+
+        Returns:
+            List[Place]: Надмножество результатов для ячейки
+
+        Raises:
+            APIError: Если API недоступно (ошибки не кэшируются)
+        """
+        cached_results = await self._get_cached(cache_key)
+        if cached_results is not None:
+            return cached_results
+
+        # Запрос к API строится для всей ячейки, а не для точной точки пользователя
+        area_lat, area_lon, area_radius = self._upstream_area(latitude, longitude, radius)
+
+        if query and not place_types:
+            # Если не удалось сопоставить с типами, используем текстовый поиск через searchText
+            results, next_page_token = await self._search_by_text(
+                query, area_lat, area_lon, area_radius, user_id, priority
+            )
+            if next_page_token:
+                self._page_tokens[cache_key] = next_page_token
+        else:
+            results = await self._search_nearby(query, place_types, area_lat, area_lon, area_radius, priority)
+
+        await self._store_cached(cache_key, results)
+        await self._add_to_catalog(results, place_types, area_lat, area_lon, area_radius)
+        return results
 
+    async def _add_to_catalog(
+            self,
+            places: List[Place],
+            place_types: Optional[List[str]] = None,
+            latitude: Optional[float] = None,
+            longitude: Optional[float] = None,
+            radius: Optional[float] = None,
+    ) -> None:
+        """Добавляет места из ответа API в локальный каталог.
+
+        Для searchNearby (ранжирование по расстоянию) в каталог записывается и
+        покрытие: если ответ упёрся в лимит выдачи, полным считается только круг
+        до самого дальнего из полученных мест.
+        """
+        if self._catalog is None or (not places and not place_types):
+            return
+        coverage = None
+        if place_types and latitude is not None and longitude is not None and radius is not None:
+            complete_radius = radius
+            if len(places) >= NEARBY_MAX_RESULTS:
+                complete_radius = float(haversine_many(
+                    latitude, longitude, [p.latitude for p in places], [p.longitude for p in places]
+                ).max())
+            coverage = {
+                "latitude": latitude,
+                "longitude": longitude,
+                "radius": complete_radius,
+                "types": place_types,
+            }
+        await self._catalog.add([place.model_dump() for place in places], coverage)
+
+    async def _post(
+            self,
+            endpoint: str,
+            payload: dict,
+            priority: Priority,
+            field_mask: Optional[str] = None,
+    ) -> dict:
+        """Отправляет запрос к API с повторами, соблюдением квоты и автоматическим выключателем.
+
+        Каждая попытка ждет разрешения глобальной квоты. Сетевые ошибки и статусы
+        429/5xx повторяются с экспоненциальной задержкой (или по Retry-After).
+        Исчерпание попыток засчитывается выключателю как неудача.
+
+        Returns:
+            dict: Разобранное JSON-тело успешного ответа
+
+        Raises:
+            CircuitOpenError: Если выключатель разомкнут
+            QuotaExceededError: Если квота не освободилась до дедлайна
+            InvalidRequestError: Если API отклонило запрос (4xx)
+            UpstreamError: Если API недоступно после всех попыток
+        """
+        self._breaker.before_call()
+        try:
+            return await self._post_with_retries(endpoint, payload, priority, field_mask)
+        except (QuotaExceededError, asyncio.CancelledError):
+            # До ответа API дело не дошло — состояние выключателя не меняем
+            self._breaker.release()
+            raise
+        except APIError:
+            # Исход уже учтен выключателем в цикле попыток
+            raise
+        except BaseException:
+            # Непредвиденная ошибка не должна оставить пробный запрос «в полете»
+            self._breaker.record_failure()
+            raise
+
+    async def _post_with_retries(
+            self,
+            endpoint: str,
+            payload: dict,
+            priority: Priority,
+            field_mask: Optional[str],
+    ) -> dict:
+        """Цикл попыток запроса для _post (обновляет состояние выключателя)."""
+        error: Optional[APIError] = None
+
+        for attempt in range(self._retry_policy.attempts):
+            retry_after = None
+            await self._quota.acquire(priority)
+            try:
+                response = await self._send(endpoint, payload, field_mask)
+            except httpx.RequestError as e:
+                logger.warning(f"Ошибка сети при запросе к API (попытка {attempt + 1}): {e}")
+                error = UpstreamError(f"Ошибка сети: {e}")
+            else:
+                if response.status_code == 200:
+                    try:
+                        data = response.json()
+                    except ValueError as e:
+                        # Ответ 200 с телом не в JSON — сбой сервиса, а не успех
+                        self._breaker.record_failure()
+                        raise UpstreamError(f"Некорректный JSON в ответе API: {e}") from e
+                    if "error" in data:
+                        self._breaker.record_failure()
+                        raise UpstreamError(f"Ошибка в ответе API: {data['error']}")
+                    self._breaker.record_success()
+                    return data
+
+                logger.error(f"Ошибка API: статус {response.status_code}, ответ: {response.text[:200]}...")
+                if response.status_code not in RETRYABLE_STATUSES:
+                    # Сервис отвечает, но отклоняет запрос — повторять бессмысленно
+                    self._breaker.record_success()
+                    raise InvalidRequestError(f"API отклонило запрос: статус {response.status_code}")
+                error = UpstreamError(f"API вернуло статус {response.status_code}", response.status_code)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+            delay = self._retry_policy.delay(attempt, retry_after)
+            if delay is None:
+                break
+            logger.debug(f"Повтор запроса к API через {delay:.2f} с")
+            await asyncio.sleep(delay)
+
+        self._breaker.record_failure()
+        raise error
+
+    async def _send(self, endpoint: str, payload: dict, field_mask: Optional[str] = None) -> httpx.Response:
+        """Одна попытка запроса к API, при включенном дублировании — с дублем.
+
+        Дубль отправляется только при свободной квоте и сам расходует токен.
+        """
+        def call() -> Awaitable[httpx.Response]:
+            return self._transport.post(
+                endpoint,
+                headers=api_config.get_headers(self._api_key, field_mask),
+                json=payload,
+            )
+
+        if self._hedger is None:
+            return await call()
+        return await self._hedger.run(call, can_hedge=self._quota.try_acquire)
+
+    def _parse_places(self, data: dict) -> List[Place]:
+        """Разбирает список мест из ответа API, пропуская некорректные записи."""
+        results: List[Place] = []
+        for place_data in data.get("places", []):
+            try:
+                place = self._parse_place_data(place_data)
+                if place:
+                    results.append(place)
+            except Exception as e:
+                logger.warning(f"Ошибка парсинга места: {e}", exc_info=True)
+                continue
+        return results
+
+    async def _search_nearby(
+            self,
+            query: str,
+            place_types: List[str],
+            latitude: Optional[float],
+            longitude: Optional[float],
+            radius: float,
+            priority: Priority = Priority.INTERACTIVE,
+    ) -> List[Place]:
+        """Поиск через searchNearby endpoint по типам мест."""
         # Формирование тела запроса для searchNearby
         payload = {
             "languageCode": "ru",
             "regionCode": "RU",
-            "maxResultCount": 20,  # Ограничиваем количество результатов
+            "maxResultCount": NEARBY_MAX_RESULTS,  # Ограничиваем количество результатов
             "rankPreference": "DISTANCE"  # Сортировка по расстоянию
         }
 
-        # Если есть текст запроса, используем includedTypes
-        if query:
-            # Преобразуем общий запрос в конкретные типы мест
-            place_types = self._map_query_to_types(query)
-            if place_types:
-                payload["includedTypes"] = place_types
-            else:
-                # Если не удалось сопоставить с типами, используем текстовый поиск через searchText
-                return await self._search_by_text(query, latitude, longitude, radius, user_id)
+        if place_types:
+            payload["includedTypes"] = place_types
 
         if latitude is not None and longitude is not None:
             payload["locationRestriction"] = {
@@ -114,52 +579,14 @@ class PlacesAPI:
                 }
             }
 
-        headers = api_config.get_headers(self._api_key)
-
-        try:
-            logger.debug(f"Отправка запроса к API для: '{query}'")
-            if not self._client:
-                self._client = httpx.AsyncClient()
-
-            url = f"https://{api_config.BASE_URL}{api_config.NEARBY_SEARCH_ENDPOINT}"
-            logger.debug(f"URL запроса: {url}")
+        logger.debug(f"Отправка запроса к API для: '{query}'")
+        logger.debug(f"Эндпоинт запроса: {api_config.NEARBY_SEARCH_ENDPOINT}")
 
-            response = await self._client.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=15.0
-            )
-
-            if response.status_code != 200:
-                logger.error(f"Ошибка API: статус {response.status_code}, ответ: {response.text[:200]}...")
-                return []
-
-            data = response.json()
-            if "error" in data:
-                logger.error(f"Ошибка в ответе API: {data['error']}")
-                return []
-
-            results: List[Place] = []
-            for place_data in data.get("places", []):
-                try:
-                    place = self._parse_place_data(place_data)
-                    if place:
-                        results.append(place)
-                except Exception as e:
-                    logger.warning(f"Ошибка парсинга места: {e}", exc_info=True)
-                    continue
-
-            self._search_cache[cache_key] = results
-            logger.success(f"Успешный поиск: найдено {len(results)} мест для '{query}'")
-            return results
+        data = await self._post(api_config.NEARBY_SEARCH_ENDPOINT, payload, priority)
+        results = self._parse_places(data)
 
-        except httpx.RequestError as e:
-            logger.error(f"Ошибка сети при поиске: {e}")
-            return []
-        except Exception as e:
-            logger.error(f"Неожиданная ошибка при поиске: {e}", exc_info=True)
-            return []
+        logger.success(f"Успешный поиск: найдено {len(results)} мест для '{query}'")
+        return results
 
     async def _search_by_text(
             self,
@@ -167,9 +594,15 @@ class PlacesAPI:
             latitude: Optional[float],
             longitude: Optional[float],
             radius: float,
-            user_id: Optional[int]
-    ) -> List[Place]:
-        """Альтернативный поиск через searchText endpoint."""
+            user_id: Optional[int],
+            priority: Priority = Priority.INTERACTIVE,
+            page_token: Optional[str] = None,
+    ) -> Tuple[List[Place], Optional[str]]:
+        """Альтернативный поиск через searchText endpoint.
+
+        Returns:
+            Tuple[List[Place], Optional[str]]: Места страницы и токен следующей страницы
+        """
         payload = {
             "textQuery": query,
             "languageCode": "ru",
@@ -177,6 +610,10 @@ class PlacesAPI:
             "maxResultCount": 20
         }
 
+        if page_token:
+            # Остальные параметры должны совпадать с запросом первой страницы
+            payload["pageToken"] = page_token
+
         if latitude is not None and longitude is not None:
             payload["locationBias"] = {
                 "circle": {
@@ -188,93 +625,195 @@ class PlacesAPI:
                 }
             }
 
-        headers = api_config.get_headers(self._api_key)
-
-        try:
-            if not self._client:
-                self._client = httpx.AsyncClient()
-
-            url = f"https://{api_config.BASE_URL}{api_config.SEARCH_TEXT_ENDPOINT}"
-            logger.debug(f"Альтернативный текстовый поиск: {url}")
-
-            response = await self._client.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=15.0
-            )
+        logger.debug(f"Альтернативный текстовый поиск: {api_config.SEARCH_TEXT_ENDPOINT}")
 
-            if response.status_code != 200:
-                logger.error(f"Ошибка текстового поиска: статус {response.status_code}")
-                return []
+        data = await self._post(
+            api_config.SEARCH_TEXT_ENDPOINT, payload, priority, api_config.TEXT_LIST_FIELD_MASK
+        )
+        return self._parse_places(data), data.get("nextPageToken")
 
-            data = response.json()
-            results: List[Place] = []
-            for place_data in data.get("places", []):
-                try:
-                    place = self._parse_place_data(place_data)
-                    if place:
-                        results.append(place)
-                except Exception as e:
-                    logger.warning(f"Ошибка парсинга места в текстовом поиске: {e}")
-                    continue
-
-            return results
-
-        except Exception as e:
-            logger.error(f"Ошибка текстового поиска: {e}")
+    @classmethod
+    def _query_types(cls, query: str, latitude: Optional[float], longitude: Optional[float]) -> List[str]:
+        """Типы мест для searchNearby; searchNearby требует точку поиска,
+        поэтому без геолокации остается searchText."""
+        if not query or latitude is None or longitude is None:
             return []
+        return cls._map_query_to_types(query)
 
-    def _map_query_to_types(self, query: str) -> List[str]:
+    @staticmethod
+    def _map_query_to_types(query: str) -> List[str]:
         """Преобразует текстовый запрос в типы мест Google Places."""
-        query_lower = query.lower()
-        type_mapping = {
-            'ресторан': 'restaurant',
-            'кафе': 'cafe',
-            'бар': 'bar',
-            'кофейня': 'cafe',
-            'магазин': 'store',
-            'аптека': 'pharmacy',
-            'банк': 'bank',
-            'больница': 'hospital',
-            'отель': 'hotel',
-            'кинотеатр': 'movie_theater',
-            'парк': 'park',
-            'музей': 'museum',
-            'театр': 'performing_arts_theater'
-        }
+        return query_classifier.classify(query)
 
-        for rus_type, eng_type in type_mapping.items():
-            if rus_type in query_lower:
-                return [eng_type]
-
-        return []
+    @staticmethod
+    def _parse_details(place_data: dict) -> Dict[str, Any]:
+        """Извлекает подробные поля места (контакты, часы работы, фото)."""
+        opening_hours = place_data.get("currentOpeningHours", {})
+        periods = opening_hours.get("periods", [])
+        return {
+            "website": place_data.get("websiteUri"),
+            "phone": place_data.get("nationalPhoneNumber"),
+            "opening_hours": {
+                "open_now": opening_hours.get("openNow", False),
+                # Расписание компилируется один раз и хранится вместе с местом в кэшах
+                "weekly": compile_periods(periods) if periods else None,
+                "utc_offset": place_data.get("utcOffsetMinutes"),
+            } if opening_hours else None,
+            "photos": [photo["name"] for photo in place_data.get("photos", []) if "name" in photo],
+        }
 
     def _parse_place_data(self, place_data: dict) -> Optional[Place]:
         """Парсит данные места из ответа API."""
         try:
-            opening_hours = place_data.get("currentOpeningHours", {})
             place = Place(
+                place_id=place_data.get("id"),
                 name=place_data.get("displayName", {}).get("text", "Без названия"),
                 address=place_data.get("formattedAddress", "Адрес не указан"),
                 latitude=place_data.get("location", {}).get("latitude", 0.0),
                 longitude=place_data.get("location", {}).get("longitude", 0.0),
                 rating=place_data.get("rating"),
-                website=place_data.get("websiteUri"),
-                phone=place_data.get("nationalPhoneNumber"),
-                opening_hours={
-                    "open_now": opening_hours.get("openNow", False),
-                    "periods": opening_hours.get("periods", [])
-                } if opening_hours else None,
-                photos=[photo["name"] for photo in place_data.get("photos", []) if "name" in photo],
+                types=place_data.get("types", []),
+                **self._parse_details(place_data),
             )
             return place
         except Exception as e:
             logger.warning(f"Ошибка создания объекта Place: {e}")
             return None
 
+    async def get_details(
+            self,
+            place_id: str,
+            priority: Priority = Priority.INTERACTIVE,
+    ) -> Dict[str, Any]:
+        """Загружает подробные поля места через getDetails (с кэшем в памяти и на диске).
+
+        Args:
+            place_id: Идентификатор места в Places API
+            priority: Класс приоритета запроса
+
+        Returns:
+            Dict[str, Any]: Поля website, phone, opening_hours, photos
+        """
+        cache_key = f"details:{place_id}"
+        details = self._details_cache.get(cache_key)
+        if details is not None:
+            return details
+
+        async def fetch() -> Dict[str, Any]:
+            raw = await self._disk_cache.get(cache_key)
+            if raw is not None:
+                return json.loads(raw)
+            payload = {"name": f"places/{place_id}", "languageCode": "ru"}
+            data = await self._post(
+                api_config.PLACE_DETAILS_ENDPOINT, payload, priority, api_config.DETAILS_FIELD_MASK
+            )
+            result = self._parse_details(data)
+            await self._disk_cache.set(cache_key, json.dumps(result, ensure_ascii=False).encode())
+            return result
+
+        details = await self._inflight.do(cache_key, fetch)
+        self._details_cache[cache_key] = details
+        return details
+
+    async def photo_uri(
+            self,
+            photo_name: str,
+            max_width: int,
+            priority: Priority = Priority.INTERACTIVE,
+    ) -> str:
+        """Получает ссылку на изображение по имени фото (media-эндпоинт без редиректа).
+
+        Фото необязательны, поэтому запрос не повторяется и не влияет на выключатель,
+        но расходует общую квоту.
+
+        Args:
+            photo_name: Имя ресурса фото (places/{id}/photos/{ref})
+            max_width: Максимальная ширина изображения в пикселях
+            priority: Класс приоритета запроса
+
+        Returns:
+            str: Ссылка на изображение
+
+        Raises:
+            QuotaExceededError: Если квота не освободилась до дедлайна
+            UpstreamError: Если API не вернуло ссылку
+        """
+        await self._quota.acquire(priority)
+        base_url = config.PHOTO_MEDIA_BASE_URL or f"https://{api_config.BASE_URL}"
+        url = f"{base_url}/v1/{photo_name}/media"
+        try:
+            response = await self._transport.get(
+                url,
+                params={"maxWidthPx": max_width, "skipHttpRedirect": "true"},
+                headers=api_config.get_headers(self._api_key, "photoUri"),
+            )
+        except httpx.RequestError as e:
+            raise UpstreamError(f"Ошибка сети: {e}")
+        if response.status_code != 200:
+            raise UpstreamError(f"API вернуло статус {response.status_code}", response.status_code)
+        photo_uri = response.json().get("photoUri")
+        if not photo_uri:
+            raise UpstreamError("В ответе API нет ссылки на фото")
+        return photo_uri
+
+    async def download(self, url: str, max_bytes: int) -> bytes:
+        """Скачивает файл по ссылке через общий пул соединений.
+
+        Raises:
+            UpstreamError: Если файл недоступен или больше max_bytes
+        """
+        try:
+            response = await self._transport.get(url, follow_redirects=True)
+        except httpx.RequestError as e:
+            raise UpstreamError(f"Ошибка сети: {e}")
+        if response.status_code != 200:
+            raise UpstreamError(f"Файл недоступен: статус {response.status_code}", response.status_code)
+        if len(response.content) > max_bytes:
+            raise UpstreamError(f"Файл слишком большой: {len(response.content)} байт")
+        return response.content
+
+    async def enrich(self, places: List[Place]) -> List[Place]:
+        """Догружает подробности для мест, которые будут показаны пользователю.
+
+        Запросы выполняются параллельно; при ошибке место возвращается без подробностей.
+
+        Args:
+            places: Места из результатов поиска (обычно только первая страница)
+
+        Returns:
+            List[Place]: Копии мест с заполненными контактами, часами работы и фото
+        """
+        async def enrich_one(place: Place) -> Place:
+            if place.details_loaded or not place.place_id:
+                return place
+            try:
+                details = await self.get_details(place.place_id)
+            except APIError as e:
+                logger.warning(f"Не удалось загрузить подробности места {place.place_id}: {e}")
+                return place
+            return place.model_copy(update={**details, "details_loaded": True})
+
+        return list(await asyncio.gather(*(enrich_one(place) for place in places)))
+
+    async def warm_up(self) -> None:
+        """Прогревает соединения к API (вызывается при запуске бота)."""
+        await self._transport.warm_up()
+
+    def pool_stats(self) -> PoolStats:
+        """Возвращает статистику пула HTTP-соединений."""
+        return self._transport.stats()
+
+    def hedge_stats(self) -> Optional[HedgeStats]:
+        """Возвращает статистику задержек API и дублирующих запросов."""
+        return self._hedger.stats() if self._hedger else None
+
+    def quota_stats(self) -> QuotaStats:
+        """Возвращает статистику очереди глобальной квоты запросов."""
+        return self._quota.stats()
+
     async def close(self) -> None:
         """Закрытие соединения."""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
\ No newline at end of file
+        await self._transport.close()
+        await self._disk_cache.close()
+        if self._catalog is not None:
+            await self._catalog.close()
\ No newline at end of file
@@ -0,0 +1,110 @@
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Типовые окончания русских существительных (падежи, число)
+_COMMON_ENDINGS: FrozenSet[str] = frozenset({
+    "", "а", "е", "и", "у", "ы", "ю", "я", "ь", "й",
+    "ам", "ами", "ах", "ев", "ей", "ем", "ом", "ой", "ов", "ою", "ям", "ями", "ях",
+    "ия", "ии", "ию", "ий", "иям", "иях",
+})
+
+# Уменьшительно-разговорные формы («кафешка», «кафешки», «аптечка»)
+_DIMINUTIVE_ENDINGS: FrozenSet[str] = frozenset({
+    "шка", "шки", "шку", "шке", "шкой", "шек", "шкам", "шках", "шками",
+    "чка", "чки", "чку", "чке", "чкой", "чек", "чкам", "чках",
+})
+
+# Основа слова -> типы мест Google Places (и дополнительные окончания, если нужны)
+TYPE_STEMS: Tuple[Tuple[str, Tuple[str, ...], FrozenSet[str]], ...] = (
+    ("ресторан", ("restaurant",), frozenset()),
+    ("ресторанчик", ("restaurant",), frozenset()),
+    ("кафе", ("cafe",), _DIMINUTIVE_ENDINGS),
+    ("кофейн", ("cafe",), frozenset()),
+    ("кофе", ("cafe",), frozenset()),
+    ("бар", ("bar",), frozenset()),
+    ("паб", ("bar",), frozenset()),
+    ("пиццери", ("pizza_restaurant",), frozenset()),
+    ("магазин", ("store",), frozenset()),
+    ("супермаркет", ("supermarket",), frozenset()),
+    ("аптек", ("pharmacy",), frozenset()),
+    ("апте", ("pharmacy",), _DIMINUTIVE_ENDINGS),
+    ("банк", ("bank",), frozenset()),
+    ("банкомат", ("atm",), frozenset()),
+    ("больниц", ("hospital",), frozenset()),
+    ("отел", ("hotel",), frozenset()),
+    ("гостиниц", ("hotel",), frozenset()),
+    ("хостел", ("hostel",), frozenset()),
+    ("кинотеатр", ("movie_theater",), frozenset()),
+    ("кино", ("movie_theater",), frozenset()),
+    ("парк", ("park",), frozenset()),
+    ("аквапарк", ("water_park",), frozenset()),
+    ("зоопарк", ("zoo",), frozenset()),
+    ("музе", ("museum",), frozenset()),
+    ("театр", ("performing_arts_theater",), frozenset()),
+    ("галере", ("art_gallery",), frozenset()),
+    ("достопримечательност", ("tourist_attraction",), frozenset()),
+    ("заправк", ("gas_station",), frozenset()),
+    ("азс", ("gas_station",), frozenset()),
+    ("спортзал", ("gym",), frozenset()),
+    ("фитнес", ("gym",), frozenset()),
+)
+
+_WORD_RE = re.compile(r"[а-яa-z0-9]+")
+
+
+class _TrieNode:
+    """Узел префиксного дерева основ."""
+    __slots__ = ("children", "types", "endings")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.types: Optional[Tuple[str, ...]] = None
+        self.endings: FrozenSet[str] = frozenset()
+
+
+class QueryClassifier:
+    """Сопоставляет текстовый запрос с типами мест Google Places за один проход.
+
+    Основы слов хранятся в префиксном дереве. Каждое слово запроса проходится
+    по дереву с начала; основа засчитывается, только если остаток слова —
+    допустимое окончание. Поэтому «ресторанов» и «музеи» распознаются,
+    а «бар» внутри «барбершоп» — нет.
+    """
+
+    def __init__(self, stems: Iterable[Tuple[str, Tuple[str, ...], FrozenSet[str]]]):
+        """
+        Args:
+            stems: Набор (основа, типы мест, дополнительные окончания)
+        """
+        self._root = _TrieNode()
+        for stem, types, extra_endings in stems:
+            node = self._root
+            for char in stem:
+                node = node.children.setdefault(char, _TrieNode())
+            node.types = types
+            node.endings = _COMMON_ENDINGS | extra_endings
+
+    def _match_word(self, word: str) -> Optional[Tuple[str, ...]]:
+        """Возвращает типы для самой длинной основы, которой соответствует слово."""
+        node = self._root
+        best = None
+        for index, char in enumerate(word):
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.types is not None and word[index + 1:] in node.endings:
+                best = node.types
+        return best
+
+    def classify(self, query: str) -> List[str]:
+        """Возвращает типы мест, упомянутые в запросе (в порядке упоминания, без повторов)."""
+        result: List[str] = []
+        for word in _WORD_RE.findall(query.lower().replace("ё", "е")):
+            for place_type in self._match_word(word) or ():
+                if place_type not in result:
+                    result.append(place_type)
+        return result
+
+
+# Классификатор строится один раз при импорте модуля
+query_classifier = QueryClassifier(TYPE_STEMS)
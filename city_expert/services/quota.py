@@ -0,0 +1,148 @@
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, asdict
+from enum import IntEnum
+from typing import Dict, Any, List, Optional, Tuple
+from city_expert.services.exceptions import QuotaExceededError
+from city_expert.utils.config_loader import api_config
+from city_expert.utils.logger import logger
+
+
+class Priority(IntEnum):
+    """Классы приоритета запросов к API (меньше — важнее)."""
+    INTERACTIVE = 0  # поиск по запросу пользователя
+    BACKGROUND = 1   # фоновая работа (прогрев кэша и т.п.)
+
+
+@dataclass
+class QuotaStats:
+    """Статистика глобального планировщика запросов."""
+    queue_depth: int = 0        # запросов в очереди сейчас
+    granted: int = 0            # выдано разрешений
+    timeouts: int = 0           # запросов, не дождавшихся разрешения
+    total_wait: float = 0.0     # суммарное время ожидания (сек)
+    max_wait: float = 0.0       # максимальное время ожидания (сек)
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.granted if self.granted else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "avg_wait": self.avg_wait}
+
+
+class QuotaScheduler:
+    """Глобальный (на процесс) асинхронный token bucket для запросов к API.
+
+    Запросы, для которых нет свободного токена, ставятся в очередь и получают
+    токены в порядке приоритета, а внутри приоритета — в порядке поступления.
+    Ожидание ограничено дедлайном, после которого выбрасывается QuotaExceededError.
+    """
+
+    def __init__(self, rate: float, burst: int, max_wait: float):
+        """
+        Args:
+            rate: Допустимое число запросов в секунду
+            burst: Емкость корзины (допустимый всплеск)
+            max_wait: Дедлайн ожидания токена по умолчанию (сек)
+        """
+        self._rate = rate
+        self._burst = burst
+        self._max_wait = max_wait
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._pump: Optional[asyncio.Task] = None
+        self._stats = QuotaStats()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    async def acquire(
+            self,
+            priority: Priority = Priority.INTERACTIVE,
+            timeout: Optional[float] = None,
+    ) -> float:
+        """Ожидает разрешение на один запрос к API.
+
+        Args:
+            priority: Класс приоритета запроса
+            timeout: Дедлайн ожидания в секундах (по умолчанию max_wait)
+
+        Returns:
+            float: Время ожидания в секундах
+
+        Raises:
+            QuotaExceededError: Если разрешение не получено до дедлайна
+        """
+        started = time.monotonic()
+        self._refill()
+        if not self._queue and self._tokens >= 1:
+            self._tokens -= 1
+            self._record(0.0)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (int(priority), next(self._seq), future))
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._dispatch())
+
+        try:
+            await asyncio.wait_for(future, timeout if timeout is not None else self._max_wait)
+        except asyncio.TimeoutError:
+            self._stats.timeouts += 1
+            logger.warning(f"Запрос к API не дождался квоты (приоритет {priority.name})")
+            raise QuotaExceededError("Превышена квота запросов к API, попробуйте позже")
+
+        waited = time.monotonic() - started
+        self._record(waited)
+        return waited
+
+    def try_acquire(self) -> bool:
+        """Берет токен без ожидания, только если он свободен и очередь пуста.
+
+        Используется для необязательных запросов (например, дублирующих),
+        которые не должны вставать в очередь перед обычными.
+        """
+        self._refill()
+        if self._queue or self._tokens < 1:
+            return False
+        self._tokens -= 1
+        self._record(0.0)
+        return True
+
+    async def _dispatch(self) -> None:
+        """Выдает токены ожидающим по мере пополнения корзины."""
+        while self._queue:
+            # Пропускаем ожидания, отмененные по дедлайну
+            while self._queue and self._queue[0][2].done():
+                heapq.heappop(self._queue)
+            if not self._queue:
+                break
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                _, _, future = heapq.heappop(self._queue)
+                future.set_result(None)
+            else:
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def _record(self, waited: float) -> None:
+        self._stats.granted += 1
+        self._stats.total_wait += waited
+        self._stats.max_wait = max(self._stats.max_wait, waited)
+
+    def stats(self) -> QuotaStats:
+        """Возвращает статистику очереди и времени ожидания."""
+        stats = QuotaStats(**asdict(self._stats))
+        stats.queue_depth = sum(1 for _, _, future in self._queue if not future.done())
+        return stats
+
+
+# Общий планировщик для всех обращений процесса к Places API
+upstream_quota = QuotaScheduler(**api_config.UPSTREAM_QUOTA)
@@ -0,0 +1,62 @@
+import time
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+
+class SlidingWindowLimiter:
+    """Ограничитель частоты запросов по скользящему окну (sliding window counter).
+
+    Для каждого ключа хранится только начало текущего окна и два счетчика
+    (предыдущее и текущее окно). Оценка числа запросов за последние period
+    секунд: prev * (доля предыдущего окна, попадающая в интервал) + curr.
+    Это исключает двойные всплески на границе фиксированных окон.
+
+    Время берется из монотонных часов. Память ограничена max_keys записями:
+    давно неактивные ключи и самые старые по использованию вытесняются (LRU).
+    """
+
+    def __init__(self, limit: int, period: float, max_keys: int = 10000):
+        """
+        Args:
+            limit: Допустимое число запросов за период
+            period: Длина окна в секундах
+            max_keys: Максимальное число отслеживаемых ключей
+        """
+        self._limit = limit
+        self._period = float(period)
+        self._max_keys = max_keys
+        # ключ -> (начало текущего окна, счетчик предыдущего окна, счетчик текущего окна)
+        self._windows: "OrderedDict[Hashable, Tuple[float, int, int]]" = OrderedDict()
+
+    def allow(self, key: Hashable) -> bool:
+        """Регистрирует запрос и возвращает True, если он укладывается в лимит."""
+        now = time.monotonic()
+        start, prev, curr = self._windows.get(key, (now, 0, 0))
+
+        elapsed = now - start
+        if elapsed >= 2 * self._period:
+            start, prev, curr = now, 0, 0
+        elif elapsed >= self._period:
+            start, prev, curr = start + self._period, curr, 0
+
+        weight = 1.0 - (now - start) / self._period
+        allowed = prev * weight + curr < self._limit
+        if allowed:
+            curr += 1
+
+        self._windows[key] = (start, prev, curr)
+        self._windows.move_to_end(key)
+        self._evict(now)
+        return allowed
+
+    def _evict(self, now: float) -> None:
+        """Удаляет неактивные ключи и соблюдает ограничение по количеству."""
+        while self._windows:
+            key, (start, _, _) = next(iter(self._windows.items()))
+            idle = now - start >= 2 * self._period
+            if not idle and len(self._windows) <= self._max_keys:
+                break
+            del self._windows[key]
+
+    def __len__(self) -> int:
+        return len(self._windows)
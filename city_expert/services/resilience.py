@@ -0,0 +1,132 @@
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Optional
+from city_expert.services.exceptions import CircuitOpenError
+from city_expert.utils.logger import logger
+
+# HTTP-статусы, при которых запрос имеет смысл повторить
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Разбирает заголовок Retry-After (секунды или HTTP-дата) в секунды ожидания."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """Политика повторов с экспоненциальной задержкой и полным джиттером."""
+
+    def __init__(self, attempts: int, base_delay: float, max_delay: float, max_retry_after: float):
+        """
+        Args:
+            attempts: Максимальное число попыток (включая первую)
+            base_delay: Базовая задержка в секундах
+            max_delay: Максимальная задержка между попытками в секундах
+            max_retry_after: Максимальное значение Retry-After, которое мы готовы ждать
+        """
+        self.attempts = attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._max_retry_after = max_retry_after
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Возвращает задержку перед следующей попыткой или None, если повторять не стоит.
+
+        Args:
+            attempt: Номер завершившейся попытки (с нуля)
+            retry_after: Значение Retry-After из ответа сервера (сек)
+        """
+        if attempt + 1 >= self.attempts:
+            return None
+        if retry_after is not None:
+            # Сервер сам сказал, когда повторять: ждем не меньше, но в разумных пределах
+            return retry_after if retry_after <= self._max_retry_after else None
+        return random.uniform(0, min(self._max_delay, self._base_delay * 2 ** attempt))
+
+
+class CircuitState(Enum):
+    """Состояния автоматического выключателя."""
+    CLOSED = "closed"        # запросы проходят
+    OPEN = "open"            # запросы отклоняются сразу
+    HALF_OPEN = "half_open"  # пропускается один пробный запрос
+
+
+class CircuitBreaker:
+    """Автоматический выключатель для вызовов внешнего API.
+
+    После failure_threshold неудач подряд размыкается и в течение reset_timeout
+    сразу отклоняет вызовы. Затем пропускает один пробный запрос: успех замыкает
+    цепь, неудача снова размыкает её.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, name: str = "places"):
+        """
+        Args:
+            failure_threshold: Число неудач подряд до размыкания
+            reset_timeout: Время (сек) в разомкнутом состоянии до пробного запроса
+            name: Имя выключателя для логов
+        """
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._name = name
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def before_call(self) -> None:
+        """Проверяет, можно ли выполнить вызов.
+
+        Raises:
+            CircuitOpenError: Если выключатель разомкнут или пробный запрос уже выполняется
+        """
+        if self._state is CircuitState.CLOSED:
+            return
+        if self._state is CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self._reset_timeout:
+                raise CircuitOpenError("Сервис поиска временно недоступен")
+            self._state = CircuitState.HALF_OPEN
+            logger.info(f"Выключатель '{self._name}': пробный запрос")
+        if self._probe_in_flight:
+            raise CircuitOpenError("Сервис поиска временно недоступен")
+        self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        """Отмечает успешный вызов."""
+        if self._state is not CircuitState.CLOSED:
+            logger.info(f"Выключатель '{self._name}' замкнут: сервис восстановился")
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Снимает отметку пробного запроса, если вызов не состоялся (отмена, квота)."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Отмечает неудачный вызов и при необходимости размыкает цепь."""
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._state is CircuitState.HALF_OPEN or self._failures >= self._failure_threshold:
+            if self._state is not CircuitState.OPEN:
+                logger.warning(f"Выключатель '{self._name}' разомкнут после {self._failures} неудач")
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
@@ -0,0 +1,133 @@
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import List, Optional, Tuple
+import numpy as np
+from city_expert.services.opening_hours import open_mask
+from city_expert.services.places_api import Place
+from city_expert.utils.config_loader import api_config
+from city_expert.utils.geo import haversine_many, rank_order
+
+# Значения, по которым переключаются кнопки фильтров (None — фильтр выключен)
+RATING_STEPS: Tuple[Optional[float], ...] = (None, 4.0, 4.5)
+DISTANCE_STEPS: Tuple[Optional[float], ...] = (None, 500.0, 300.0)
+
+
+class SortOrder(str, Enum):
+    """Порядок сортировки результатов."""
+    RANK = "rank"          # составная оценка (близость, рейтинг, открыто сейчас)
+    DISTANCE = "distance"  # сначала ближайшие
+    RATING = "rating"      # сначала с высоким рейтингом
+
+
+def _next_step(steps: tuple, current):
+    """Возвращает значение, следующее за current в цикле steps."""
+    index = steps.index(current) if current in steps else 0
+    return steps[(index + 1) % len(steps)]
+
+
+@dataclass(frozen=True)
+class ResultFilter:
+    """Параметры фильтрации и сортировки результатов поиска."""
+    min_rating: Optional[float] = None
+    max_distance: Optional[float] = None  # метров
+    open_now: bool = False
+    has_phone: bool = False
+    has_website: bool = False
+    sort: SortOrder = SortOrder.RANK
+
+    @property
+    def needs_details(self) -> bool:
+        """Требует ли фильтр полей, загружаемых через getDetails."""
+        return self.open_now or self.has_phone or self.has_website
+
+    def toggled(self, option: str) -> "ResultFilter":
+        """Возвращает фильтр с переключенным параметром.
+
+        Args:
+            option: rating, distance, open, phone, web или sort
+
+        Raises:
+            ValueError: Если параметр неизвестен
+        """
+        if option == "rating":
+            return replace(self, min_rating=_next_step(RATING_STEPS, self.min_rating))
+        if option == "distance":
+            return replace(self, max_distance=_next_step(DISTANCE_STEPS, self.max_distance))
+        if option == "open":
+            return replace(self, open_now=not self.open_now)
+        if option == "phone":
+            return replace(self, has_phone=not self.has_phone)
+        if option == "web":
+            return replace(self, has_website=not self.has_website)
+        if option == "sort":
+            return replace(self, sort=_next_step(tuple(SortOrder), self.sort))
+        raise ValueError(f"Неизвестный параметр фильтра: {option}")
+
+
+def apply_filter(
+        places: List[Place],
+        result_filter: ResultFilter,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        strict: bool = True,
+        radius: float = api_config.DEFAULT_RADIUS,
+) -> List[Tuple[Place, Optional[float]]]:
+    """Фильтрует и сортирует результаты поиска в памяти (векторно, без запросов к API).
+
+    Args:
+        places: Надмножество результатов (из кэша)
+        result_filter: Параметры фильтрации
+        latitude: Широта пользователя (без нее фильтр по расстоянию не применяется)
+        longitude: Долгота пользователя
+        strict: Если False, места без загруженных подробностей проходят фильтры
+            по телефону, сайту и часам работы (кандидаты на догрузку)
+        radius: Радиус, относительно которого нормируется близость в составной оценке
+
+    Returns:
+        List[Tuple[Place, Optional[float]]]: Места и расстояния до них в метрах
+    """
+    if not places:
+        return []
+    has_location = latitude is not None and longitude is not None
+    distances = haversine_many(
+        latitude, longitude, [p.latitude for p in places], [p.longitude for p in places]
+    ) if has_location else np.full(len(places), np.nan)
+    ratings = np.array([p.rating if p.rating is not None else np.nan for p in places], dtype=np.float64)
+    # Открыто ли место сейчас — по скомпилированному расписанию, а не по снимку из кэша
+    open_now = open_mask([p.opening_hours for p in places])
+    unknown = np.array([not p.details_loaded for p in places]) if not strict else np.zeros(len(places), bool)
+
+    mask = np.ones(len(places), dtype=bool)
+    if result_filter.min_rating is not None:
+        mask &= np.nan_to_num(ratings, nan=0.0) >= result_filter.min_rating
+    if result_filter.max_distance is not None and has_location:
+        mask &= distances <= result_filter.max_distance
+    if result_filter.open_now:
+        mask &= open_now | unknown
+    if result_filter.has_phone:
+        mask &= np.array([bool(p.phone) for p in places]) | unknown
+    if result_filter.has_website:
+        mask &= np.array([bool(p.website) for p in places]) | unknown
+
+    indices = np.flatnonzero(mask)
+    selected_distances = distances[indices]
+    # Без геолокации расстояние не влияет на порядок
+    sort_distances = np.nan_to_num(selected_distances, nan=0.0)
+    if result_filter.sort is SortOrder.DISTANCE:
+        order = np.argsort(sort_distances, kind="stable")
+    elif result_filter.sort is SortOrder.RATING:
+        order = np.lexsort((sort_distances, -np.nan_to_num(ratings[indices], nan=-1.0)))
+    else:
+        # «Открыто сейчас» влияет на порядок, только если часы работы известны у всех мест:
+        # иначе места без догруженных подробностей проигрывали бы только из-за этого
+        selected = [places[i] for i in indices]
+        open_term = (
+            open_now[indices].astype(np.float64)
+            if selected and all(p.details_loaded for p in selected) else None
+        )
+        order = rank_order(sort_distances, ratings[indices], open_term, result_filter.max_distance or radius)
+
+    return [
+        (places[indices[i]], None if np.isnan(selected_distances[i]) else float(selected_distances[i]))
+        for i in order
+    ]
@@ -0,0 +1,56 @@
+import secrets
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Optional, Tuple
+from cachetools import TTLCache
+from city_expert.services.places_api import Place
+from city_expert.services.result_filter import ResultFilter
+
+
+@dataclass
+class SearchSession:
+    """Результаты одного поиска, которые можно перерисовать без запроса к API."""
+    user_id: int
+    query: str
+    places: List[Place]                   # надмножество результатов из кэша
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    filter: ResultFilter = field(default_factory=ResultFilter)
+    page: int = 0                         # текущая страница списка
+    # Отфильтрованные места с расстояниями; сбрасываются при смене фильтра
+    results: Optional[List[Tuple[Place, Optional[float]]]] = None
+    # Следующие страницы ответа API (PlacesAPI.search_stream); None — страниц больше нет
+    more: Optional[AsyncIterator[List[Place]]] = None
+
+
+class SessionStore:
+    """Ограниченное хранилище сессий результатов поиска в памяти.
+
+    Сессии адресуются короткими случайными идентификаторами (помещаются
+    в callback_data кнопок) и вытесняются по TTL и размеру.
+    """
+
+    def __init__(self, max_sessions: int, ttl: float):
+        """
+        Args:
+            max_sessions: Максимальное число хранимых сессий
+            ttl: Время жизни сессии в секундах
+        """
+        self._sessions: TTLCache = TTLCache(maxsize=max_sessions, ttl=ttl)
+
+    def create(self, session: SearchSession) -> str:
+        """Сохраняет сессию и возвращает ее идентификатор."""
+        session_id = secrets.token_urlsafe(6)
+        while session_id in self._sessions:
+            session_id = secrets.token_urlsafe(6)
+        self._sessions[session_id] = session
+        return session_id
+
+    def get(self, session_id: str, user_id: int) -> Optional[SearchSession]:
+        """Возвращает сессию пользователя или None, если она истекла (или чужая)."""
+        session = self._sessions.get(session_id)
+        if session is None or session.user_id != user_id:
+            return None
+        return session
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,277 @@
+import asyncio
+import time
+from datetime import timedelta
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Union
+from cachetools import TTLCache
+from telegram import Bot, InputMediaPhoto, Message
+from telegram.constants import MessageLimit
+from telegram.error import RetryAfter
+from city_expert.services.exceptions import QuotaExceededError
+from city_expert.services.quota import QuotaScheduler
+from city_expert.utils.logger import logger
+
+# Максимум фото в одной медиагруппе Telegram
+MEDIA_GROUP_LIMIT = 10
+
+
+@dataclass
+class OutgoingMessage:
+    """Сообщение в очереди отправки."""
+    chat_id: int
+    text: str                                  # текст сообщения или подпись к фото
+    photo: Optional[Union[str, bytes]] = None  # file_id, ссылка или байты изображения
+    parse_mode: Optional[str] = None
+    reply_markup: Any = None
+    options: Dict[str, Any] = field(default_factory=dict)  # прочие параметры send_message
+    fallback: Optional["OutgoingMessage"] = None           # что отправить, если Telegram отклонил сообщение
+    future: Optional[asyncio.Future] = None
+
+    @property
+    def is_plain_text(self) -> bool:
+        """Текст без клавиатуры — можно склеить с соседними."""
+        return self.photo is None and self.reply_markup is None and not self.options
+
+    @property
+    def is_plain_photo(self) -> bool:
+        """Фото без клавиатуры — можно отправить медиагруппой."""
+        return self.photo is not None and self.reply_markup is None and not self.options
+
+
+@dataclass
+class SendStats:
+    """Статистика планировщика отправки."""
+    sent: int = 0           # отправлено запросов к Telegram
+    coalesced: int = 0      # сообщений, объединенных с соседними
+    retries: int = 0        # повторов после RetryAfter
+    failed: int = 0         # сообщений, которые не удалось отправить
+    queued: int = 0         # сообщений в очередях сейчас
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class SendScheduler:
+    """Централизованная отправка сообщений с учетом лимитов Telegram.
+
+    У каждого чата своя очередь и свой обработчик: сообщения чата уходят
+    по порядку и не чаще одного в chat_interval секунд. Общий token bucket
+    ограничивает отправку по всем чатам. Стоящие подряд тексты без клавиатур
+    склеиваются в одно сообщение, фото без клавиатур — в медиагруппу.
+    RetryAfter приостанавливает очередь чата на указанное Telegram время.
+
+    Обработчики могут не ждать отправки: send_* возвращает future с
+    отправленным сообщением.
+    """
+
+    def __init__(
+            self,
+            bot: Bot,
+            global_rate: float,
+            chat_interval: float,
+            max_retries: int,
+            max_queue: int,
+            max_wait: float,
+            max_chats: int,
+    ):
+        """
+        Args:
+            bot: Бот, через которого отправляются сообщения
+            global_rate: Сообщений в секунду по всем чатам
+            chat_interval: Минимальный интервал между сообщениями в один чат (сек)
+            max_retries: Повторов после RetryAfter
+            max_queue: Максимум сообщений в очереди одного чата
+            max_wait: Дедлайн ожидания глобального лимита (сек)
+            max_chats: Сколько чатов помнить время последней отправки
+        """
+        self._bot = bot
+        self._bucket = QuotaScheduler(rate=global_rate, burst=int(global_rate), max_wait=max_wait)
+        self._chat_interval = chat_interval
+        self._max_retries = max_retries
+        self._max_queue = max_queue
+        self._queues: Dict[int, Deque[OutgoingMessage]] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        # Время последней отправки в чат переживает обработчик очереди:
+        # новое сообщение после опустевшей очереди тоже ждет chat_interval
+        self._last_sent: TTLCache = TTLCache(maxsize=max_chats, ttl=chat_interval)
+        self._stats = SendStats()
+
+    def send_text(
+            self,
+            chat_id: int,
+            text: str,
+            parse_mode: Optional[str] = None,
+            reply_markup: Any = None,
+            **options: Any,
+    ) -> asyncio.Future:
+        """Ставит текстовое сообщение в очередь чата.
+
+        Returns:
+            asyncio.Future: Завершится отправленным сообщением (или исключением)
+        """
+        return self.submit(OutgoingMessage(chat_id, text, None, parse_mode, reply_markup, options))
+
+    def send_photo(
+            self,
+            chat_id: int,
+            photo: Union[str, bytes],
+            caption: str,
+            parse_mode: Optional[str] = None,
+            reply_markup: Any = None,
+            fallback_text: bool = True,
+    ) -> asyncio.Future:
+        """Ставит фото с подписью в очередь чата.
+
+        Args:
+            fallback_text: Если Telegram отклонит фото, отправить подпись текстом
+
+        Returns:
+            asyncio.Future: Завершится отправленным сообщением (фото или текстом)
+        """
+        fallback = OutgoingMessage(chat_id, caption, None, parse_mode, reply_markup) if fallback_text else None
+        return self.submit(OutgoingMessage(chat_id, caption, photo, parse_mode, reply_markup, fallback=fallback))
+
+    def submit(self, message: OutgoingMessage) -> asyncio.Future:
+        """Ставит сообщение в очередь чата и запускает обработчик очереди при необходимости."""
+        message.future = asyncio.get_running_loop().create_future()
+        # Результат может никто не ждать — исключение не должно попадать в лог как необработанное
+        message.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        queue = self._queues.setdefault(message.chat_id, deque())
+        if len(queue) >= self._max_queue:
+            self._stats.failed += 1
+            message.future.set_exception(QuotaExceededError("Очередь отправки в чат переполнена"))
+            return message.future
+        queue.append(message)
+        self._stats.queued += 1
+
+        worker = self._workers.get(message.chat_id)
+        if worker is None or worker.done():
+            self._workers[message.chat_id] = asyncio.create_task(self._drain(message.chat_id))
+        return message.future
+
+    def _take_batch(self, queue: Deque[OutgoingMessage]) -> List[OutgoingMessage]:
+        """Извлекает из очереди следующее сообщение и соседние, которые можно объединить."""
+        batch = [queue.popleft()]
+        first = batch[0]
+        if first.is_plain_text:
+            length = len(first.text)
+            while (
+                    queue and queue[0].is_plain_text
+                    and queue[0].parse_mode == first.parse_mode
+                    and length + 2 + len(queue[0].text) <= MessageLimit.MAX_TEXT_LENGTH
+            ):
+                length += 2 + len(queue[0].text)
+                batch.append(queue.popleft())
+        elif first.is_plain_photo:
+            while (
+                    queue and queue[0].is_plain_photo
+                    and len(batch) < MEDIA_GROUP_LIMIT
+                    and len(queue[0].text) <= MessageLimit.CAPTION_LENGTH
+            ):
+                batch.append(queue.popleft())
+        self._stats.queued -= len(batch)
+        self._stats.coalesced += len(batch) - 1
+        return batch
+
+    async def _drain(self, chat_id: int) -> None:
+        """Обработчик очереди чата: отправляет сообщения по порядку с интервалом."""
+        queue = self._queues[chat_id]
+        batch: List[OutgoingMessage] = []
+        try:
+            while queue:
+                batch = self._take_batch(queue)
+                last_sent = self._last_sent.get(chat_id)
+                if last_sent is not None:
+                    delay = last_sent + self._chat_interval - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await self._send_batch(batch)
+                self._last_sent[chat_id] = time.monotonic()
+        finally:
+            # При отмене обработчика ждущие отправки не должны зависнуть
+            for item in [*batch, *queue]:
+                if not item.future.done():
+                    item.future.cancel()
+            self._stats.queued -= len(queue)
+            queue.clear()
+            self._queues.pop(chat_id, None)
+            self._workers.pop(chat_id, None)
+
+    async def _send_batch(self, batch: List[OutgoingMessage]) -> None:
+        """Отправляет пакет (с повторами после RetryAfter) и завершает futures сообщений."""
+        error: Optional[Exception] = None
+        for attempt in range(self._max_retries + 1):
+            try:
+                await self._bucket.acquire()
+                messages = await self._deliver(batch)
+                self._stats.sent += 1
+                for item, message in zip(batch, messages):
+                    if not item.future.done():
+                        item.future.set_result(message)
+                if len(messages) < len(batch):
+                    error = RuntimeError("Telegram вернул меньше сообщений, чем отправлено")
+                break
+            except RetryAfter as e:
+                retry_after = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else e.retry_after
+                if attempt == self._max_retries:
+                    error = e
+                    break
+                self._stats.retries += 1
+                logger.warning(f"Telegram просит подождать {retry_after} с перед отправкой в чат {batch[0].chat_id}")
+                await asyncio.sleep(float(retry_after))
+            except Exception as e:
+                # Любая ошибка отправки завершает futures — иначе ожидающие их зависнут
+                error = e
+                break
+
+        if all(item.future.done() for item in batch):
+            return
+        logger.warning(f"Не удалось отправить сообщение в чат {batch[0].chat_id}: {error}")
+        for item in batch:
+            if item.fallback is not None and not isinstance(error, RetryAfter):
+                # Например, устаревший file_id фото — отправляем текстом
+                await self._send_batch([self._with_future(item.fallback, item.future)])
+            elif not item.future.done():
+                self._stats.failed += 1
+                item.future.set_exception(error)
+
+    @staticmethod
+    def _with_future(message: OutgoingMessage, future: asyncio.Future) -> OutgoingMessage:
+        message.future = future
+        return message
+
+    async def _deliver(self, batch: List[OutgoingMessage]) -> List[Message]:
+        """Выполняет запрос к Telegram для пакета; возвращает сообщение для каждого элемента."""
+        first = batch[0]
+        if first.photo is None:
+            message = await self._bot.send_message(
+                chat_id=first.chat_id,
+                text="\n\n".join(item.text for item in batch),
+                parse_mode=first.parse_mode,
+                reply_markup=first.reply_markup,
+                **first.options,
+            )
+            return [message] * len(batch)
+        if len(batch) == 1:
+            message = await self._bot.send_photo(
+                chat_id=first.chat_id,
+                photo=first.photo,
+                caption=first.text,
+                parse_mode=first.parse_mode,
+                reply_markup=first.reply_markup,
+            )
+            return [message]
+        messages = await self._bot.send_media_group(
+            chat_id=first.chat_id,
+            media=[
+                InputMediaPhoto(media=item.photo, caption=item.text, parse_mode=item.parse_mode)
+                for item in batch
+            ],
+        )
+        return list(messages)
+
+    def stats(self) -> SendStats:
+        """Возвращает статистику отправки."""
+        return SendStats(**self._stats.__dict__)
@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+from city_expert.utils.logger import logger
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Объединяет одновременные одинаковые запросы в один.
+
+    Первый вызов с ключом запускает задачу, остальные вызовы с тем же ключом,
+    пришедшие до её завершения, ожидают тот же результат (или то же исключение).
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.coalesced = 0  # количество вызовов, присоединившихся к уже идущему запросу
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Выполняет factory() один раз на ключ среди одновременных вызовов.
+
+        Args:
+            key: Ключ запроса (например, ключ кэша)
+            factory: Функция, создающая корутину запроса
+
+        Returns:
+            Результат общей задачи
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+            logger.debug(f"Запрос присоединен к уже выполняющемуся: {key}")
+        # shield: отмена одного ожидающего не отменяет запрос для остальных
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        """Удаляет завершенную задачу; исключение помечается как обработанное,
+        даже если все ожидающие уже ушли (например, по тайм-ауту)."""
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,139 @@
+import asyncio
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional
+import httpx
+from city_expert.utils.logger import logger
+from city_expert.utils.config_loader import api_config
+
+
+def _http2_available() -> bool:
+    """Проверяет, установлен ли пакет h2, необходимый httpx для HTTP/2."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+@dataclass
+class PoolStats:
+    """Статистика пула соединений к API."""
+    requests: int = 0               # отправлено запросов
+    responses: int = 0              # получено ответов
+    errors: int = 0                 # сетевых ошибок
+    connections: int = 0            # открытых соединений в пуле
+    idle_connections: int = 0       # простаивающих соединений
+    http2_connections: int = 0      # соединений по HTTP/2
+    http2_enabled: bool = False     # включен ли HTTP/2
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class PlacesTransport:
+    """Общий настраиваемый HTTP-клиент для обращений к Places API.
+
+    Держит один пул соединений с keep-alive (и HTTP/2, если доступен пакет h2),
+    раздельными тайм-аутами и возможностью прогрева соединений при старте.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            settings: Параметры пула (по умолчанию api_config.HTTP_POOL)
+        """
+        self._settings = dict(settings or api_config.HTTP_POOL)
+        self._stats = PoolStats()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Возвращает общий клиент, создавая его при первом обращении."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Создает httpx.AsyncClient с параметрами пула из настроек."""
+        settings = self._settings
+        http2 = settings["http2"] and _http2_available()
+        if settings["http2"] and not http2:
+            logger.warning("Пакет h2 не установлен, HTTP/2 отключен")
+        self._stats.http2_enabled = http2
+
+        return httpx.AsyncClient(
+            base_url=f"https://{api_config.BASE_URL}",
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings["max_connections"],
+                max_keepalive_connections=settings["max_keepalive_connections"],
+                keepalive_expiry=settings["keepalive_expiry"],
+            ),
+            timeout=httpx.Timeout(
+                connect=settings["connect_timeout"],
+                read=settings["read_timeout"],
+                write=settings["write_timeout"],
+                pool=settings["pool_timeout"],
+            ),
+            event_hooks={
+                "request": [self._on_request],
+                "response": [self._on_response],
+            },
+        )
+
+    async def _on_request(self, _: httpx.Request) -> None:
+        self._stats.requests += 1
+
+    async def _on_response(self, _: httpx.Response) -> None:
+        self._stats.responses += 1
+
+    async def post(self, endpoint: str, **kwargs) -> httpx.Response:
+        """Отправляет POST-запрос к эндпоинту API через общий пул."""
+        try:
+            return await self.client.post(endpoint, **kwargs)
+        except httpx.RequestError:
+            self._stats.errors += 1
+            raise
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """Отправляет GET-запрос через общий пул (url может быть абсолютным)."""
+        try:
+            return await self.client.get(url, **kwargs)
+        except httpx.RequestError:
+            self._stats.errors += 1
+            raise
+
+    async def warm_up(self) -> None:
+        """Заранее открывает соединения (TCP + TLS) к хосту API.
+
+        Ответ на запрос не важен: цель — установить соединения, которые
+        останутся в пуле keep-alive для первых пользовательских запросов.
+        """
+        count = self._settings["warmup_connections"]
+        if count <= 0:
+            return
+        results = await asyncio.gather(
+            *(self.client.head("/") for _ in range(count)),
+            return_exceptions=True,
+        )
+        failed = sum(isinstance(r, Exception) for r in results)
+        logger.info(f"Прогрев соединений к API: {count - failed}/{count} успешно")
+
+    def stats(self) -> PoolStats:
+        """Возвращает статистику пула соединений."""
+        stats = PoolStats(**asdict(self._stats))
+        # httpx не предоставляет публичного API пула, читаем состояние httpcore
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        for connection in getattr(pool, "connections", []):
+            stats.connections += 1
+            if connection.is_idle():
+                stats.idle_connections += 1
+            if "HTTP/2" in connection.info():
+                stats.http2_connections += 1
+        return stats
+
+    async def close(self) -> None:
+        """Закрывает все соединения пула."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
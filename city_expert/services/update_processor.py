@@ -0,0 +1,119 @@
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Dict, Optional
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+from city_expert.utils.logger import logger
+
+
+@dataclass
+class UpdateStats:
+    """Статистика обработки обновлений."""
+    processed: int = 0          # обработано обновлений
+    waiting: int = 0            # обновлений, ожидающих очереди чата или свободного слота
+    running: int = 0            # обновлений в обработке сейчас
+    total_wait: float = 0.0     # суммарное ожидание перед обработкой (сек)
+    max_wait: float = 0.0       # максимальное ожидание перед обработкой (сек)
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.processed if self.processed else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "avg_wait": self.avg_wait}
+
+
+class _ChatQueue:
+    """Очередь обновлений одного чата: блокировка и число ожидающих ее обновлений."""
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Параллельная обработка обновлений с сохранением порядка внутри чата.
+
+    Обновления разных чатов обрабатываются одновременно (не больше
+    max_concurrent), а обновления одного чата — строго по очереди, поэтому
+    нажатия «в избранное» / «удалить» применяются в порядке нажатия.
+    Inline-запросы не привязаны к чату и обрабатываются без очереди
+    (иначе пауза ввода в inline-поиске задерживала бы следующие запросы).
+
+    Родительский семафор ограничивает число принятых обновлений
+    (max_pending), а обработку — собственный семафор: обновление, ждущее
+    своей очереди в чате, не занимает слот обработки.
+    """
+
+    def __init__(self, max_concurrent: int, max_pending: int):
+        """
+        Args:
+            max_concurrent: Максимум одновременно обрабатываемых обновлений
+            max_pending: Максимум принятых обновлений (в обработке и в очередях чатов)
+        """
+        super().__init__(max_concurrent_updates=max(max_pending, max_concurrent))
+        self._running = asyncio.BoundedSemaphore(max_concurrent)
+        self._chats: Dict[int, _ChatQueue] = {}
+        self._stats = UpdateStats()
+
+    @staticmethod
+    def _chat_key(update: object) -> Optional[int]:
+        """Возвращает чат, внутри которого важен порядок обновления (или None)."""
+        if isinstance(update, Update) and update.effective_chat is not None:
+            return update.effective_chat.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """Обрабатывает обновление после предыдущих обновлений того же чата."""
+        key = self._chat_key(update)
+        self._stats.waiting += 1
+        if key is None:
+            await self._run(time.monotonic(), coroutine)
+            return
+
+        chat = self._chats.get(key)
+        if chat is None:
+            chat = self._chats[key] = _ChatQueue()
+        chat.users += 1
+        received = time.monotonic()
+        try:
+            async with chat.lock:
+                await self._run(received, coroutine)
+        finally:
+            chat.users -= 1
+            if not chat.users:
+                self._chats.pop(key, None)
+
+    async def _run(self, received: float, coroutine: Awaitable[Any]) -> None:
+        """Ждет свободный слот и выполняет обработку, учитывая время ожидания."""
+        try:
+            await self._running.acquire()
+        finally:
+            self._stats.waiting -= 1
+        waited = time.monotonic() - received
+        self._stats.total_wait += waited
+        self._stats.max_wait = max(self._stats.max_wait, waited)
+        self._stats.running += 1
+        try:
+            await coroutine
+        finally:
+            self._stats.running -= 1
+            self._stats.processed += 1
+            self._running.release()
+
+    def stats(self) -> UpdateStats:
+        """Возвращает статистику очередей и ожидания обновлений."""
+        return UpdateStats(**self._stats.__dict__)
+
+    async def initialize(self) -> None:
+        """Ресурсы не требуются — очереди чатов создаются по мере необходимости."""
+
+    async def shutdown(self) -> None:
+        """Логирует итоговую статистику ожидания обновлений."""
+        stats = self.stats()
+        logger.debug(
+            f"Обработано обновлений: {stats.processed}, ожидание в среднем {stats.avg_wait:.3f} с, "
+            f"максимум {stats.max_wait:.3f} с"
+        )
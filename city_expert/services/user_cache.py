@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from typing import Optional
+from cachetools import TTLCache
+from telegram import User as TelegramUser
+from city_expert.models import UserRepository
+
+
+@dataclass(frozen=True)
+class UserRecord:
+    """Легкая запись пользователя из кэша (без обращения к БД)."""
+    id: int                      # первичный ключ в таблице users
+    telegram_id: int
+    full_name: str
+    username: Optional[str]
+
+
+class UserCache:
+    """Карта telegram_id -> пользователь в БД, общая для всех обработчиков.
+
+    Пользователь создается в БД при первом обращении; дальше запись берется
+    из памяти, а БД обновляется только при смене имени или username.
+    """
+
+    def __init__(self, repository: UserRepository, max_users: int, ttl: float):
+        """
+        Args:
+            repository: Доступ к пользователям в БД
+            max_users: Сколько пользователей держать в памяти
+            ttl: Через сколько секунд запись перечитывается из БД
+        """
+        self._repository = repository
+        self._users: TTLCache = TTLCache(maxsize=max_users, ttl=ttl)
+
+    async def get(self, telegram_user: TelegramUser) -> UserRecord:
+        """Возвращает пользователя, создавая или обновляя запись в БД при необходимости.
+
+        Args:
+            telegram_user: Пользователь из обновления Telegram (effective_user / from_user)
+
+        Returns:
+            UserRecord: Запись пользователя
+        """
+        record = self._users.get(telegram_user.id)
+        if (
+                record is not None
+                and record.full_name == telegram_user.full_name
+                and record.username == telegram_user.username
+        ):
+            return record
+
+        if record is None:
+            user, created = await self._repository.get_or_create(
+                telegram_user.id, telegram_user.full_name, telegram_user.username
+            )
+            user_id = user.id
+            changed = not created and (
+                user.full_name != telegram_user.full_name or user.username != telegram_user.username
+            )
+        else:
+            user_id, changed = record.id, True
+
+        if changed:
+            await self._repository.update_names(user_id, telegram_user.full_name, telegram_user.username)
+
+        record = UserRecord(
+            id=user_id,
+            telegram_id=telegram_user.id,
+            full_name=telegram_user.full_name,
+            username=telegram_user.username,
+        )
+        self._users[telegram_user.id] = record
+        return record
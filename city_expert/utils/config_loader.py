@@ -1,7 +1,7 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import Final, Literal
+from typing import Final, Literal, Optional
 
 # Определяем путь к .env файлу (3 уровня выше текущего файла)
 ENV_PATH: Final[Path] = Path(__file__).parent.parent.parent / ".env"
@@ -20,6 +20,7 @@ class Settings(BaseSettings):
         DATABASE_URL (str): URL подключения к БД (по умолчанию SQLite)
         DEBUG (bool): Режим отладки (по умолчанию False)
         LOG_LEVEL (str): Уровень логирования (по умолчанию INFO)
+        PHOTO_MEDIA_BASE_URL (str): Адрес media-эндпоинта фото (по умолчанию https://BASE_URL)
     """
 
     # Обязательные параметры (без значений по умолчанию)
@@ -29,6 +30,8 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///data/city_expert.db"
     DEBUG: bool = False
     LOG_LEVEL: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
+    # Адрес media-эндпоинта фото можно переопределить (например, локальной заглушкой)
+    PHOTO_MEDIA_BASE_URL: Optional[str] = None
 
 
     class Config:
@@ -54,28 +57,179 @@ class APIConfig:
         NEARBY_SEARCH_ENDPOINT (str): Эндпоинт для поиска поблизости
         PLACE_DETAILS_ENDPOINT (str): Эндпоинт для деталей места
         DEFAULT_HEADERS (dict): Заголовки по умолчанию для API запросов
+        LIST_FIELD_MASK (str): Минимальный набор полей для списков результатов поиска
+        TEXT_LIST_FIELD_MASK (str): То же для searchText, с токеном следующей страницы
+        DETAILS_FIELD_MASK (str): Поля, запрашиваемые через getDetails для показываемых мест
         DEFAULT_RADIUS (float): Радиус поиска по умолчанию (в метрах)
         RATE_LIMIT (dict): Настройки ограничения запросов
+        DISK_CACHE (dict): Настройки дискового кэша ответов (путь, TTL, лимит размера)
+        HTTP_POOL (dict): Настройки пула HTTP-соединений (лимиты, keep-alive, HTTP/2, тайм-ауты)
+        UPSTREAM_QUOTA (dict): Глобальный лимит запросов к API (запросов/сек, всплеск, дедлайн ожидания)
+        RESILIENCE (dict): Настройки повторов запросов и автоматического выключателя
+        HEDGING (dict): Настройки дублирования медленных запросов и бюджета времени на поиск
+        PLACE_CATALOG (dict): Настройки локального каталога мест (путь, свежесть, минимум мест)
+        RESULT_SESSIONS (dict): Настройки сессий результатов для фильтров и страниц (размер, TTL, размер страницы)
+        USER_CACHE (dict): Размеры кэшей данных пользователей в памяти
+        DB_EXECUTOR (dict): Настройки потоков для запросов к БД (писатель один, читателей несколько)
+        HISTORY_WRITER (dict): Настройки пакетной записи истории поиска (размер пакета, интервал, буфер)
+        PHOTOS (dict): Настройки загрузки фото мест (размеры, пул обработки)
+        CALLBACKS (dict): Настройки реестра данных inline-кнопок (размер кэша, срок хранения, отложенная запись)
+        INLINE_MODE (dict): Настройки inline-режима (пауза ввода, длина запроса, тайм-аут, кэш ответов)
+        UPDATE_PROCESSOR (dict): Параллельная обработка обновлений (одновременно, максимум принятых)
+        SEND_SCHEDULER (dict): Лимиты отправки сообщений в Telegram (общий, на чат, повторы после RetryAfter)
+        STATS (dict): Периодическое логирование статистики очередей, пулов и лимитов
     """
     BASE_URL: Final[str] = "google-map-places-new-v2.p.rapidapi.com"
     SEARCH_TEXT_ENDPOINT: Final[str] = "/v1/places:searchText"
     NEARBY_SEARCH_ENDPOINT: Final[str] = "/v1/places:searchNearby"
     PLACE_DETAILS_ENDPOINT: Final[str] = "/v1/places:getDetails"
 
+    # Поиск возвращает только то, что нужно для списка; остальное — через getDetails
+    LIST_FIELD_MASK: Final[str] = (
+        "places.id,places.displayName,places.formattedAddress,places.location,places.rating,"
+        "places.types"
+    )
+    TEXT_LIST_FIELD_MASK: Final[str] = LIST_FIELD_MASK + ",nextPageToken"
+    DETAILS_FIELD_MASK: Final[str] = (
+        "id,websiteUri,nationalPhoneNumber,currentOpeningHours,utcOffsetMinutes,photos"
+    )
+
     DEFAULT_RADIUS: Final[float] = 1000.0  # 1 км
 
     RATE_LIMIT: Final[dict] = {
         "requests": 5,
-        "period": 60  # секунд
+        "period": 60,  # секунд
+        "max_users": 10000  # максимум отслеживаемых пользователей
+    }
+
+    DISK_CACHE: Final[dict] = {
+        "path": "data/places_cache.db",
+        "ttl": 24 * 3600,  # секунд
+        "max_bytes": 64 * 1024 * 1024  # 64 МБ
+    }
+
+    HTTP_POOL: Final[dict] = {
+        "max_connections": 20,
+        "max_keepalive_connections": 10,
+        "keepalive_expiry": 120.0,  # секунд
+        "http2": True,
+        "connect_timeout": 3.0,  # секунд
+        "read_timeout": 10.0,
+        "write_timeout": 5.0,
+        "pool_timeout": 5.0,
+        "warmup_connections": 2  # соединений, открываемых при старте
+    }
+
+    UPSTREAM_QUOTA: Final[dict] = {
+        "rate": 5.0,  # запросов в секунду на весь процесс (тариф RapidAPI)
+        "burst": 5,
+        "max_wait": 10.0  # секунд ожидания в очереди до отказа
+    }
+
+    RESILIENCE: Final[dict] = {
+        "attempts": 3,  # попыток запроса, включая первую
+        "backoff_base": 0.5,  # секунд
+        "backoff_max": 4.0,
+        "max_retry_after": 10.0,  # дольше по Retry-After не ждем
+        "failure_threshold": 5,  # неудач подряд до размыкания выключателя
+        "reset_timeout": 30.0  # секунд до пробного запроса
+    }
+
+    HEDGING: Final[dict] = {
+        "enabled": True,
+        "percentile": 95,  # дубль отправляется после p95 недавних задержек
+        "min_delay": 0.3,  # секунд
+        "min_samples": 20,  # замеров задержки до включения дублирования
+        "search_budget": 8.0  # секунд на поиск, после — данные из кэша (даже устаревшие)
+    }
+
+    PLACE_CATALOG: Final[dict] = {
+        "enabled": True,
+        "path": "data/place_catalog.db",
+        "freshness": 7 * 24 * 3600,  # секунд, в течение которых покрытие района актуально
+        "min_places": 3  # меньше мест в круге — спрашиваем API
+    }
+
+    RESULT_SESSIONS: Final[dict] = {
+        "max_sessions": 5000,
+        "ttl": 30 * 60,  # секунд, после — кнопки фильтров просят повторить поиск
+        "page_size": 5,  # мест на одной странице списка результатов
+        "details_batch": 10  # мест, для которых догружаются подробности при фильтре
+    }
+
+    DB_EXECUTOR: Final[dict] = {
+        "read_workers": 4
+    }
+
+    HISTORY_WRITER: Final[dict] = {
+        "batch_size": 100,  # строк в одной транзакции
+        "interval": 0.5,  # секунд до записи неполного пакета
+        "max_buffer": 1000  # строк в буфере, дальше добавление ждет записи
+    }
+
+    CALLBACKS: Final[dict] = {
+        "max_tokens": 20000,  # токенов кнопок в памяти
+        "max_age": 30 * 24 * 3600,  # секунд хранения данных кнопок в БД
+        "purge_interval": 3600,  # секунд между удалениями устаревших данных
+        "batch_size": 200,  # токенов в одной транзакции записи
+        "interval": 1.0,  # секунд до записи неполного пакета
+        "max_buffer": 2000  # токенов, ожидающих записи в БД
+    }
+
+    INLINE_MODE: Final[dict] = {
+        "debounce": 0.4,  # секунд паузы ввода до поиска
+        "min_query_length": 3,  # символов в запросе
+        "max_results": 20,  # результатов в ответе
+        "timeout": 8.0,  # секунд на поиск (Telegram ждет ответ ограниченное время)
+        "max_queries": 2000,  # запросов в кэше ответов
+        "ttl": 600,  # секунд жизни кэша ответов
+        "cache_time": 300,  # секунд кэширования ответа на стороне Telegram
+        "provisional_cache_time": 5,  # то же для временного ответа по похожему запросу
+        "rate_limit": {"requests": 20, "period": 60}  # inline-поисков пользователя, отдельно от RATE_LIMIT
+    }
+
+    UPDATE_PROCESSOR: Final[dict] = {
+        "max_concurrent": 16,  # обновлений в обработке одновременно (разные чаты)
+        "max_pending": 256  # принятых обновлений, дальше получение новых ждет
+    }
+
+    SEND_SCHEDULER: Final[dict] = {
+        "global_rate": 30,  # сообщений в секунду по всем чатам (лимит Telegram)
+        "chat_interval": 1.0,  # секунд между сообщениями в один чат
+        "max_retries": 3,  # повторов после RetryAfter
+        "max_queue": 50,  # сообщений в очереди одного чата
+        "max_wait": 30.0,  # секунд ожидания общего лимита
+        "max_chats": 10000  # чатов, для которых помнится время последней отправки
+    }
+
+    STATS: Final[dict] = {
+        "interval": 600  # секунд между записями статистики в лог
+    }
+
+    USER_CACHE: Final[dict] = {
+        "max_users": 10000,  # пользователей в памяти
+        "ttl": 3600,  # секунд до перечитывания пользователя из БД
+        "max_favorites": 10000  # пользователей, чьи множества избранного держатся в памяти
+    }
+
+    PHOTOS: Final[dict] = {
+        "enabled": True,
+        "max_width": 800,  # пикселей, запрашиваемых у API
+        "thumbnail_size": 640,  # сторона миниатюры для Telegram
+        "jpeg_quality": 85,
+        "max_bytes": 5 * 1024 * 1024,  # фото больше не скачиваем
+        "workers": 2,  # потоков обработки изображений
+        "max_cached_ids": 5000  # file_id в памяти (остальные — в БД)
     }
 
     @classmethod
-    def get_headers(cls, api_key: str) -> dict:
+    def get_headers(cls, api_key: str, field_mask: Optional[str] = None) -> dict:
         """
         Возвращает заголовки для API запросов.
 
         Args:
             api_key: Ключ API для авторизации
+            field_mask: Запрашиваемые поля (по умолчанию LIST_FIELD_MASK)
 
         Returns:
             dict: Заголовки запроса
@@ -84,9 +238,7 @@ class APIConfig:
             "X-RapidAPI-Key": api_key,
             "X-RapidAPI-Host": cls.BASE_URL,
             "Content-Type": "application/json",
-            "X-Goog-FieldMask": "places.displayName,places.formattedAddress,places.location,places.rating,"
-                                "places.websiteUri,places.nationalPhoneNumber,places.currentOpeningHours,"
-                                "places.photos"
+            "X-Goog-FieldMask": field_mask or cls.LIST_FIELD_MASK
         }
 
 
@@ -0,0 +1,190 @@
+from math import radians, sin, cos, sqrt, atan2, floor
+from typing import Optional, Tuple
+import numpy as np
+
+# Радиус Земли в метрах
+EARTH_RADIUS_M = 6371000.0
+
+# Длина одного градуса широты в метрах
+METERS_PER_DEGREE = 111320.0
+
+# Доля радиуса поиска, задающая сторону ячейки пространственной сетки
+CELL_FRACTION = 0.5
+
+# Веса составной оценки мест по умолчанию: (близость, рейтинг, открыто сейчас)
+RANK_WEIGHTS = (0.6, 0.3, 0.1)
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Вычисляет расстояние между двумя точками в метрах по формуле гаверсинусов.
+
+    Args:
+        lat1: Широта первой точки
+        lon1: Долгота первой точки
+        lat2: Широта второй точки
+        lon2: Долгота второй точки
+
+    Returns:
+        float: Расстояние в метрах
+    """
+    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
+    return EARTH_RADIUS_M * 2 * atan2(sqrt(a), sqrt(1 - a))
+
+
+def cell_size_m(radius: float) -> float:
+    """Возвращает сторону ячейки сетки (в метрах) для заданного радиуса поиска."""
+    return max(radius * CELL_FRACTION, 50.0)
+
+
+def geo_cell(latitude: float, longitude: float, radius: float) -> Tuple[int, int, int]:
+    """Квантует точку в ячейку равноплощадной сетки, размер которой зависит от радиуса.
+
+    Соседние точки (несколько метров друг от друга) попадают в одну ячейку,
+    поэтому их поисковые запросы разделяют один ключ кэша.
+
+    Args:
+        latitude: Широта точки
+        longitude: Долгота точки
+        radius: Радиус поиска в метрах
+
+    Returns:
+        Tuple[int, int, int]: (размер ячейки в метрах, индекс строки, индекс столбца)
+    """
+    size = int(cell_size_m(radius))
+    row = floor(latitude * METERS_PER_DEGREE / size)
+    # Ширина ячейки по долготе зависит от широты центра строки
+    row_lat = (row + 0.5) * size / METERS_PER_DEGREE
+    lon_step = size / (METERS_PER_DEGREE * max(cos(radians(row_lat)), 1e-6))
+    col = floor(longitude / lon_step)
+    return size, row, col
+
+
+def cell_center(cell: Tuple[int, int, int]) -> Tuple[float, float]:
+    """Возвращает координаты центра ячейки, полученной из geo_cell."""
+    size, row, col = cell
+    lat = (row + 0.5) * size / METERS_PER_DEGREE
+    lon_step = size / (METERS_PER_DEGREE * max(cos(radians(lat)), 1e-6))
+    return lat, (col + 0.5) * lon_step
+
+
+def cell_search_radius(radius: float) -> float:
+    """Радиус запроса из центра ячейки, покрывающий круг радиуса radius
+    вокруг любой точки ячейки (радиус + половина диагонали ячейки)."""
+    return radius + cell_size_m(radius) * sqrt(2) / 2
+
+
+
+def _as_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def haversine_many(latitude: float, longitude: float, lats, lons) -> np.ndarray:
+    """Векторно вычисляет расстояния от точки до множества точек (формула гаверсинусов).
+
+    Args:
+        latitude: Широта исходной точки
+        longitude: Долгота исходной точки
+        lats: Широты точек (последовательность или массив)
+        lons: Долготы точек
+
+    Returns:
+        np.ndarray: Расстояния в метрах
+    """
+    lat1 = np.radians(latitude)
+    lat2 = np.radians(_as_array(lats))
+    dlat = lat2 - lat1
+    dlon = np.radians(_as_array(lons) - longitude)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_M * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def bearings_many(latitude: float, longitude: float, lats, lons) -> np.ndarray:
+    """Векторно вычисляет начальные азимуты от точки до множества точек.
+
+    Returns:
+        np.ndarray: Азимуты в градусах (0 — север, по часовой стрелке, [0, 360))
+    """
+    lat1 = np.radians(latitude)
+    lat2 = np.radians(_as_array(lats))
+    dlon = np.radians(_as_array(lons) - longitude)
+    y = np.sin(dlon) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return np.degrees(np.arctan2(y, x)) % 360.0
+
+
+def bbox_mask(latitude: float, longitude: float, radius: float, lats, lons) -> np.ndarray:
+    """Быстрый предварительный фильтр: точки внутри прямоугольника, описанного вокруг круга.
+
+    Отсекает далекие точки без тригонометрии; точное расстояние затем
+    считается только для оставшихся.
+
+    Returns:
+        np.ndarray: Булева маска точек внутри прямоугольника
+    """
+    dlat = radius / METERS_PER_DEGREE
+    dlon = radius / (METERS_PER_DEGREE * max(cos(radians(latitude)), 1e-6))
+    lats = _as_array(lats)
+    lons = _as_array(lons)
+    return (np.abs(lats - latitude) <= dlat) & (np.abs(lons - longitude) <= dlon)
+
+
+def within_radius(latitude: float, longitude: float, radius: float, lats, lons) -> Tuple[np.ndarray, np.ndarray]:
+    """Отбирает точки в круге: прямоугольный префильтр + точное расстояние.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Индексы точек в круге и расстояния до них
+    """
+    lats = _as_array(lats)
+    lons = _as_array(lons)
+    candidates = np.flatnonzero(bbox_mask(latitude, longitude, radius, lats, lons))
+    distances = haversine_many(latitude, longitude, lats[candidates], lons[candidates])
+    inside = distances <= radius
+    return candidates[inside], distances[inside]
+
+
+def rank_scores(
+        distances,
+        ratings,
+        open_now,
+        radius: float,
+        weights: Optional[Tuple[float, float, float]] = None,
+) -> np.ndarray:
+    """Вычисляет составную оценку мест: близость, рейтинг и «открыто сейчас».
+
+    Каждый признак нормируется в [0, 1]; неизвестный рейтинг (NaN) дает 0 по
+    этому признаку. Если часы работы мест неизвестны (open_now=None), признак
+    «открыто сейчас» не учитывается.
+
+    Args:
+        distances: Расстояния до мест в метрах
+        ratings: Рейтинги мест (0–5, NaN — нет рейтинга)
+        open_now: Признак «открыто сейчас» (1/0) или None
+        radius: Радиус, относительно которого нормируется расстояние
+        weights: Веса (расстояние, рейтинг, открыто сейчас)
+
+    Returns:
+        np.ndarray: Оценки мест (больше — лучше)
+    """
+    w_distance, w_rating, w_open = weights or RANK_WEIGHTS
+    closeness = 1.0 - np.clip(_as_array(distances) / max(radius, 1.0), 0.0, 1.0)
+    rating = np.nan_to_num(_as_array(ratings) / 5.0, nan=0.0)
+    scores = w_distance * closeness + w_rating * rating
+    if open_now is not None:
+        scores += w_open * _as_array(open_now)
+    return scores
+
+
+def rank_order(
+        distances,
+        ratings,
+        open_now,
+        radius: float,
+        weights: Optional[Tuple[float, float, float]] = None,
+) -> np.ndarray:
+    """Возвращает индексы мест по убыванию составной оценки (при равенстве — ближе раньше)."""
+    scores = rank_scores(distances, ratings, open_now, radius, weights)
+    # lexsort сортирует по последнему ключу, затем по предыдущим
+    return np.lexsort((_as_array(distances), -scores))
@@ -0,0 +1,5 @@
+import os
+
+# Настройки загружаются при импорте city_expert — задаем обязательные значения для тестов
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("RAPIDAPI_KEY", "test-key")
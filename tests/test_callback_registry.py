@@ -0,0 +1,69 @@
+import asyncio
+from city_expert.services.callback_registry import CallbackAction, CallbackRegistry
+
+
+class FakeRepository:
+    """Хранилище данных кнопок в памяти, считающее записи."""
+
+    def __init__(self):
+        self.rows = {}
+        self.writes = 0
+
+    async def get(self, token):
+        return self.rows.get(token)
+
+    async def save_many(self, payloads):
+        self.writes += 1
+        self.rows.update(payloads)
+
+    async def purge(self, older_than):
+        return 0
+
+
+def make_registry(repository: FakeRepository, max_tokens: int = 100) -> CallbackRegistry:
+    return CallbackRegistry(
+        repository,
+        max_tokens=max_tokens,
+        max_age=3600,
+        purge_interval=3600,
+        batch_size=100,
+        interval=0.05,
+        max_buffer=100,
+    )
+
+
+def test_tokens_resolve_before_write_and_persist_in_batches():
+    repository = FakeRepository()
+    registry = make_registry(repository)
+    action = CallbackAction("fav", "55.751244,37.618423", "Государственный исторический музей", 42)
+
+    async def scenario():
+        data = await registry.register([CallbackAction("map", action.place_id, action.name, 42), action])
+        # Действие доступно из памяти сразу, до записи в БД
+        assert repository.writes == 0
+        assert await registry.resolve(data[1]) == action
+        await registry.close()
+        return data
+
+    data = asyncio.run(scenario())
+    assert all(len(item.encode()) <= 64 for item in data)
+    assert repository.writes == 1 and len(repository.rows) == 2
+
+
+def test_evicted_token_resolves_from_repository():
+    repository = FakeRepository()
+    registry = make_registry(repository, max_tokens=1)
+
+    async def scenario():
+        first, _ = await registry.register([CallbackAction("map", "1,2"), CallbackAction("map", "3,4")])
+        resolved = await registry.resolve(first)
+        await registry.close()
+        return resolved
+
+    assert asyncio.run(scenario()) == CallbackAction("map", "1,2")
+
+
+def test_unknown_token_is_none():
+    registry = make_registry(FakeRepository())
+    assert asyncio.run(registry.resolve("cb:unknown")) is None
+    assert asyncio.run(registry.resolve("flt:x:y")) is None
@@ -0,0 +1,56 @@
+import asyncio
+import os
+from city_expert.services.disk_cache import DiskCache
+
+
+def test_size_limit_evicts_least_recently_read(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.db"), ttl=3600, max_bytes=1000)
+    # Случайные байты не сжимаются: каждая запись занимает ~400 байт
+    values = {key: os.urandom(400) for key in "abc"}
+
+    async def scenario():
+        await cache.set("a", values["a"])
+        await asyncio.sleep(0.01)
+        await cache.set("b", values["b"])
+        await asyncio.sleep(0.01)
+        # Чтение делает «a» свежее «b»
+        assert await cache.get("a") == values["a"]
+        await asyncio.sleep(0.01)
+        await cache.set("c", values["c"])
+        result = {key: await cache.get(key) for key in "abc"}
+        await cache.close()
+        return result
+
+    result = asyncio.run(scenario())
+    assert result["b"] is None
+    assert result["a"] == values["a"]
+    assert result["c"] == values["c"]
+
+
+def test_overwrite_does_not_count_old_value(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.db"), ttl=3600, max_bytes=1000)
+
+    async def scenario():
+        await cache.set("a", os.urandom(400))
+        for _ in range(5):
+            await cache.set("b", os.urandom(400))
+        result = await cache.get("a")
+        await cache.close()
+        return result
+
+    # Перезапись «b» не раздувает учтенный размер и не вытесняет «a»
+    assert asyncio.run(scenario()) is not None
+
+
+def test_expired_entry_is_not_returned(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.db"), ttl=0.05, max_bytes=1000)
+
+    async def scenario():
+        await cache.set("a", b"value")
+        fresh = await cache.get("a")
+        await asyncio.sleep(0.1)
+        stale = await cache.get("a")
+        await cache.close()
+        return fresh, stale
+
+    assert asyncio.run(scenario()) == (b"value", None)
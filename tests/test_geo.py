@@ -0,0 +1,43 @@
+import random
+from city_expert.utils.geo import (
+    METERS_PER_DEGREE,
+    cell_center,
+    cell_search_radius,
+    cell_size_m,
+    geo_cell,
+    haversine_m,
+)
+
+
+def test_nearby_points_share_cell():
+    size, row, col = geo_cell(55.7558, 37.6173, 1000)
+    # Несколько метров в сторону от центра ячейки — та же ячейка
+    lat, lon = cell_center((size, row, col))
+    assert geo_cell(lat + 5 / METERS_PER_DEGREE, lon, 1000) == (size, row, col)
+    assert geo_cell(lat, lon + 5 / METERS_PER_DEGREE, 1000) == (size, row, col)
+
+
+def test_distant_points_and_radii_use_different_cells():
+    assert geo_cell(55.7558, 37.6173, 1000) != geo_cell(55.7658, 37.6173, 1000)
+    # Размер ячейки входит в ключ: разные радиусы не смешиваются
+    assert geo_cell(55.7558, 37.6173, 1000) != geo_cell(55.7558, 37.6173, 5000)
+
+
+def test_cell_search_radius_covers_circle_around_any_point_of_cell():
+    radius = 1000
+    cell = geo_cell(55.7558, 37.6173, radius)
+    center_lat, center_lon = cell_center(cell)
+    search_radius = cell_search_radius(radius)
+    half = cell_size_m(radius) / 2 / METERS_PER_DEGREE
+
+    rng = random.Random(1)
+    checked = 0
+    for _ in range(200):
+        lat = center_lat + rng.uniform(-half, half)
+        lon = center_lon + rng.uniform(-half, half)
+        if geo_cell(lat, lon, radius) != cell:
+            continue
+        # Самая дальняя точка круга пользователя лежит внутри круга запроса из центра ячейки
+        assert haversine_m(center_lat, center_lon, lat, lon) + radius <= search_radius
+        checked += 1
+    assert checked
@@ -0,0 +1,108 @@
+import asyncio
+from city_expert.services.inline_search import InlineResultCache, InlineSearch, same_meaning
+from city_expert.services.places_api import Place
+
+
+class FakeAPI:
+    """API, возвращающее одно место с названием запроса."""
+
+    def __init__(self):
+        self.queries = []
+
+    async def search(self, query, latitude=None, longitude=None, user_id=None):
+        self.queries.append((query, user_id))
+        return [Place(name=query, address="ул. Тестовая", latitude=55.0, longitude=37.0)]
+
+
+def make_search(api: FakeAPI, requests: int = 100) -> InlineSearch:
+    return InlineSearch(
+        api,
+        debounce=0.01,
+        min_query_length=3,
+        max_results=20,
+        timeout=1.0,
+        max_queries=100,
+        ttl=60,
+        cache_time=300,
+        provisional_cache_time=5,
+        rate_limit={"requests": requests, "period": 60},
+    )
+
+
+def test_prefix_lookup_returns_found_key():
+    cache = InlineResultCache(max_queries=10, ttl=60)
+    cache.put(("global", "кафе"), ["cafe"])
+    cache.put(("cell", "каф"), ["other area"])
+
+    assert cache.get(("global", "кафе")) == (("global", "кафе"), ["cafe"])
+    assert cache.get(("global", "каф")) == (("global", "кафе"), ["cafe"])
+    assert cache.get(("global", "кафет")) is None
+    assert cache.get(("cell", "кафе")) is None
+
+
+def test_same_meaning_requires_same_types_and_words():
+    assert same_meaning("кино", "кинотеатр")
+    assert not same_meaning("бар", "барбершоп")
+    assert not same_meaning("кино", "кинотеатр imax")
+    assert not same_meaning("каф", "кафе")
+
+
+def test_prefix_of_different_query_is_provisional():
+    api = FakeAPI()
+    search = make_search(api)
+
+    async def scenario():
+        await search.results("1", 7, "барбершоп")
+        answer = await search.results("2", 8, "бар")
+        # Дожидаемся фонового поиска настоящих результатов
+        await asyncio.gather(*search._refreshes)
+        return answer, await search.results("3", 8, "бар")
+
+    provisional, final = asyncio.run(scenario())
+    assert provisional.is_personal and provisional.cache_time == 5
+    assert provisional.results[0].title == "барбершоп"
+    assert not final.is_personal and final.cache_time == 300
+    assert final.results[0].title == "бар"
+
+
+def test_erasing_own_query_does_not_search():
+    api = FakeAPI()
+    search = make_search(api)
+
+    async def scenario():
+        await search.results("1", 7, "барбершоп")
+        answer = await search.results("2", 7, "бар")
+        await asyncio.sleep(0.05)
+        return answer
+
+    answer = asyncio.run(scenario())
+    assert answer.is_personal and answer.cache_time == 5
+    assert not search._refreshes
+    assert [query for query, _ in api.queries] == ["барбершоп"]
+
+
+def test_inline_search_uses_own_rate_limit():
+    api = FakeAPI()
+    search = make_search(api, requests=1)
+
+    async def scenario():
+        first = await search.results("1", 7, "музей")
+        second = await search.results("2", 7, "парк")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.results and not second.results
+    # Лимит обычного поиска (по user_id в PlacesAPI) не расходуется
+    assert api.queries == [("музей", None)]
+
+
+def test_superseded_query_is_dropped():
+    api = FakeAPI()
+    search = make_search(api)
+
+    async def scenario():
+        return await asyncio.gather(search.results("1", 7, "муз"), search.results("2", 7, "музей"))
+
+    first, second = asyncio.run(scenario())
+    assert first is None
+    assert [query for query, _ in api.queries] == ["музей"]
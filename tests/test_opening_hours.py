@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+from city_expert.services.opening_hours import MINUTES_PER_WEEK, closes_in, compile_periods, is_open, open_mask
+
+FRIDAY = datetime(2026, 10, 16, tzinfo=timezone.utc)
+SATURDAY = FRIDAY + timedelta(days=1)
+SUNDAY = FRIDAY + timedelta(days=2)
+
+
+def period(open_day, open_hour, close_day, close_hour) -> dict:
+    return {
+        "open": {"day": open_day, "hour": open_hour, "minute": 0},
+        "close": {"day": close_day, "hour": close_hour, "minute": 0},
+    }
+
+
+def hours(*periods) -> dict:
+    return {"weekly": compile_periods(periods), "utc_offset": 0}
+
+
+def at(day: datetime, hour: int, minute: int = 0) -> datetime:
+    return day.replace(hour=hour, minute=minute)
+
+
+def test_overnight_interval():
+    # Пятница 20:00 — суббота 02:00
+    bar = hours(period(5, 20, 6, 2))
+    assert not is_open(bar, at(FRIDAY, 19, 59))
+    assert is_open(bar, at(FRIDAY, 23))
+    assert is_open(bar, at(SATURDAY, 1, 30))
+    assert not is_open(bar, at(SATURDAY, 2))
+    assert closes_in(bar, at(FRIDAY, 23)) == 180
+
+
+def test_week_wrap_interval():
+    # Суббота 22:00 — воскресенье 03:00 (через начало недели в Places API)
+    club = hours(period(6, 22, 0, 3))
+    assert club["weekly"] == [(0, 180), (6 * 1440 + 22 * 60, MINUTES_PER_WEEK)]
+    assert is_open(club, at(SATURDAY, 23))
+    assert is_open(club, at(SUNDAY, 2))
+    assert not is_open(club, at(SUNDAY, 3))
+    # Закрытие считается через границу недели
+    assert closes_in(club, at(SATURDAY, 23)) == 240
+
+
+def test_round_the_clock_and_unknown():
+    always = hours({"open": {"day": 0, "hour": 0}})
+    assert is_open(always, at(FRIDAY, 4))
+    assert closes_in(always, at(FRIDAY, 4)) is None
+    assert is_open(None) is None
+    # Без расписания используется снимок из ответа API
+    assert is_open({"open_now": True}) is True
+
+
+def test_utc_offset_is_applied():
+    # Открыто 09:00–18:00 по местному времени (UTC+3)
+    shop = {"weekly": compile_periods([period(5, 9, 5, 18)]), "utc_offset": 180}
+    assert is_open(shop, at(FRIDAY, 7))
+    assert not is_open(shop, at(FRIDAY, 16))
+
+
+def test_open_mask_matches_is_open():
+    bar = hours(period(5, 20, 6, 2))
+    club = hours(period(6, 22, 0, 3))
+    places = [bar, club, None, {"open_now": True}]
+    for moment in (at(FRIDAY, 23), at(SATURDAY, 23), at(SUNDAY, 12)):
+        expected = [bool(is_open(h, moment)) for h in places]
+        assert open_mask(places, moment).tolist() == expected
@@ -0,0 +1,53 @@
+import asyncio
+import time
+from city_expert.services.place_catalog import CatalogCoverage, PlaceCatalog
+
+CENTER = (55.75, 37.62)
+CAFE = {"place_id": "cafe", "name": "Кафе", "address": "", "latitude": 55.7501, "longitude": 37.6201, "types": ["cafe"]}
+
+
+def coverage(radius: float, latitude: float = CENTER[0], longitude: float = CENTER[1]) -> dict:
+    return {"latitude": latitude, "longitude": longitude, "radius": radius, "types": ["cafe"]}
+
+
+def make_catalog(tmp_path) -> PlaceCatalog:
+    return PlaceCatalog(str(tmp_path / "catalog.db"), freshness=3600, min_places=1)
+
+
+def test_lookup_answers_only_inside_fresh_coverage(tmp_path):
+    catalog = make_catalog(tmp_path)
+
+    async def scenario():
+        await catalog.add([CAFE], coverage(1000))
+        covered = await catalog.lookup(*CENTER, 500, ["cafe"])
+        # Круг запроса выходит за покрытие
+        outside = await catalog.lookup(*CENTER, 1500, ["cafe"])
+        other_types = await catalog.lookup(*CENTER, 500, ["bar"])
+
+        CatalogCoverage.update(fetched_at=time.time() - 7200).execute()
+        stale = await catalog.lookup(*CENTER, 500, ["cafe"])
+        await catalog.close()
+        return covered, outside, other_types, stale
+
+    covered, outside, other_types, stale = asyncio.run(scenario())
+    assert [item["place_id"] for item in covered] == ["cafe"]
+    assert outside is None
+    assert other_types is None
+    assert stale is None
+
+
+def test_new_coverage_drops_stale_and_nested_circles(tmp_path):
+    catalog = make_catalog(tmp_path)
+
+    async def scenario():
+        await catalog.add([CAFE], coverage(300))
+        await catalog.add([], coverage(200, latitude=56.5, longitude=38.0))
+        CatalogCoverage.update(fetched_at=time.time() - 7200).where(CatalogCoverage.latitude == 56.5).execute()
+
+        # Новый круг поглощает первый, а второй к этому времени устарел
+        await catalog.add([CAFE], coverage(1000))
+        rows = [(c.latitude, c.radius) for c in CatalogCoverage.select()]
+        await catalog.close()
+        return rows
+
+    assert asyncio.run(scenario()) == [(CENTER[0], 1000)]
@@ -0,0 +1,41 @@
+import pytest
+from city_expert.services.query_classifier import QueryClassifier, query_classifier
+
+
+@pytest.mark.parametrize("query, types", [
+    ("ресторан", ["restaurant"]),
+    ("ресторанов рядом", ["restaurant"]),
+    ("Музеи", ["museum"]),
+    ("кафешки", ["cafe"]),
+    ("аптечка", ["pharmacy"]),
+    ("кофейня", ["cafe"]),
+    ("гостиницы и хостелы", ["hotel", "hostel"]),
+])
+def test_stem_with_allowed_ending_matches(query, types):
+    assert query_classifier.classify(query) == types
+
+
+@pytest.mark.parametrize("query", ["барбершоп", "паблик", "банкет", "музыка"])
+def test_stem_inside_other_word_does_not_match(query):
+    assert query_classifier.classify(query) == []
+
+
+def test_longest_stem_wins():
+    # «аквапарк» и «зоопарк» не смешиваются с «парк», «кинотеатр» — с «кино»
+    assert query_classifier.classify("аквапарк") == ["water_park"]
+    assert query_classifier.classify("зоопарк") == ["zoo"]
+    assert query_classifier.classify("кинотеатры") == ["movie_theater"]
+
+
+def test_types_are_unique_and_in_order():
+    assert query_classifier.classify("бар, кафе, паб") == ["bar", "cafe"]
+    assert query_classifier.classify("ёлки-палки") == []
+
+
+def test_extra_endings_apply_only_to_their_stem():
+    classifier = QueryClassifier([
+        ("кафе", ("cafe",), frozenset({"шка"})),
+        ("бар", ("bar",), frozenset()),
+    ])
+    assert classifier.classify("кафешка") == ["cafe"]
+    assert classifier.classify("баршка") == []
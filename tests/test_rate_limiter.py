@@ -0,0 +1,72 @@
+import pytest
+from city_expert.services import rate_limiter
+from city_expert.services.rate_limiter import SlidingWindowLimiter
+
+
+class FakeClock:
+    """Монотонные часы, которые двигает тест."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    return clock
+
+
+def test_limit_within_window(clock):
+    limiter = SlidingWindowLimiter(limit=3, period=60)
+    assert [limiter.allow("u") for _ in range(4)] == [True, True, True, False]
+    # Другие ключи считаются отдельно
+    assert limiter.allow("v")
+
+
+def test_previous_window_is_weighted(clock):
+    limiter = SlidingWindowLimiter(limit=4, period=60)
+    for _ in range(4):
+        assert limiter.allow("u")
+
+    # Прошла четверть следующего окна: 4 * 0.75 = 3 запроса еще учитываются
+    clock.now += 75
+    assert limiter.allow("u")
+    assert not limiter.allow("u")
+
+    # Конец следующего окна: вес предыдущего почти нулевой
+    clock.now += 44
+    assert limiter.allow("u")
+    assert limiter.allow("u")
+
+
+def test_no_double_burst_on_window_boundary(clock):
+    limiter = SlidingWindowLimiter(limit=10, period=60)
+    clock.now += 59
+    assert all(limiter.allow("u") for _ in range(10))
+    clock.now += 2
+    # В фиксированном окне здесь разрешились бы еще 10 запросов
+    assert not limiter.allow("u")
+
+
+def test_idle_keys_are_evicted(clock):
+    limiter = SlidingWindowLimiter(limit=1, period=60)
+    limiter.allow("old")
+    clock.now += 120
+    limiter.allow("new")
+    assert len(limiter) == 1
+    # Вытесненный ключ начинает с чистого окна
+    assert limiter.allow("old")
+
+
+def test_key_count_is_bounded(clock):
+    limiter = SlidingWindowLimiter(limit=1, period=60, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.allow(key)
+    assert len(limiter) == 2
+    # Вытеснен самый старый по использованию ключ
+    assert limiter.allow("a")
+    assert not limiter.allow("c")
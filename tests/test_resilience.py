@@ -0,0 +1,84 @@
+import asyncio
+import httpx
+import pytest
+from city_expert.services.exceptions import UpstreamError
+from city_expert.services.places_api import PlacesAPI
+from city_expert.services.quota import Priority, QuotaScheduler
+from city_expert.services.resilience import CircuitBreaker, CircuitState
+
+
+class FakeTransport:
+    """Транспорт, отвечающий заданным телом со статусом 200."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.calls = 0
+
+    async def post(self, endpoint: str, **_) -> httpx.Response:
+        self.calls += 1
+        return httpx.Response(200, content=self.body, request=httpx.Request("POST", f"https://test{endpoint}"))
+
+
+def make_api(transport: FakeTransport) -> PlacesAPI:
+    # Дисковый кэш и каталог в этих тестах не используются
+    api = PlacesAPI(
+        "key",
+        disk_cache=object(),
+        transport=transport,
+        quota=QuotaScheduler(rate=1000, burst=1000, max_wait=1.0),
+        catalog=object(),
+    )
+    api._hedger = None
+    return api
+
+
+def open_breaker() -> CircuitBreaker:
+    """Разомкнутый выключатель, который сразу пропускает пробный запрос."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    return breaker
+
+
+def test_probe_with_invalid_json_reopens_breaker():
+    transport = FakeTransport(b"<html>gateway error</html>")
+    api = make_api(transport)
+    api._breaker = open_breaker()
+
+    async def scenario():
+        for _ in range(2):
+            # Пробный запрос не должен «зависнуть»: второй тоже доходит до API
+            with pytest.raises(UpstreamError):
+                await api._post("/v1/places:searchText", {}, Priority.INTERACTIVE)
+
+    asyncio.run(scenario())
+    assert transport.calls == 2
+    assert api._breaker.state is CircuitState.OPEN
+
+
+def test_successful_probe_closes_breaker():
+    api = make_api(FakeTransport(b'{"places": []}'))
+    api._breaker = open_breaker()
+
+    data = asyncio.run(api._post("/v1/places:searchText", {}, Priority.INTERACTIVE))
+
+    assert data == {"places": []}
+    assert api._breaker.state is CircuitState.CLOSED
+
+
+def test_unexpected_error_releases_probe():
+    class BrokenTransport(FakeTransport):
+        async def post(self, endpoint: str, **_) -> httpx.Response:
+            self.calls += 1
+            raise RuntimeError("boom")
+
+    transport = BrokenTransport(b"")
+    api = make_api(transport)
+    api._breaker = open_breaker()
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await api._post("/v1/places:searchText", {}, Priority.INTERACTIVE)
+
+    asyncio.run(scenario())
+    assert transport.calls == 2
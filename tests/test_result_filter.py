@@ -0,0 +1,72 @@
+import pytest
+from city_expert.services.places_api import Place
+from city_expert.services.result_filter import ResultFilter, SortOrder, apply_filter
+
+ORIGIN = (55.75, 37.62)
+
+
+def place(name: str, meters_north: float, rating=None, **fields) -> Place:
+    return Place(
+        place_id=name,
+        name=name,
+        address="",
+        latitude=ORIGIN[0] + meters_north / 111320.0,
+        longitude=ORIGIN[1],
+        rating=rating,
+        **fields,
+    )
+
+
+PLACES = [
+    place("far_top", 800, 4.9, phone="+7", details_loaded=True),
+    place("near_low", 100, 3.5, details_loaded=True),
+    place("mid_good", 400, 4.6, website="https://example.com", details_loaded=True),
+    place("unrated", 200, None),
+]
+
+
+def names(results):
+    return [p.name for p, _ in results]
+
+
+def test_toggle_cycles_steps():
+    result_filter = ResultFilter()
+    assert result_filter.toggled("rating").min_rating == 4.0
+    assert result_filter.toggled("rating").toggled("rating").toggled("rating").min_rating is None
+    assert result_filter.toggled("distance").max_distance == 500.0
+    assert result_filter.toggled("sort").sort is SortOrder.DISTANCE
+    with pytest.raises(ValueError):
+        result_filter.toggled("unknown")
+
+
+def test_rating_and_distance_filters():
+    results = apply_filter(PLACES, ResultFilter(min_rating=4.5, max_distance=500.0), *ORIGIN)
+    assert names(results) == ["mid_good"]
+    assert results[0][1] == pytest.approx(400, abs=1)
+
+
+def test_sort_orders():
+    assert names(apply_filter(PLACES, ResultFilter(sort=SortOrder.DISTANCE), *ORIGIN)) == [
+        "near_low", "unrated", "mid_good", "far_top",
+    ]
+    # Без рейтинга — в конце
+    assert names(apply_filter(PLACES, ResultFilter(sort=SortOrder.RATING), *ORIGIN)) == [
+        "far_top", "mid_good", "near_low", "unrated",
+    ]
+
+
+def test_without_location_distance_is_unknown():
+    results = apply_filter(PLACES, ResultFilter(max_distance=300.0))
+    assert len(results) == len(PLACES)
+    assert all(distance is None for _, distance in results)
+
+
+def test_detail_filters_keep_unloaded_places_only_when_not_strict():
+    result_filter = ResultFilter(has_phone=True)
+    assert names(apply_filter(PLACES, result_filter, *ORIGIN)) == ["far_top"]
+    # Кандидаты на догрузку подробностей
+    assert set(names(apply_filter(PLACES, result_filter, *ORIGIN, strict=False))) == {"far_top", "unrated"}
+
+
+def test_empty_input():
+    assert apply_filter([], ResultFilter()) == []
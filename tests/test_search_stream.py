@@ -0,0 +1,83 @@
+import asyncio
+import json
+import httpx
+from city_expert.services.places_api import PlacesAPI
+from city_expert.services.quota import QuotaScheduler
+
+
+class PagedTransport:
+    """Транспорт searchText, отдающий страницы по pageToken."""
+
+    def __init__(self, pages: int):
+        self.pages = pages
+        self.requests = []
+
+    async def post(self, endpoint: str, json: dict = None, **_) -> httpx.Response:
+        self.requests.append(json)
+        index = int(json.get("pageToken", 0))
+        body = {"places": [{
+            "id": f"p{index}",
+            "displayName": {"text": f"Место {index}"},
+            "location": {"latitude": 55.0, "longitude": 37.0},
+        }]}
+        if index + 1 < self.pages:
+            body["nextPageToken"] = str(index + 1)
+        return httpx.Response(200, json=body, request=httpx.Request("POST", f"https://test{endpoint}"))
+
+
+class MemoryDiskCache:
+    """Дисковый кэш в памяти."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key: str):
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        self.data[key] = value
+
+
+def make_api(transport: PagedTransport) -> PlacesAPI:
+    api = PlacesAPI(
+        "key",
+        disk_cache=MemoryDiskCache(),
+        transport=transport,
+        quota=QuotaScheduler(rate=1000, burst=1000, max_wait=1.0),
+        catalog=object(),
+    )
+    api._catalog = None
+    api._hedger = None
+    return api
+
+
+def test_next_page_is_fetched_only_when_iteration_continues():
+    transport = PagedTransport(pages=3)
+    api = make_api(transport)
+
+    async def scenario():
+        pages = api.search_stream("музей", user_id=1)
+        first = await anext(pages)
+        assert [place.place_id for place in first] == ["p0"]
+        # Пока потребитель не попросил следующую страницу, запрос к API один
+        assert len(transport.requests) == 1
+
+        second = await anext(pages)
+        assert [place.place_id for place in second] == ["p1"]
+        assert transport.requests[-1]["pageToken"] == "1"
+        await pages.aclose()
+
+    asyncio.run(scenario())
+    assert len(transport.requests) == 2
+
+
+def test_stream_ends_without_next_page_token():
+    transport = PagedTransport(pages=1)
+    api = make_api(transport)
+
+    async def scenario():
+        return [page async for page in api.search_stream("музей", user_id=1)]
+
+    pages = asyncio.run(scenario())
+    assert [[place.place_id for place in page] for page in pages] == [["p0"]]
+    assert len(transport.requests) == 1
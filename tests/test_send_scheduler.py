@@ -0,0 +1,98 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from telegram.error import RetryAfter
+from city_expert.services.send_scheduler import SendScheduler
+
+
+class FakeBot:
+    """Бот, запоминающий время отправки сообщений."""
+
+    def __init__(self, error: Exception = None, once: bool = False):
+        self.sent = []
+        self.error = error
+        self.once = once
+
+    async def send_message(self, chat_id, text, **_):
+        if self.error is not None:
+            error = self.error
+            if self.once:
+                self.error = None
+            raise error
+        self.sent.append((chat_id, text, time.monotonic()))
+        return SimpleNamespace(photo=(), text=text)
+
+
+def make_scheduler(bot: FakeBot, chat_interval: float = 0.2) -> SendScheduler:
+    return SendScheduler(
+        bot,
+        global_rate=100,
+        chat_interval=chat_interval,
+        max_retries=1,
+        max_queue=10,
+        max_wait=1.0,
+        max_chats=100,
+    )
+
+
+def test_chat_interval_survives_worker_restart():
+    bot = FakeBot()
+    scheduler = make_scheduler(bot)
+
+    async def scenario():
+        # Каждое сообщение ставится в очередь после того, как обработчик чата завершился
+        for text in ("a", "b", "c"):
+            await scheduler.send_text(1, text, reply_markup=object())
+            await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    times = [sent_at for _, _, sent_at in bot.sent]
+    assert len(times) == 3
+    assert all(later - earlier >= 0.19 for earlier, later in zip(times, times[1:]))
+
+
+def test_different_chats_are_not_delayed():
+    bot = FakeBot()
+    scheduler = make_scheduler(bot, chat_interval=1.0)
+
+    async def scenario():
+        started = time.monotonic()
+        await asyncio.gather(scheduler.send_text(1, "a"), scheduler.send_text(2, "b"))
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) < 0.5
+
+
+def test_plain_texts_are_coalesced():
+    bot = FakeBot()
+    scheduler = make_scheduler(bot)
+
+    async def scenario():
+        return await asyncio.gather(scheduler.send_text(1, "a"), scheduler.send_text(1, "b"))
+
+    first, second = asyncio.run(scenario())
+    assert [text for _, text, _ in bot.sent] == ["a\n\nb"]
+    assert first is second
+
+
+def test_unexpected_error_fails_futures():
+    scheduler = make_scheduler(FakeBot(error=RuntimeError("boom")))
+
+    async def scenario():
+        return await asyncio.wait_for(scheduler.send_text(1, "a"), timeout=1.0)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario())
+
+
+def test_retry_after_is_retried():
+    bot = FakeBot(error=RetryAfter(0), once=True)
+    scheduler = make_scheduler(bot)
+
+    async def scenario():
+        return await asyncio.wait_for(scheduler.send_text(1, "a"), timeout=1.0)
+
+    assert asyncio.run(scenario()).text == "a"
+    assert scheduler.stats().retries == 1
+    assert scheduler.stats().failed == 0
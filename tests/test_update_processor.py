@@ -0,0 +1,55 @@
+import asyncio
+from datetime import datetime
+from telegram import Chat, Message, Update
+from city_expert.services.update_processor import ChatOrderedUpdateProcessor
+
+
+def make_update(update_id: int, chat_id: int) -> Update:
+    message = Message(message_id=update_id, date=datetime.now(), chat=Chat(id=chat_id, type=Chat.PRIVATE))
+    return Update(update_id=update_id, message=message)
+
+
+def test_updates_of_one_chat_run_in_order():
+    processor = ChatOrderedUpdateProcessor(max_concurrent=4, max_pending=16)
+    log = []
+
+    async def handle(name: str, delay: float):
+        log.append(f"start {name}")
+        await asyncio.sleep(delay)
+        log.append(f"end {name}")
+
+    async def scenario():
+        # Первое обновление чата медленнее второго, но второе ждет его завершения
+        await asyncio.gather(
+            processor.process_update(make_update(1, 1), handle("a1", 0.05)),
+            processor.process_update(make_update(2, 1), handle("a2", 0.0)),
+        )
+
+    asyncio.run(scenario())
+    assert log == ["start a1", "end a1", "start a2", "end a2"]
+    assert processor.stats().processed == 2
+
+
+def test_different_chats_run_concurrently_up_to_limit():
+    processor = ChatOrderedUpdateProcessor(max_concurrent=2, max_pending=16)
+    running = 0
+    peak = 0
+
+    async def handle():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    async def scenario():
+        await asyncio.gather(*(
+            processor.process_update(make_update(chat_id, chat_id), handle())
+            for chat_id in range(5)
+        ))
+
+    asyncio.run(scenario())
+    assert peak == 2
+    stats = processor.stats()
+    assert stats.processed == 5
+    assert stats.waiting == 0 and stats.running == 0